@@ -0,0 +1,94 @@
+# bench_assets.py
+# จับเวลางานตอนเริ่มเกม/spawn กับ assets จริงใน game/graphics:
+#   slice_by_alpha_regions, align_and_pad, load_animation_with_fallback (เย็น/แคชกลาง), frame_store,
+#   สร้าง Player ทั้ง 2 อาชีพ และ Enemy ทุกชนิดใน enemy.CHAR_CONFIGS (แคชเย็นทุกรอบ)
+# ปิด atlas + แคชดิสก์ ยกเว้น case frame_store -> วัดทางที่ช้าที่สุด (เครื่องใหม่ / แคชถูกล้าง)
+#
+#   python benchmarks/bench_assets.py --out benchmarks/results/assets.json
+#   python benchmarks/bench_assets.py --compare benchmarks/results/assets.json    (exit 1 ถ้าช้าลง)
+import os
+import argparse
+import tempfile
+
+os.environ["RINGFIT_FRAME_CACHE"] = ""   # ต้องตั้งก่อน import frame_store / atlas
+os.environ["RINGFIT_ATLAS_DIR"] = ""
+
+import bench_common
+
+
+def collect_sheets():
+    """(path, scale) ของทุกชีตที่ Player / Enemy ใช้ (path แรกที่มีไฟล์จริง เหมือนตอนเล่น)"""
+    import player
+    import enemy
+    from animation_helper import resolve_asset_path
+
+    sheets = []
+    for configs in (player.CHAR_CONFIGS, enemy.CHAR_CONFIGS):
+        for cfg in configs.values():
+            for paths in cfg["assets"].values():
+                path = resolve_asset_path(paths)
+                if path is not None and (path, cfg["scale"]) not in sheets:
+                    sheets.append((path, cfg["scale"]))
+    return sheets
+
+
+def run(args):
+    bench_common.init_display()
+    import frame_store
+    import animation_helper as ah
+    from player import Player
+    from enemy import Enemy, CHAR_CONFIGS as ENEMY_CONFIGS
+
+    sheets = collect_sheets()
+    cases = {}
+
+    def add(name, fn, setup=None, warmup=1):
+        if args.only and args.only not in name:
+            return
+        print(f"⏱ {name} ...", flush=True)
+        cases[name] = bench_common.measure(fn, repeat=args.repeat, warmup=warmup, setup=setup)
+
+    # ---- ชิ้นส่วนของ pipeline โหลดเฟรม (ทุกชีตรวมกัน) ----
+    add("slice_by_alpha_regions", lambda: [ah.slice_by_alpha_regions(p) for p, _ in sheets])
+
+    raw = [ah.slice_by_alpha_regions(p) for p, _ in sheets]
+    add("align_and_pad", lambda: [ah.align_and_pad(frames) for frames in raw])
+
+    def load_all():
+        for path, scale in sheets:
+            ah.load_animation_with_fallback([path], scale=scale)
+
+    add("load_animation_with_fallback[cold]", load_all, setup=ah.clear_frame_cache)
+    load_all()
+    add("load_animation_with_fallback[cached]", load_all)
+
+    # ---- แคชดิสก์: อ่านเฟรมที่เคย slice แล้วจาก .bin ----
+    with tempfile.TemporaryDirectory() as tmp:
+        keys = [frame_store.entry_key(path, (float(scale), None, "midbottom")) for path, scale in sheets]
+        frame_store.CACHE_DIR = tmp
+        try:
+            for (path, scale), key in zip(sheets, keys):
+                frame_store.save(key, ah.load_frames_cached(path, scale=scale))
+            add("frame_store.load", lambda: [frame_store.load(k) for k in keys])
+        finally:
+            frame_store.CACHE_DIR = ""
+
+    # ---- สร้างตัวละครเต็มตัว (แคชกลางเย็นทุกรอบ) ----
+    for cls in ("wizard", "swordman"):
+        add(f"Player({cls})", lambda cls=cls: Player(cls), setup=ah.clear_frame_cache)
+    for etype in ENEMY_CONFIGS:
+        add(f"Enemy({etype})", lambda etype=etype: Enemy(etype), setup=ah.clear_frame_cache)
+
+    return cases, {"sheets": len(sheets)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="asset loading / slicing / frame cache benchmarks")
+    bench_common.add_common_args(ap, repeat=7)
+    args = ap.parse_args(argv)
+    results, extra = run(args)
+    return bench_common.finish(args, "assets", results, extra)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
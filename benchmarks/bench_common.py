@@ -0,0 +1,178 @@
+# bench_common.py
+# ของที่ benchmark ทุกตัวใช้ร่วมกัน:
+#   - ตั้ง SDL dummy driver + ย้ายไปโฟลเดอร์ game/ (path ของ assets เป็น relative กับ game/) ตอน import
+#   - จับเวลาหลายรอบแล้วสรุป median / กระจาย (min, p25, p75, max, stdev)
+#   - เขียนผลเป็น JSON และเทียบกับ baseline (--compare) แล้วแจ้ง regression (exit code 1)
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("RINGFIT_SERIAL_PORT", os.devnull)   # ไม่แตะบอร์ดจริง
+
+START_DIR = os.getcwd()   # path ที่ผู้ใช้พิมพ์ (--out / --compare) อ้างจากตรงนี้
+GAME_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "game"))
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)
+
+DEFAULT_THRESHOLD = 0.50   # ช้าลงเกิน 50% ของ median = regression (เครื่องที่ใช้ร่วมกับงานอื่น noise ราว ±30%)
+DEFAULT_MIN_MS = 1.0       # แต่ต่างกันไม่ถึงนี้ถือว่าเป็น noise
+COUNTER_KEYS = ("surfaces_per_frame",)   # เทียบแบบตรงตัว (seed เดิม = ค่าเดิมทุกครั้ง)
+
+
+def user_path(path):
+    return path if os.path.isabs(path) else os.path.join(START_DIR, path)
+
+
+def init_display(size=(960, 540)):
+    import pygame
+    pygame.init()
+    return pygame.display.get_surface() or pygame.display.set_mode(size)
+
+
+def summarize(samples_ms):
+    s = sorted(samples_ms)
+    n = len(s)
+
+    def pct(q):
+        if n == 1:
+            return s[0]
+        i = q * (n - 1)
+        lo = int(i)
+        hi = min(lo + 1, n - 1)
+        return s[lo] + (s[hi] - s[lo]) * (i - lo)
+
+    return {
+        "n": n,
+        "mean_ms": statistics.fmean(s),
+        "median_ms": statistics.median(s),
+        "min_ms": s[0],
+        "p25_ms": pct(0.25),
+        "p75_ms": pct(0.75),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": s[-1],
+        "stdev_ms": statistics.stdev(s) if n > 1 else 0.0,
+    }
+
+
+def measure(fn, repeat=7, warmup=1, setup=None):
+    """เรียก setup() (ไม่จับเวลา) แล้ว fn() ทีละรอบ คืนสรุปเวลาเป็น ms"""
+    samples = []
+    for i in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        dt = (time.perf_counter() - t0) * 1000.0
+        if i >= warmup:
+            samples.append(dt)
+    return summarize(samples)
+
+
+# (หัวคอลัมน์, key ในผล, format) ของตารางสรุป
+TIME_COLUMNS = (
+    ("median", "median_ms", "{:.2f}ms"),
+    ("p25", "p25_ms", "{:.2f}ms"),
+    ("p75", "p75_ms", "{:.2f}ms"),
+    ("min", "min_ms", "{:.2f}ms"),
+    ("max", "max_ms", "{:.2f}ms"),
+)
+
+
+def print_table(results, out=None, columns=TIME_COLUMNS):
+    out = out or sys.stdout
+    width = max([len(k) for k in results] + [10])
+    cells = {name: [fmt.format(r[key]) if key in r else "-" for _, key, fmt in columns] for name, r in results.items()}
+    widths = [max([len(head)] + [len(c[i]) for c in cells.values()]) for i, (head, _, _) in enumerate(columns)]
+    print(f"{'case':<{width}}" + "".join(f"  {head:>{w}}" for (head, _, _), w in zip(columns, widths)), file=out)
+    for name, row in cells.items():
+        print(f"{name:<{width}}" + "".join(f"  {c:>{w}}" for c, w in zip(row, widths)), file=out)
+
+
+def write_results(path, suite, results, extra=None):
+    import pygame
+    doc = {
+        "suite": suite,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "results": results,
+    }
+    if extra:
+        doc.update(extra)
+    path = user_path(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+    print(f"💾 ผลเก็บที่ {path}")
+
+
+def compare(results, baseline_path, threshold=DEFAULT_THRESHOLD, min_ms=DEFAULT_MIN_MS, out=None):
+    """
+    เทียบกับ baseline คืนลิสต์ชื่อ case ที่ช้าลง: median ช้าลงเกิน threshold และเกิน min_ms
+    และช่วง p25..p75 ไม่ทับกัน (p25 รอบนี้ > p75 ของ baseline) กัน noise ของเครื่องทำให้แจ้งผิด
+    """
+    out = out or sys.stdout
+    with open(user_path(baseline_path), encoding="utf-8") as f:
+        base = json.load(f)["results"]
+    regressions = []
+    print(f"\nเทียบกับ {baseline_path} (เกณฑ์ +{threshold:.0%} และ > {min_ms} ms)", file=out)
+    for name, r in results.items():
+        b = base.get(name)
+        if b is None:
+            print(f"  {name}: ใหม่ (ไม่มีใน baseline)", file=out)
+            continue
+        now, before = r["median_ms"], b["median_ms"]
+        ratio = now / before if before > 0 else float("inf")
+        slower = (
+            now > before * (1 + threshold)
+            and (now - before) > min_ms
+            and r["p25_ms"] > b.get("p75_ms", before)
+        )
+        mark = "❌ REGRESSION" if slower else ("✅ เร็วขึ้น" if ratio < 1 - threshold else "ok")
+        print(f"  {name}: {before:.2f} -> {now:.2f} ms (x{ratio:.2f}) {mark}", file=out)
+        if slower:
+            regressions.append(name)
+        # ตัวนับที่ไม่ขึ้นกับความเร็วเครื่อง (เช่นจำนวน Surface ต่อเฟรม) เพิ่มขึ้นเมื่อไหร่ = regression
+        for key in COUNTER_KEYS:
+            if key in r and key in b and r[key] > b[key] + 1e-6:
+                print(f"  {name}: {key} {b[key]:.3f} -> {r[key]:.3f} ❌ REGRESSION", file=out)
+                if name not in regressions:
+                    regressions.append(name)
+    for name in base:
+        if name not in results:
+            print(f"  {name}: หายไปจากผลรอบนี้", file=out)
+    return regressions
+
+
+def add_common_args(ap, repeat=7):
+    if repeat is not None:
+        ap.add_argument("--repeat", type=int, default=repeat, help="จำนวนรอบที่จับเวลาต่อ case")
+    ap.add_argument("--out", default=None, help="เขียนผลเป็น JSON (ใช้เป็น baseline ได้)")
+    ap.add_argument("--compare", default=None, metavar="BASELINE", help="เทียบกับไฟล์ผลเดิม แล้ว exit 1 ถ้าช้าลง")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="สัดส่วนที่ยอมให้ช้าลง (0.5 = 50%%)")
+    ap.add_argument("--min-ms", type=float, default=DEFAULT_MIN_MS, help="ต่างกันไม่ถึงนี้ไม่นับเป็น regression")
+    ap.add_argument("--only", default=None, help="รันเฉพาะ case ที่ชื่อมีคำนี้")
+
+
+def finish(args, suite, results, extra=None, columns=TIME_COLUMNS):
+    """พิมพ์ตาราง + เขียน JSON + เทียบ baseline คืน exit code"""
+    print_table(results, columns=columns)
+    if args.out:
+        write_results(args.out, suite, results, extra)
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold, args.min_ms)
+        if regressions:
+            print(f"❌ ช้าลง {len(regressions)} case: {', '.join(regressions)}")
+            return 1
+        print("✅ ไม่มี regression")
+    return 0
@@ -0,0 +1,229 @@
+# bench_frame.py
+# ต้นทุนต่อเฟรมช่วง steady-state ของ GameScene (update + draw ของ main.py ตัวจริง ไม่มีหน้าต่าง ไม่ flip)
+# แต่ละฉากเล่นด้วยสคริปต์ + seed ตายตัว แล้วล็อกเลเวลไว้ไม่ให้ผ่านด่าน:
+#   idle, run_parallax (เลเวล 1 เดิน+เก็บเหรียญ), level2_challenge, level4_obstacles, level5_boss_cycle, pause
+# รายงาน: เวลาต่อเฟรม (mean / p50 / p95 / p99 / max), Surface ที่สร้างต่อเฟรม (alloc_counter.py),
+#         หน่วยความจำ Python ที่จองชั่วคราวต่อเฟรม (tracemalloc peak) และ block ที่เพิ่มค้างต่อเฟรม
+# รอบจับเวลากับรอบนับ allocation แยกกัน (tracemalloc ทำให้ช้าลงหลายเท่า)
+#
+#   python benchmarks/bench_frame.py --out benchmarks/results/frame.json
+#   python benchmarks/bench_frame.py --compare benchmarks/results/frame.json --only level5
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import bench_common
+from fixed_step import STEP_MS
+
+SEED = 1234
+
+FRAME_COLUMNS = (
+    ("mean", "mean_ms", "{:.3f}ms"),
+    ("p50", "median_ms", "{:.3f}ms"),
+    ("p95", "p95_ms", "{:.3f}ms"),
+    ("p99", "p99_ms", "{:.3f}ms"),
+    ("max", "max_ms", "{:.3f}ms"),
+    ("surf/f", "surfaces_per_frame", "{:.2f}"),
+    ("surf max", "surfaces_max", "{:d}"),
+    ("py peak KB", "py_peak_kb", "{:.1f}"),
+    ("py blk/f", "py_blocks_per_frame", "{:+.2f}"),
+)
+
+
+class Scenario:
+    """
+    level    = เลเวลเริ่ม
+    commands = fn(scene, tick) -> คำสั่ง serial ของ tick นั้น (None = ไม่กดอะไร)
+    pin      = fn(scene) เรียกก่อนทุก tick ไว้ล็อกตัวนับไม่ให้ผ่านด่าน (วัดเลเวลเดิมตลอด)
+    """
+
+    def __init__(self, name, level=1, commands=None, pin=None):
+        self.name = name
+        self.level = level
+        self.commands = commands
+        self.pin = pin
+
+
+def _bot():
+    from headless import BotInput
+    bot = BotInput()
+    return lambda scene, tick: bot.commands(scene, STEP_MS)
+
+
+def _field_empty(scene):
+    return not (scene.enemy_group or scene.coin_group or scene.obstacle_group)
+
+
+def _pin_coins(scene):
+    scene.coins_collected = 0
+
+
+def _pin_level2(scene):
+    # ศัตรู/เหรียญตัวถัดไปมาทันทีที่ตัวก่อนหน้าจบ (ไม่ต้องรอหลอด progress)
+    from main import LEVEL2_PROGRESS_MAX
+    scene.level2_kills = 0
+    if _field_empty(scene):
+        scene.level2_progress = LEVEL2_PROGRESS_MAX
+
+
+def _pin_level4(scene):
+    scene.level4_kills = 0
+    if _field_empty(scene):
+        scene.spawn_obstacle()
+
+
+def _pin_level5(scene):
+    # บอสทุกรอบ (evil / neon phantom / gorgon)
+    from main import LEVEL2_PROGRESS_MAX
+    if _field_empty(scene):
+        scene.level5_force_boss_next = True
+        scene.level2_progress = LEVEL2_PROGRESS_MAX
+
+
+def _pause_once(scene, tick):
+    return ["PAUSE"] if tick == 0 else ()
+
+
+def scenarios():
+    # BotInput มี state (ตัวจับเวลาเดิน/กด) -> สร้างใหม่ทุกครั้งที่เรียก
+    return [
+        Scenario("idle", level=1),
+        Scenario("run_parallax", level=1, commands=_bot(), pin=_pin_coins),
+        Scenario("level2_challenge", level=2, commands=_bot(), pin=_pin_level2),
+        Scenario("level4_obstacles", level=4, commands=_bot(), pin=_pin_level4),
+        Scenario("level5_boss_cycle", level=5, commands=_bot(), pin=_pin_level5),
+        Scenario("pause", level=1, commands=_pause_once),
+    ]
+
+
+def run_scenario(sc, screen, manager, frames, warmup, player_class, observe):
+    """
+    เล่นฉาก warmup เฟรม (ไม่วัด) แล้ววัด frames เฟรม: observe.begin() / observe.end() ครอบแต่ละเฟรม
+    ผู้เล่นเป็นอมตะ (เติม HP ทุก tick) ฉากจึงไม่จบกลางทาง
+    """
+    from main import GameScene
+
+    scene = GameScene(manager, player_class=player_class, seed=SEED)
+    scene.level = sc.level
+    commands = sc.commands or (lambda scene, tick: ())
+    try:
+        for tick in range(warmup + frames):
+            if sc.pin is not None:
+                sc.pin(scene)
+            p = scene.player_group.sprite
+            p.hp = p.max_hp
+            cmds = commands(scene, tick)
+            measured = tick >= warmup
+            if measured:
+                observe.begin()
+            scene.update(STEP_MS, (), cmds)
+            scene.draw(screen, 1.0)
+            if measured:
+                observe.end()
+            if manager.requested is not None:
+                raise RuntimeError(f"{sc.name}: ฉากขอเปลี่ยนไป {manager.requested!r} ระหว่างวัด")
+    finally:
+        scene.leave()
+    return scene
+
+
+class FrameTimer:
+    def __init__(self):
+        self.samples = []
+        self._t0 = 0.0
+
+    def begin(self):
+        self._t0 = time.perf_counter()
+
+    def end(self):
+        self.samples.append((time.perf_counter() - self._t0) * 1000.0)
+
+
+class AllocObserver:
+    """นับ Surface (SurfaceAllocCounter) + หน่วยความจำ Python ที่จองชั่วคราว/ค้างต่อเฟรม"""
+
+    def __init__(self, counter):
+        self.counter = counter
+        self.peak_bytes = []
+        self.net_blocks = []
+        self._blocks0 = 0
+        self._mem0 = 0
+
+    def begin(self):
+        tracemalloc.reset_peak()
+        self._mem0 = tracemalloc.get_traced_memory()[0]
+        self._blocks0 = sys.getallocatedblocks()
+        self.counter.mark_frame()   # ปิดช่วงก่อนหน้า (นอกเฟรม) ทิ้งไป
+
+    def end(self):
+        self.net_blocks.append(sys.getallocatedblocks() - self._blocks0)
+        self.peak_bytes.append(tracemalloc.get_traced_memory()[1] - self._mem0)
+        self.counter.mark_frame()
+
+    def summary(self):
+        surfaces = self.counter.per_frame[1::2]   # เฉพาะช่วง begin..end
+        n = max(len(surfaces), 1)
+        return {
+            "surfaces_per_frame": sum(surfaces) / n,
+            "surfaces_max": max(surfaces) if surfaces else 0,
+            "py_peak_kb": sum(self.peak_bytes) / n / 1024.0,
+            "py_blocks_per_frame": sum(self.net_blocks) / n,
+        }
+
+
+def run(args):
+    screen = bench_common.init_display()
+    from headless import HeadlessManager
+    from alloc_counter import SurfaceAllocCounter
+
+    manager = HeadlessManager(screen)
+    results = {}
+    for sc in scenarios():
+        if args.only and args.only not in sc.name:
+            continue
+        print(f"⏱ {sc.name} ...", file=sys.stderr, flush=True)
+
+        timer = FrameTimer()
+        run_scenario(sc, screen, manager, args.frames, args.warmup, args.player, timer)
+        r = bench_common.summarize(timer.samples)
+
+        if not args.no_alloc:
+            # รอบที่ 2 (seed เดิม = เล่นเหมือนเดิมทุกเฟรม) เปิดตัวนับ
+            sc = next(s for s in scenarios() if s.name == sc.name)
+            with SurfaceAllocCounter() as counter:
+                obs = AllocObserver(counter)
+                tracemalloc.start()
+                try:
+                    run_scenario(sc, screen, manager, args.frames, args.warmup, args.player, obs)
+                finally:
+                    tracemalloc.stop()
+            r.update(obs.summary())
+        results[sc.name] = r
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="steady-state per-frame cost of GameScene update + draw")
+    bench_common.add_common_args(ap, repeat=None)
+    ap.add_argument("--frames", type=int, default=600, help="จำนวนเฟรมที่วัดต่อฉาก")
+    ap.add_argument("--warmup", type=int, default=300, help="เฟรมที่เล่นก่อนเริ่มวัด (โหลดชีต/spawn ให้ครบ)")
+    ap.add_argument("--player", default="wizard")
+    ap.add_argument("--no-alloc", action="store_true", help="ข้ามรอบนับ allocation (จับเวลาอย่างเดียว)")
+    args = ap.parse_args(argv)
+
+    # print ของเกม (level up, challenge ...) รกตาราง
+    real_stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            results = run(args)
+        finally:
+            sys.stdout = real_stdout
+    extra = {"frames": args.frames, "warmup": args.warmup, "player": args.player, "seed": SEED}
+    return bench_common.finish(args, "frame", results, extra, columns=FRAME_COLUMNS)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
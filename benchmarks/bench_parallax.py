@@ -0,0 +1,103 @@
+# bench_parallax.py
+# เทียบการวาดฉากหลัง parallax ของ GameScene: แบบเดิม (ปูกระเบื้องทุกเลเยอร์ทุกเฟรม และวาดซ้ำ 2 รอบ)
+# กับแบบใหม่ (background อบไว้ + strip ละ 1 blit) — นับจำนวน blit และเวลาต่อเฟรม
+#
+#   python benchmarks/bench_parallax.py --frames 2000
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("RINGFIT_SERIAL_PORT", os.devnull)   # ไม่แตะบอร์ดจริง
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "game")
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)  # path ของ assets เป็น relative กับ game/
+
+import pygame
+
+
+class CountingSurface(pygame.Surface):
+    """surface ที่นับจำนวน blit"""
+
+    blits = 0
+
+    def blit(self, *args, **kwargs):
+        CountingSurface.blits += 1
+        return super().blit(*args, **kwargs)
+
+
+def draw_tiled(screen, pb, t):
+    """ParallaxBG.draw เดิม: ปูกระเบื้องทุกเลเยอร์ทุกเฟรม"""
+    for L in pb.layers:
+        surf, sp, w, y = L["surf"], L["sp"], L["w"], L["y"]
+        off = int(t * sp) % w
+        x0 = -off
+        tiles = (pb.W // w) + 2
+        for i in range(-1, tiles):
+            screen.blit(surf, (x0 + i * w, y))
+
+
+def draw_before(screen, pb, t, W, GROUND_Y):
+    # GameScene เดิม: fill + เส้นพื้น + parallax.draw 2 รอบ
+    screen.fill((30, 30, 30))
+    pygame.draw.line(screen, (70, 70, 70), (0, GROUND_Y), (W, GROUND_Y), 2)
+    draw_tiled(screen, pb, t)
+    draw_tiled(screen, pb, t)
+
+
+def draw_after(screen, pb, t, W, GROUND_Y):
+    if not pb.opaque:
+        screen.fill((30, 30, 30))
+    pb.draw(screen, t)
+
+
+def bench(fn, screen, pb, frames, W, GROUND_Y):
+    # ผู้เล่นเดินตลอด: t เพิ่มทีละ tick (STEP_MS * 0.12)
+    step = 1000.0 / 60 * 0.12
+    t = 0.0
+    for _ in range(20):  # warm up
+        fn(screen, pb, t, W, GROUND_Y)
+    CountingSurface.blits = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        t += step
+        fn(screen, pb, t, W, GROUND_Y)
+    elapsed = time.perf_counter() - start
+    return CountingSurface.blits / frames, elapsed * 1000.0 / frames
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="ParallaxBG blit count / time per frame, before vs after")
+    ap.add_argument("--frames", type=int, default=1000)
+    args = ap.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((960, 540))
+
+    import main as game_main
+    from parallax import ParallaxBG
+
+    W, H, GROUND_Y = game_main.W, game_main.H, game_main.GROUND_Y
+    t0 = time.perf_counter()
+    pb = ParallaxBG(W, H, game_main.PARALLAX_LAYERS, base=game_main._backdrop_base())
+    bake_ms = (time.perf_counter() - t0) * 1000.0
+
+    screen = CountingSurface((W, H))
+
+    print(f"layers={len(pb.layers)} strips={len(pb.strips)} background={'opaque' if pb.opaque else 'alpha'} "
+          f"load+bake={bake_ms:.0f} ms")
+    rows = [
+        ("before", *bench(draw_before, screen, pb, args.frames, W, GROUND_Y)),
+        ("after", *bench(draw_after, screen, pb, args.frames, W, GROUND_Y)),
+    ]
+    print(f"{'':8}{'blits/frame':>12}{'ms/frame':>10}")
+    for name, blits, ms in rows:
+        print(f"{name:8}{blits:>12.1f}{ms:>10.3f}")
+    print(f"speedup x{rows[0][2] / rows[1][2]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# bench_serial.py
+# throughput / latency ของตัว parse สตรีมจาก STM32 (ทางเดียวกับ SerialReader.decode ใน serial_input.py):
+#   ascii  = LineAssembler + parse_serial_line (serial_lines.py)
+#   binary = BinaryFrameDecoder (serial_binary.py)
+# สตรีมสังเคราะห์ (seed ตายตัว): joystick_heavy, command_heavy, mixed_garbage (เศษ byte / บรรทัดขาด / ยาวเกิน)
+# ป้อนทีละ chunk ขนาด --chunk bytes เหมือน port.read() ที่ได้ข้อมูลมาทีละนิด (บรรทัดถูกตัดข้าม chunk)
+#
+# รายงาน lines/s, µs ต่อบรรทัด, p99 ของเวลาต่อ chunk และต้นทุนถ้า joystick ส่งต่อเนื่อง 1 kHz:
+#   cpu% (ของ 1 core) และ ms ต่อเฟรม 60 FPS — parse อยู่ใน reader thread แต่ถือ GIL จึงกินเวลาเฟรมจริง
+# exit 1 ถ้า 1 kHz กิน cpu เกิน --budget-pct (หรือช้าลงกว่า baseline เมื่อใช้ --compare)
+#
+#   python benchmarks/bench_serial.py --out benchmarks/results/serial.json
+#   python benchmarks/bench_serial.py --compare benchmarks/results/serial.json --only ascii
+import time
+import random
+import argparse
+
+import bench_common
+import serial_binary
+from serial_lines import LineAssembler, parse_serial_bytes
+
+SEED = 1234
+JOY_RATE_HZ = 1000           # ความถี่ sample joystick ที่ต้องรับไหว
+FRAME_HZ = 60
+DEFAULT_BUDGET_PCT = 5.0     # 1 kHz ต้องกิน cpu ไม่เกินนี้
+
+SERIAL_COLUMNS = (
+    ("median", "median_ms", "{:.2f}ms"),
+    ("lines/s", "lines_per_s", "{:,.0f}"),
+    ("us/line", "us_per_line", "{:.2f}"),
+    ("chunk p99", "chunk_p99_us", "{:.1f}us"),
+    ("1kHz cpu", "cpu_pct_1khz", "{:.2f}%"),
+    ("1kHz ms/frame", "frame_ms_1khz", "{:.3f}"),
+)
+
+_BUTTONS = "JMPDIW"
+
+
+# ---------- สตรีมสังเคราะห์ ----------
+# แต่ละสตรีมเป็นลิสต์ของ "ข้อความ": ("joy", x, y, btn) / ("btn", ตัวอักษร) / ("pause",) / ("resume",)
+#                                  / ("text", str) / ("garbage", bytes)
+def _joy(rng):
+    return ("joy", rng.randint(0, 4095), rng.randint(0, 4095), int(rng.random() < 0.05))
+
+
+def _text(rng):
+    return ("text", f"Time {rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} Calories={rng.randint(0, 999)}")
+
+
+def _garbage(rng):
+    kind = rng.random()
+    if kind < 0.4:   # สัญญาณรบกวนไม่มี \n
+        return ("garbage", bytes(rng.choice(b"\x00\xff~#?@Zz\x7f") for _ in range(rng.randint(1, 8))))
+    if kind < 0.7:   # บรรทัด X= ขาด
+        return ("garbage", b"X=%d,Y=\n" % rng.randint(0, 4095))
+    if kind < 0.9:   # บรรทัดแปลก ๆ ที่ไม่ใช่คำสั่ง
+        return ("garbage", b"ERR %d\r\n" % rng.randint(0, 99))
+    return ("garbage", b"Z" * rng.randint(300, 600) + b"\n")   # ยาวเกิน MAX_LINE_BYTES
+
+
+def make_stream(kind, n, rng):
+    msgs = []
+    for _ in range(n):
+        r = rng.random()
+        if kind == "joystick_heavy":
+            msgs.append(_joy(rng) if r < 0.97 else _text(rng))
+        elif kind == "command_heavy":
+            if r < 0.90:
+                letter = rng.choice(_BUTTONS)
+                msgs.append(("btn", letter if rng.random() < 0.8 else letter.lower()))
+            elif r < 0.95:
+                msgs.append(("pause",) if rng.random() < 0.5 else ("resume",))
+            else:
+                msgs.append(_joy(rng))
+        else:   # mixed_garbage
+            if r < 0.55:
+                msgs.append(_joy(rng))
+            elif r < 0.75:
+                msgs.append(("btn", rng.choice(_BUTTONS)))
+            elif r < 0.80:
+                msgs.append(_text(rng))
+            else:
+                msgs.append(_garbage(rng))
+    return msgs
+
+
+def encode_ascii(msgs):
+    out = bytearray()
+    for m in msgs:
+        if m[0] == "joy":
+            out += b"X=%d,Y=%d,BTN=%d\r\n" % m[1:]
+        elif m[0] == "btn":
+            out += m[1].encode() + b"\n"
+        elif m[0] == "pause":
+            out += b"PAUSE\n"
+        elif m[0] == "resume":
+            out += b"RESUME\n"
+        elif m[0] == "text":
+            out += m[1].encode() + b"\r\n"
+        else:
+            out += m[1]
+    return bytes(out)
+
+
+def encode_binary(msgs):
+    out = bytearray()
+    for m in msgs:
+        if m[0] == "joy":
+            out += serial_binary.encode_joy(*m[1:])
+        elif m[0] == "btn":
+            out += serial_binary.encode_button(m[1])
+        elif m[0] == "pause":
+            out += serial_binary.encode_frame(serial_binary.T_PAUSE)
+        elif m[0] == "resume":
+            out += serial_binary.encode_frame(serial_binary.T_RESUME)
+        elif m[0] == "text":
+            out += serial_binary.encode_frame(serial_binary.T_TEXT, m[1].encode()[:60])
+        else:
+            out += m[1]   # เศษ byte ปนในสตรีม binary = ต้อง resync
+    return bytes(out)
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+# ---------- ตัว parse (เหมือน SerialReader.decode) ----------
+def ascii_parser():
+    asm = LineAssembler()
+    return lambda data: parse_serial_bytes(data, asm)
+
+
+def binary_parser():
+    return serial_binary.BinaryFrameDecoder().feed
+
+
+PARSERS = {"ascii": (ascii_parser, encode_ascii), "binary": (binary_parser, encode_binary)}
+STREAMS = ("joystick_heavy", "command_heavy", "mixed_garbage")
+
+
+def run_case(make_parser, chunks, repeat):
+    """คืน (สรุปเวลาทั้งสตรีม, จำนวนคำสั่งที่ได้, เวลาต่อ chunk เป็น µs ของรอบสุดท้าย)"""
+    n_cmds = [0]
+
+    def parse_all():
+        feed = make_parser()
+        n = 0
+        for c in chunks:
+            n += len(feed(c))
+        n_cmds[0] = n
+
+    summary = bench_common.measure(parse_all, repeat=repeat)
+
+    feed = make_parser()
+    per_chunk = []
+    clock = time.perf_counter_ns
+    for c in chunks:
+        t0 = clock()
+        feed(c)
+        per_chunk.append((clock() - t0) / 1000.0)
+    return summary, n_cmds[0], per_chunk
+
+
+def run(args):
+    rng = random.Random(SEED)
+    streams = {kind: make_stream(kind, args.lines, rng) for kind in STREAMS}
+    results = {}
+    for proto, (make_parser, encode) in PARSERS.items():
+        for kind, msgs in streams.items():
+            name = f"{proto}/{kind}"
+            if args.only and args.only not in name:
+                continue
+            print(f"⏱ {name} ...", flush=True)
+            data = encode(msgs)
+            chunks = chunked(data, args.chunk)
+            r, n_cmds, per_chunk = run_case(make_parser, chunks, args.repeat)
+
+            sec = r["median_ms"] / 1000.0
+            us_per_line = r["median_ms"] * 1000.0 / len(msgs)
+            r.update({
+                "lines": len(msgs),
+                "bytes": len(data),
+                "commands": n_cmds,
+                "lines_per_s": len(msgs) / sec if sec > 0 else float("inf"),
+                "us_per_line": us_per_line,
+                "chunk_p99_us": bench_common.summarize(per_chunk)["p99_ms"],   # หน่วยเป็น µs อยู่แล้ว
+                "cpu_pct_1khz": JOY_RATE_HZ * us_per_line / 1e6 * 100.0,
+                "frame_ms_1khz": JOY_RATE_HZ / FRAME_HZ * us_per_line / 1000.0,
+            })
+            results[name] = r
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="STM32 serial parser throughput / latency")
+    bench_common.add_common_args(ap, repeat=7)
+    ap.add_argument("--lines", type=int, default=20000, help="จำนวนข้อความต่อสตรีม")
+    ap.add_argument("--chunk", type=int, default=32, help="ขนาด chunk ต่อการ read (bytes)")
+    ap.add_argument("--budget-pct", type=float, default=DEFAULT_BUDGET_PCT,
+                    help="cpu%% สูงสุดที่ joystick 1 kHz ใช้ได้")
+    args = ap.parse_args(argv)
+
+    results = run(args)
+    extra = {"lines": args.lines, "chunk": args.chunk, "seed": SEED}
+    rc = bench_common.finish(args, "serial", results, extra, columns=SERIAL_COLUMNS)
+
+    over = [name for name, r in results.items() if r["cpu_pct_1khz"] > args.budget_pct]
+    if over:
+        print(f"❌ 1 kHz เกินงบ {args.budget_pct}% cpu: {', '.join(over)}")
+        return 1
+    print(f"✅ ทุกตัวรับ 1 kHz ได้ภายใน {args.budget_pct}% cpu")
+    return rc
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
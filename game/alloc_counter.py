@@ -0,0 +1,121 @@
+# alloc_counter.py
+# ตัวนับการสร้าง Surface ใหม่ต่อเฟรม ใช้พิสูจน์ว่า loop ช่วง steady-state ไม่ allocate Surface
+#   python alloc_counter.py   -> exit 1 ถ้าเฟรมไหนหลังเฟรมแรกสร้าง Surface ใหม่ หรือโหลดศัตรูชนิดไหนไม่ได้
+import sys
+
+import pygame
+
+# ฟังก์ชันใน pygame.transform ที่คืน Surface ใหม่ทุกครั้ง
+_TRANSFORM_FUNCS = (
+    "flip", "scale", "scale_by", "smoothscale", "smoothscale_by",
+    "rotate", "rotozoom", "scale2x",
+)
+
+# method ของ Surface ที่คืน Surface ใหม่ (type ของ pygame แก้ attribute ไม่ได้ -> จับผ่าน sys.setprofile)
+_SURFACE_METHODS = frozenset(("copy", "subsurface", "convert", "convert_alpha"))
+
+
+class SurfaceAllocCounter:
+    """
+    ระหว่าง with-block จะนับ:
+      - pygame.Surface(...)
+      - pygame.transform.<flip/scale/...>(...)
+      - pygame.image.load(...)
+      - surface.copy() / subsurface() / convert() / convert_alpha()
+    เรียก mark_frame() ท้ายทุกเฟรม -> per_frame เก็บจำนวนที่เกิดในเฟรมนั้น
+    (ฟังก์ชันนับเฉพาะการเรียกผ่านชื่อโมดูล pygame.* ซึ่งเป็นแบบที่โค้ดเกมใช้อยู่ทั้งหมด
+     ส่วน method นับผ่าน sys.setprofile ของ thread นี้ -> ช้าลง ใช้ตอนวัดเท่านั้น)
+    """
+    def __init__(self):
+        self.count = 0
+        self.per_frame = []
+        self._frame_start = 0
+        self._saved = []
+        self._prev_profile = None
+
+    def _profile(self, frame, event, arg):
+        if event == "c_call" and getattr(arg, "__name__", None) in _SURFACE_METHODS \
+                and isinstance(getattr(arg, "__self__", None), self._base_surface):
+            self.count += 1
+
+    def _wrap(self, fn):
+        def counted(*args, **kwargs):
+            self.count += 1
+            return fn(*args, **kwargs)
+        return counted
+
+    def __enter__(self):
+        counter = self
+        base = pygame.Surface
+
+        class _CountingSurface(base):
+            def __init__(self, *args, **kwargs):
+                counter.count += 1
+                super().__init__(*args, **kwargs)
+
+        self._saved = [(pygame, "Surface", base), (pygame.image, "load", pygame.image.load)]
+        for name in _TRANSFORM_FUNCS:
+            fn = getattr(pygame.transform, name, None)
+            if fn is not None:
+                self._saved.append((pygame.transform, name, fn))
+
+        pygame.Surface = _CountingSurface
+        self._base_surface = base
+        self._prev_profile = sys.getprofile()
+        sys.setprofile(self._profile)
+        pygame.image.load = self._wrap(pygame.image.load)
+        for mod, name, fn in self._saved[2:]:
+            setattr(mod, name, self._wrap(fn))
+        self._frame_start = self.count
+        return self
+
+    def __exit__(self, *exc):
+        sys.setprofile(self._prev_profile)
+        for mod, name, fn in self._saved:
+            setattr(mod, name, fn)
+        self._saved = []
+        return False
+
+    def mark_frame(self):
+        self.per_frame.append(self.count - self._frame_start)
+        self._frame_start = self.count
+
+    def reset(self):
+        self.count = 0
+        self.per_frame = []
+        self._frame_start = 0
+
+
+if __name__ == "__main__":
+    # เช็ก: ศัตรูทุกชนิดเดิน/ยืน 10 วินาทีเกม ต้องไม่มี Surface ใหม่หลังเฟรมแรก (ไม่ผ่าน = exit 1)
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))   # asset อ้าง path จากโฟลเดอร์ game/
+    pygame.init()
+    pygame.display.set_mode((960, 540))
+    from enemy import Enemy, CHAR_CONFIGS
+    from player import Player
+
+    player = Player("wizard", (500, 440))
+    enemies = []
+    for etype in CHAR_CONFIGS:
+        try:
+            enemies.append(Enemy(etype, pos=(900, 440)))
+        except FileNotFoundError as e:
+            print(f"❌ โหลดศัตรู {etype} ไม่ได้: {e}")
+            sys.exit(1)
+
+    with SurfaceAllocCounter() as counter:
+        for _ in range(600):
+            for e in enemies:
+                e.update(player, 16)
+            counter.mark_frame()
+
+    total = sum(counter.per_frame)
+    print(f"Surface allocations: {total} in {len(counter.per_frame)} frames "
+          f"(max/frame {max(counter.per_frame)})")
+    bad = [i for i, n in enumerate(counter.per_frame) if i > 0 and n > 0]
+    if bad:
+        print(f"❌ มี Surface ใหม่หลังเฟรมแรก {len(bad)} เฟรม (เฟรมแรกที่เจอ: {bad[0]})")
+        sys.exit(1)
+    print("✅ ไม่มี Surface ใหม่หลังเฟรมแรก")
@@ -0,0 +1,60 @@
+# anim_clock.py
+# นาฬิกาแอนิเมชันกลางของทุก sprite: เดินเฟรมตามเวลาจริง (ms) แทน frame_index += anim_speed ต่อ tick
+# -> ความเร็วแอนิเมชันเท่าเดิมไม่ว่าจะเรียก update ถี่แค่ไหน (ลด FPS ประหยัดไฟ / เฟรมตกตอนเครื่องหนัก)
+#
+# ค่า anim_speed ใน config เดิมเป็น "เฟรมต่อ tick ที่ 60 tick/วินาที" -> fps = anim_speed * ANIM_REF_HZ
+from fixed_step import SIM_HZ, STEP_MS
+
+ANIM_REF_HZ = SIM_HZ
+DEFAULT_DT_MS = STEP_MS       # update ที่ไม่ส่ง dt มา = 1 tick
+
+
+def speed_to_fps(anim_speed):
+    return anim_speed * ANIM_REF_HZ
+
+
+class Animator:
+    """
+    ตัวนับเฟรมของท่าเดียว:
+      mode "loop" วนซ้ำไปเรื่อย ๆ
+      mode "once" เล่นรอบเดียวแล้วค้างเฟรมสุดท้าย, advance() คืน True (just_finished) ในจังหวะที่จบ
+    """
+
+    __slots__ = ("fps", "mode", "frame_index", "done", "just_finished")
+
+    def __init__(self, fps=10.0, mode="loop"):
+        self.fps = fps
+        self.mode = mode
+        self.restart()
+
+    def play(self, fps, mode="loop"):
+        """เริ่มท่าใหม่ตั้งแต่เฟรม 0"""
+        self.fps = fps
+        self.mode = mode
+        self.restart()
+
+    def restart(self):
+        self.frame_index = 0.0
+        self.done = False
+        self.just_finished = False
+
+    def advance(self, dt_ms, n_frames):
+        """เดินเวลา dt_ms (None = 1 tick) บนท่าที่มี n_frames เฟรม คืน True ถ้าท่า once เพิ่งจบในรอบนี้"""
+        self.just_finished = False
+        if n_frames <= 0 or self.done:
+            return False
+        if dt_ms is None:
+            dt_ms = DEFAULT_DT_MS
+        self.frame_index += self.fps * dt_ms / 1000.0
+        if self.frame_index >= n_frames:
+            if self.mode == "loop":
+                self.frame_index %= n_frames
+            else:
+                self.frame_index = n_frames - 1
+                self.done = True
+                self.just_finished = True
+        return self.just_finished
+
+    @property
+    def index(self):
+        return int(self.frame_index)
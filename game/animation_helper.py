@@ -1,7 +1,13 @@
 import pygame, os
+import frame_store
+import atlas
 
-def slice_by_alpha_regions(path, expected=None):
-    sheet = pygame.image.load(path).convert_alpha()
+try:
+    import numpy as np
+except ImportError:
+    np = None  # ไม่มี NumPy -> ใช้ลูป get_at แบบเดิม
+
+def _alpha_segments_loop(sheet):
     sw, sh = sheet.get_width(), sheet.get_height()
 
     def col_has_pixel(x):
@@ -21,6 +27,37 @@ def slice_by_alpha_regions(path, expected=None):
             segments.append((run_start, x))
     if in_run:
         segments.append((run_start, sw))
+    return segments
+
+def _alpha_segments_numpy(sheet):
+    """อ่าน alpha ทั้งชีตครั้งเดียว แล้วหาคอลัมน์ว่างด้วย NumPy (ขอบเขตเหมือนลูปเดิมทุกไบต์)"""
+    alpha = pygame.surfarray.pixels_alpha(sheet)   # shape (w, h), ล็อก surface ไว้
+    try:
+        nonempty = alpha.any(axis=1)
+    finally:
+        del alpha                                  # ปลดล็อกก่อน subsurface
+    # ขอบ run: จุดที่ค่าเปลี่ยน 0->1 (start) และ 1->0 (end)
+    edges = np.diff(np.concatenate(([False], nonempty, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return [(int(a), int(b)) for a, b in zip(starts, ends)]
+
+def _alpha_segments(sheet):
+    if np is not None:
+        try:
+            return _alpha_segments_numpy(sheet)
+        except Exception:
+            pass  # surface แบบที่ surfarray อ่านไม่ได้ -> ลูปเดิม
+    return _alpha_segments_loop(sheet)
+
+def slice_by_alpha_regions(path, expected=None):
+    sheet = pygame.image.load(path).convert_alpha()
+    return slice_sheet_by_alpha(sheet, expected=expected)
+
+def slice_sheet_by_alpha(sheet, expected=None):
+    """เหมือน slice_by_alpha_regions แต่รับ Surface ที่โหลด (และ convert_alpha) มาแล้ว"""
+    sh = sheet.get_height()
+    segments = _alpha_segments(sheet)
 
     raw_frames = []
     for sx, ex in segments:
@@ -58,19 +95,108 @@ def align_and_pad(frames, anchor="midbottom"):
         aligned.append(canvas)
     return aligned
 
-def _load_animation_single(path, scale=3.0, expected=None):
+def _load_animation_single(path, scale=3.0, expected=None, anchor="midbottom"):
     frames = slice_by_alpha_regions(path, expected=expected)
-    frames = align_and_pad(frames, anchor="midbottom")
+    return _align_and_scale(frames, scale, anchor)
+
+def _align_and_scale(frames, scale, anchor):
+    frames = align_and_pad(frames, anchor=anchor)
     if scale != 1.0 and frames:
         frames = [pygame.transform.scale_by(f, scale) for f in frames]
     return frames
 
-def load_animation_with_fallback(paths, scale=3.0, expected=None):
+def frames_from_sheet(sheet, scale=3.0, expected=None, anchor="midbottom"):
+    """slice + align + scale จากชีตที่ decode แล้ว (เช่นจาก thread preloader) ผลเหมือน _load_animation_single"""
+    frames = slice_sheet_by_alpha(sheet.convert_alpha(), expected=expected)
+    return _align_and_scale(frames, scale, anchor)
+
+def _load_animation_persisted(path, scale=3.0, expected=None, anchor="midbottom"):
+    """ลองอ่านจากแคชดิสก์ก่อน (frame_store) ไม่มีค่อย slice ใหม่แล้วบันทึกไว้"""
+    if not frame_store.enabled():
+        return _load_animation_single(path, scale=scale, expected=expected, anchor=anchor)
+    key = frame_store.entry_key(path, (float(scale), expected, anchor))
+    frames = frame_store.load(key)
+    if frames is None:
+        frames = _load_animation_single(path, scale=scale, expected=expected, anchor=anchor)
+        frame_store.save(key, frames)
+    return frames
+
+# ----- แคชเฟรมกลางของทั้งโปรเซส -----
+# key = (path, scale, expected, anchor) -> list ของ Surface (ใช้ร่วมกัน ห้ามแก้ไขเฟรมตรง ๆ)
+_FRAME_CACHE = {}
+_FRAME_CACHE_STATS = {"hits": 0, "misses": 0}
+# เฟรมกลับด้านซ้าย-ขวา สร้างครั้งเดียวต่อชุดเฟรม (key = id ของ list ในแคช, เก็บตัว list ไว้กัน id ซ้ำ)
+_MIRROR_CACHE = {}
+
+def _cache_key(path, scale, expected, anchor):
+    return (os.path.normpath(path), float(scale), expected, anchor)
+
+def load_frames_cached(path, scale=3.0, expected=None, anchor="midbottom"):
+    """โหลดเฟรมผ่านแคชกลาง: spawn ตัวที่สองของชนิดเดิมเหลือแค่ dict lookup"""
+    key = _cache_key(path, scale, expected, anchor)
+    frames = _FRAME_CACHE.get(key)
+    if frames is not None:
+        _FRAME_CACHE_STATS["hits"] += 1
+        return frames
+    _FRAME_CACHE_STATS["misses"] += 1
+    # ลำดับ: atlas (subsurface) -> แคชดิสก์ -> slice จาก PNG
+    frames = atlas.lookup(path, scale, expected, anchor)
+    if frames is None:
+        frames = _load_animation_persisted(path, scale=scale, expected=expected, anchor=anchor)
+    _FRAME_CACHE[key] = frames
+    return frames
+
+def is_frames_cached(path, scale=3.0, expected=None, anchor="midbottom"):
+    return _cache_key(path, scale, expected, anchor) in _FRAME_CACHE
+
+def put_frames_cached(path, frames, scale=3.0, expected=None, anchor="midbottom"):
+    """ใส่เฟรมที่เตรียมไว้แล้ว (จาก preloader) ลงแคชกลาง ถ้ามีอยู่แล้วไม่ทับ"""
+    _FRAME_CACHE.setdefault(_cache_key(path, scale, expected, anchor), frames)
+
+def resolve_asset_path(paths):
+    """path แรกที่มีไฟล์จริง (ตัวเดียวกับที่ load_animation_with_fallback จะเลือก)"""
+    for p in paths:
+        if os.path.exists(p):
+            return p
+    return None
+
+def _surface_bytes(surf):
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+def frame_cache_stats():
+    """สถิติแคช: hits / misses / entries / frames / bytes (หน่วยความจำพิกเซลรวม)"""
+    frames = [f for fl in _FRAME_CACHE.values() for f in fl]
+    mirrored = [f for _, fl in _MIRROR_CACHE.values() for f in fl]
+    return {
+        "hits": _FRAME_CACHE_STATS["hits"],
+        "misses": _FRAME_CACHE_STATS["misses"],
+        "entries": len(_FRAME_CACHE),
+        "frames": len(frames),
+        "mirrored_frames": len(mirrored),
+        "bytes": sum(_surface_bytes(f) for f in frames + mirrored),
+    }
+
+def clear_frame_cache():
+    _FRAME_CACHE.clear()
+    _MIRROR_CACHE.clear()
+    _FRAME_CACHE_STATS["hits"] = 0
+    _FRAME_CACHE_STATS["misses"] = 0
+
+def mirrored_frames(frames):
+    """คืนชุดเฟรมที่ flip แนวนอนแล้ว ใช้ซ้ำได้ทุก instance ไม่ต้อง flip ทุก tick"""
+    hit = _MIRROR_CACHE.get(id(frames))
+    if hit is not None and hit[0] is frames:
+        return hit[1]
+    flipped = [pygame.transform.flip(f, True, False) for f in frames]
+    _MIRROR_CACHE[id(frames)] = (frames, flipped)
+    return flipped
+
+def load_animation_with_fallback(paths, scale=3.0, expected=None, anchor="midbottom"):
     last_err = None
     for p in paths:
         try:
             if os.path.exists(p):
-                return _load_animation_single(p, scale=scale, expected=expected)
+                return load_frames_cached(p, scale=scale, expected=expected, anchor=anchor)
         except Exception as e:
             last_err = e
             continue
@@ -0,0 +1,157 @@
+# app.py
+# ตัวจัดการฉาก (scene manager): Home -> เลือกตัวละคร -> เกม -> Game Over -> Home ในโปรเซสเดียว
+# ใช้หน้าจอ, พอร์ต serial (serial_input) และแคชเฟรมชุดเดียวกันตลอด ไม่ต้อง spawn python ใหม่ทุกหน้า
+#
+# รัน:  python app.py                 (เริ่มที่หน้า Home)
+#       python app.py game wizard     (ข้ามไปหน้าเกมเลย)
+# F3 = เปิด/ปิด profiler overlay (ดู profiler.py)
+import os
+import sys
+from pathlib import Path
+
+import pygame
+
+from fixed_step import FixedStep
+import profiler
+
+W, H = 960, 540
+# อัตราวาดหน้าจอ — ลดได้เพื่อประหยัด CPU โดยความเร็วเกมไม่เปลี่ยน (ฉากเกมเดินด้วย fixed timestep)
+FPS = int(os.environ.get("RINGFIT_RENDER_FPS", "60"))
+
+
+class SceneManager:
+    """
+    ฉากแต่ละหน้าต้องมี:
+      update(dt, events, serial_cmds)  — ลอจิก + input ของเฟรม
+      draw(screen)                     — วาดลงหน้าจอ (คืนลิสต์ rect ได้ ถ้าอยากให้อัปเดตเฉพาะส่วนนั้นแทน flip;
+                                         แล้วต้องมี mark_dirty(rect) รับส่วนที่ manager วาดทับ)
+    และอาจมี enter() / leave() / on_quit() ไว้เปิด-ปิดเพลง ส่งสัญญาณ ฯลฯ
+    ฉากที่ตั้ง fixed_step = True จะถูกเรียก update(STEP_MS, ...) กี่ครั้งก็ได้ต่อเฟรม (0 ครั้งก็ได้)
+    แล้ววาดด้วย draw(screen, alpha) — input ที่มาในเฟรมที่ไม่มี tick จะถูกเก็บไว้ให้ tick ถัดไป
+    การสลับฉาก (go) จะมีผลหลังจบเฟรมปัจจุบัน
+    """
+
+    def __init__(self, screen, clock=None):
+        self.screen = screen
+        self.clock = clock or pygame.time.Clock()
+        self.scene = None
+        self.running = False
+        self._pending = None
+        self._factories = {}
+        self.stepper = FixedStep()
+        self._held_events = []
+        self._held_cmds = []
+
+    def register(self, name, factory):
+        """factory(manager, **kwargs) -> scene"""
+        self._factories[name] = factory
+
+    def go(self, name, **kwargs):
+        self._pending = (name, kwargs)
+
+    def _switch(self, name, kwargs):
+        if self.scene is not None and hasattr(self.scene, "leave"):
+            self.scene.leave()
+        self.scene = self._factories[name](self, **kwargs)
+        self.stepper.reset()
+        self._held_events, self._held_cmds = [], []
+        if hasattr(self.scene, "enter"):
+            self.scene.enter()
+
+    def quit(self):
+        self.running = False
+
+    def run(self, start, fps=FPS, **kwargs):
+        from serial_input import poll_serial_commands
+
+        self._switch(start, kwargs)
+        self.running = True
+        while self.running:
+            profiler.section("wait")
+            dt = self.clock.tick(fps)
+            profiler.section("poll")
+            events = pygame.event.get()
+            if any(e.type == pygame.QUIT for e in events):
+                if hasattr(self.scene, "on_quit"):
+                    self.scene.on_quit()
+                break
+            if any(e.type == pygame.KEYDOWN and e.key == pygame.K_F3 for e in events):
+                profiler.toggle()
+
+            serial_cmds = poll_serial_commands()
+            profiler.section("update")
+            if getattr(self.scene, "fixed_step", False):
+                self._held_events += events
+                self._held_cmds += serial_cmds
+                for _ in range(self.stepper.advance(dt)):
+                    self.scene.update(self.stepper.step_ms, self._held_events, self._held_cmds)
+                    self._held_events, self._held_cmds = [], []
+                    if self._pending is not None or not self.running:
+                        break
+                if not self.running:
+                    break
+                profiler.section("draw")
+                dirty = self.scene.draw(self.screen, self.stepper.alpha)
+            else:
+                self.scene.update(dt, events, serial_cmds)
+                if not self.running:
+                    break
+                profiler.section("draw")
+                dirty = self.scene.draw(self.screen)
+            profiler.section("overlay")
+            overlay_rect = profiler.draw_overlay(self.screen)
+            profiler.section("flip")
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                # ฉากคืนลิสต์ rect มา (dirty rect renderer) -> อัปเดตเฉพาะส่วนที่เปลี่ยน
+                if overlay_rect is not None:
+                    dirty.append(overlay_rect)
+                    self.scene.mark_dirty(overlay_rect)
+                pygame.display.update(dirty)
+            profiler.frame_end()
+
+            if self._pending is not None:
+                name, kw = self._pending
+                self._pending = None
+                self._switch(name, kw)
+
+        if self.scene is not None and hasattr(self.scene, "leave"):
+            self.scene.leave()
+
+
+def build_manager():
+    """เปิดหน้าจอ + ลงทะเบียนทุกฉาก"""
+    os.chdir(Path(__file__).parent)   # asset ทุกไฟล์อ้าง path จากโฟลเดอร์ game/
+    pygame.init()
+    screen = pygame.display.get_surface() or pygame.display.set_mode((W, H))
+
+    from home import HomeScene
+    from character import CharacterSelectScene
+    from main import GameScene, GameOverScene
+
+    manager = SceneManager(screen)
+    manager.register("home", HomeScene)
+    manager.register("character", CharacterSelectScene)
+    manager.register("game", GameScene)
+    manager.register("game_over", GameOverScene)
+    return manager
+
+
+def run(start="home", **kwargs):
+    from serial_input import close_serial
+
+    manager = build_manager()
+    try:
+        manager.run(start, **kwargs)
+    finally:
+        close_serial()
+        profiler.stop_dump()
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "game":
+        run("game", player_class=sys.argv[2] if len(sys.argv) > 2 else "wizard")
+    else:
+        run(sys.argv[1] if len(sys.argv) > 1 else "home")
@@ -0,0 +1,179 @@
+# atlas.py
+# Texture atlas: รวมเฟรมของทุกชีต (ผ่าน slice + align + scale แล้ว) ลง PNG ใหญ่ไม่กี่หน้า + index JSON
+# ตอนรันเกม load_frames_cached จะขอเฟรมจาก atlas ก่อน ได้เป็น subsurface ของหน้า atlas เลย
+#
+# สร้าง atlas (offline, รันจากโฟลเดอร์ game/):
+#     python atlas.py
+import os
+import json
+import pygame
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+# ค่าเริ่มต้นอ้างจากโฟลเดอร์ game/ (ไม่ขึ้นกับ cwd ของคนเรียก), "" = ไม่ใช้ atlas
+ATLAS_DIR = os.environ.get("RINGFIT_ATLAS_DIR", os.path.join(GAME_DIR, "graphics", "atlas"))
+INDEX_NAME = "atlas.json"
+FORMAT_VERSION = 1
+PAGE_SIZE = 4096
+PADDING = 1
+
+# ชีตที่ไม่ได้อยู่ใน CHAR_CONFIGS (ตรงกับที่ main.py ใช้สร้าง Guide / Coin)
+EXTRA_SHEETS = [
+    ("graphics/guide/collect_coin.png", 4.0),
+    ("graphics/guide/squeeze.png", 4.0),
+    ("graphics/guide/wizard_attack.png", 4.0),
+    ("graphics/guide/swordman_attack.png", 4.0),
+    ("graphics/guide/squat.png", 4.0),
+    ("graphics/items/Coin.png", 2.0),
+]
+
+
+def sheet_key(path, scale, expected=None, anchor="midbottom"):
+    return f"{os.path.normpath(path)}|{float(scale)}|{expected}|{anchor}"
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+# ---------- runtime ----------
+_pages = None    # list ของ Surface หน้า atlas
+_sheets = None   # key -> {"stamp": [...], "frames": [[page, x, y, w, h], ...]}
+
+
+def _load_index():
+    global _pages, _sheets
+    _pages, _sheets = [], {}
+    if not ATLAS_DIR:
+        return
+    index_path = os.path.join(ATLAS_DIR, INDEX_NAME)
+    if not os.path.exists(index_path):
+        return
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != FORMAT_VERSION:
+            return
+        pages = []
+        for name in index["pages"]:
+            page = pygame.image.load(os.path.join(ATLAS_DIR, name))
+            pages.append(page.convert_alpha() if pygame.display.get_surface() else page)
+        _pages, _sheets = pages, index["sheets"]
+    except Exception as e:
+        print("⚠️ โหลด atlas ไม่ได้ ใช้ชีตเดิมแทน:", e)
+        _pages, _sheets = [], {}
+
+
+def lookup(path, scale, expected=None, anchor="midbottom"):
+    """คืน list ของ subsurface จาก atlas หรือ None ถ้าไม่มี/ชีตต้นฉบับเปลี่ยนไปแล้ว"""
+    if _sheets is None:
+        _load_index()
+    entry = _sheets.get(sheet_key(path, scale, expected, anchor))
+    if entry is None:
+        return None
+    try:
+        if _source_stamp(path) != entry["stamp"]:
+            return None  # PNG ต้นฉบับถูกแก้หลัง build -> ให้ path ปกติโหลดใหม่
+    except OSError:
+        return None
+    return [_pages[pg].subsurface(pygame.Rect(x, y, w, h)) for pg, x, y, w, h in entry["frames"]]
+
+
+def reset():
+    """ลืม atlas ที่โหลดไว้ (ใช้หลัง build ใหม่)"""
+    global _pages, _sheets
+    _pages = _sheets = None
+
+
+# ---------- offline builder ----------
+def _shelf_pack(sizes, page_size=PAGE_SIZE, pad=PADDING):
+    """
+    shelf packing แบบง่าย: เรียงตามความสูงมากไปน้อย วางเป็นแถว ๆ
+    sizes: list ของ (w, h) -> คืน list ของ (page, x, y) ตามลำดับเดิม และจำนวนหน้า
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    places = [None] * len(sizes)
+    page, x, y, shelf_h = 0, 0, 0, 0
+    for i in order:
+        w, h = sizes[i]
+        if w > page_size or h > page_size:
+            raise ValueError(f"frame {w}x{h} ใหญ่กว่าหน้า atlas {page_size}")
+        if x + w > page_size:               # ขึ้นแถวใหม่
+            x, y, shelf_h = 0, y + shelf_h + pad, 0
+        if y + h > page_size:               # ขึ้นหน้าใหม่
+            page, x, y, shelf_h = page + 1, 0, 0, 0
+        places[i] = (page, x, y)
+        x += w + pad
+        shelf_h = max(shelf_h, h)
+    return places, (page + 1 if sizes else 0)
+
+
+def collect_sheets():
+    """รวมทุกชีตที่เกมโหลด: (path, scale) จาก CHAR_CONFIGS ของ player/enemy + EXTRA_SHEETS"""
+    import player
+    import enemy
+    sheets = []
+    for configs in (player.CHAR_CONFIGS, enemy.CHAR_CONFIGS):
+        for cfg in configs.values():
+            for paths in cfg["assets"].values():
+                for p in paths:
+                    sheets.append((p, cfg["scale"]))
+    sheets += EXTRA_SHEETS
+    seen, unique = set(), []
+    for p, sc in sheets:
+        k = sheet_key(p, sc)
+        if k not in seen and os.path.exists(p):
+            seen.add(k)
+            unique.append((p, sc))
+    return unique
+
+
+def build_atlas(sheets, out_dir=ATLAS_DIR, page_size=PAGE_SIZE):
+    """slice + align + scale ทุกชีต แล้วเขียนหน้า atlas PNG + atlas.json"""
+    from animation_helper import _load_animation_single
+
+    loaded = []   # (key, stamp, frames)
+    for path, scale in sheets:
+        frames = _load_animation_single(path, scale=scale)
+        loaded.append((sheet_key(path, scale), _source_stamp(path), frames))
+
+    sizes = [f.get_size() for _, _, frames in loaded for f in frames]
+    places, n_pages = _shelf_pack(sizes, page_size)
+
+    # ตัดหน้าให้พอดีเนื้อหา ไม่ต้องเต็ม page_size
+    extents = [[0, 0] for _ in range(n_pages)]
+    for (w, h), (pg, x, y) in zip(sizes, places):
+        extents[pg][0] = max(extents[pg][0], x + w)
+        extents[pg][1] = max(extents[pg][1], y + h)
+    pages = [pygame.Surface(ext, pygame.SRCALPHA) for ext in extents]
+
+    index = {"version": FORMAT_VERSION, "pages": [], "sheets": {}}
+    i = 0
+    for key, stamp, frames in loaded:
+        rects = []
+        for f in frames:
+            pg, x, y = places[i]
+            pages[pg].blit(f, (x, y))
+            rects.append([pg, x, y, f.get_width(), f.get_height()])
+            i += 1
+        index["sheets"][key] = {"stamp": stamp, "frames": rects}
+
+    os.makedirs(out_dir, exist_ok=True)
+    for n, page in enumerate(pages):
+        name = f"atlas_{n}.png"
+        pygame.image.save(page, os.path.join(out_dir, name))
+        index["pages"].append(name)
+    with open(os.path.join(out_dir, INDEX_NAME), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    reset()
+    return index
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    sheets = collect_sheets()
+    index = build_atlas(sheets)
+    n_frames = sum(len(s["frames"]) for s in index["sheets"].values())
+    print(f"✅ atlas: {len(sheets)} sheets, {n_frames} frames -> {len(index['pages'])} pages in {ATLAS_DIR}")
@@ -1,28 +1,33 @@
 import pygame
-from animation_helper import slice_by_alpha_regions, align_and_pad
+from animation_helper import load_frames_cached
+from sprite_pool import PooledSprite
+from anim_clock import Animator, speed_to_fps
 
-class Coin(pygame.sprite.Sprite):
+class Coin(PooledSprite):
     def __init__(self, pos, sprite_sheet_path, scale=2.0):
         super().__init__()
-        raw_frames = slice_by_alpha_regions(sprite_sheet_path)
-        frames = align_and_pad(raw_frames)
-        
-        # scale frames
-        self.frames = [pygame.transform.scale(f, (int(f.get_width()*scale), int(f.get_height()*scale))) for f in frames]
-        
+        # slice + align + scale ผ่านแคชกลาง (เหรียญทุกเหรียญใช้เฟรมชุดเดียวกัน)
+        self.frames = load_frames_cached(sprite_sheet_path, scale=scale)
+
         if not self.frames:
             self.frames = [pygame.Surface((24,24), pygame.SRCALPHA)]
             pygame.draw.circle(self.frames[0], (255,215,0), (12,12), 12)
 
-        self.frame_index = 0.0
         self.anim_speed = 0.07
+        self.anim = Animator(speed_to_fps(self.anim_speed))
         self.image = self.frames[0]
         self.rect = self.image.get_rect(center=pos)
+        self.reset(pos)
+
+    def reset(self, pos):
+        """เริ่มใหม่ที่ pos (ใช้ตอนดึงจาก pool)"""
+        self.anim.restart()
+        self.image = self.frames[0]
+        self.rect.size = self.image.get_size()
+        self.rect.center = pos
 
 
-    def update(self):
-        # animate: frame_index เพิ่มทีละ anim_speed
-        self.frame_index += self.anim_speed
-        if self.frame_index >= len(self.frames):
-            self.frame_index = 0.0
-        self.image = self.frames[int(self.frame_index)]
+    def update(self, dt_ms=None):
+        # animate ตามเวลาจริง (ไม่ส่ง dt = 1 tick)
+        self.anim.advance(dt_ms, len(self.frames))
+        self.image = self.frames[self.anim.index]
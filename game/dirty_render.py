@@ -0,0 +1,80 @@
+# dirty_render.py
+# วาดฉากเกมแบบ dirty rectangle: ถ้าฉากหลังนิ่ง (ไม่เดิน = parallax/props ไม่เลื่อน เช่นตอนรอเก็บเหรียญ, รอกระโดด)
+# เก็บฉากหลังไว้เป็น surface เดียว แล้วแต่ละเฟรมแค่ลบ sprite/HUD เดิมด้วยฉากหลัง + วาดใหม่ + display.update(rects)
+# พอฉากหลังเลื่อน (parallax scroll) กลับไปวาดเต็มจอ + flip เหมือนเดิม
+#
+#   RINGFIT_DIRTY_RECTS=1 python app.py
+import os
+
+import pygame
+
+import profiler
+
+
+def dirty_rects_enabled():
+    return os.environ.get("RINGFIT_DIRTY_RECTS", "0") not in ("", "0")
+
+
+class DirtyRenderer:
+    """
+    ฉากต้องมี backdrop_key(alpha), draw_backdrop(surface, alpha),
+    draw_actors(screen, alpha) -> rects, draw_hud(screen) -> rects, draw_pause(screen)
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.background = None
+        self.bg_key = None          # key ของฉากหลังที่อยู่ใน self.background
+        self.last_key = None        # key ของเฟรมก่อน (นิ่ง 2 เฟรมติดกันค่อยสร้างฉากหลัง)
+        self.prev_rects = []        # สิ่งที่วาดทับฉากหลังในเฟรมก่อน -> ต้องลบเฟรมนี้
+        self.stats = {"full": 0, "dirty": 0, "pixels": 0}
+
+    def mark_dirty(self, rect):
+        if rect is not None and self.bg_key is not None:
+            self.prev_rects.append(pygame.Rect(rect))
+
+    def _full(self, scene, screen, alpha, key):
+        profiler.section("draw_world")
+        if key is not None and key == self.last_key:
+            # ฉากหลังนิ่งแล้ว: สร้างเก็บไว้ครั้งเดียว แล้วเฟรมถัดไปใช้ dirty rect
+            if self.background is None:
+                self.background = pygame.Surface(self.size).convert()
+            scene.draw_backdrop(self.background, alpha)
+            screen.blit(self.background, (0, 0))
+            self.bg_key = key
+        else:
+            scene.draw_backdrop(screen, alpha)
+            self.bg_key = None
+        rects = scene.draw_actors(screen, alpha)
+        profiler.section("draw_hud")
+        rects += scene.draw_hud(screen)
+        profiler.section("draw_pause")
+        scene.draw_pause(screen)
+        profiler.end_section()
+        self.prev_rects = rects
+        self.last_key = key
+        self.stats["full"] += 1
+        return None
+
+    def draw(self, scene, screen, alpha=1.0):
+        """คืน None = flip ทั้งจอ หรือคืนลิสต์ rect ที่ต้อง display.update"""
+        key = scene.backdrop_key(alpha)
+        if key is None or key != self.bg_key:
+            return self._full(scene, screen, alpha, key)
+
+        profiler.section("draw_world")
+        bg = self.background
+        old = self.prev_rects
+        for r in old:
+            screen.blit(bg, r, r)
+        rects = scene.draw_actors(screen, alpha)
+        profiler.section("draw_hud")
+        rects += scene.draw_hud(screen)
+        profiler.end_section()
+
+        self.prev_rects = rects
+        self.last_key = key
+        dirty = old + rects
+        self.stats["dirty"] += 1
+        self.stats["pixels"] += sum(r.w * r.h for r in dirty)
+        return dirty
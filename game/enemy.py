@@ -1,6 +1,9 @@
 # enemy.py
 import pygame
-from animation_helper import load_animation_with_fallback, _ensure_animation_safety
+from animation_helper import load_animation_with_fallback, _ensure_animation_safety, mirrored_frames
+from anim_clock import Animator, speed_to_fps
+
+ONE_SHOT_STATES = ("attack", "hit", "death")   # เล่นรอบเดียวแล้วแจ้ง just_finished
 
 CHAR_CONFIGS = {
     "mushroom": {
@@ -58,7 +61,7 @@ CHAR_CONFIGS = {
             "idle": ["graphics/enemy/evil/Idle.png"],
             "run":  ["graphics/enemy/evil/Run.png"],
             "attack": ["graphics/enemy/evil/Attack2.png"],
-            "hit":  ["graphics/enemy/evil/Take Hit.png"],
+            "hit":  ["graphics/enemy/evil/Take hit.png"],
             "death":["graphics/enemy/evil/Death.png"],
         },
         "anim_speed": {"idle":0.18,"run":0.24,"attack":0.22,"hit":0.18,"death":0.18},
@@ -151,10 +154,13 @@ class Enemy(pygame.sprite.Sprite):
         self.animations = {state: load_animation_with_fallback(paths, scale=cfg["scale"])
                            for state, paths in cfg["assets"].items()}
         _ensure_animation_safety(self.animations)
+        # ชุดเฟรมหันซ้าย (facing == -1 เป็นกรณีปกติ) เตรียมไว้ครั้งเดียว
+        self.animations_flipped = {state: mirrored_frames(frames)
+                                   for state, frames in self.animations.items()}
         self.anim_speed = cfg.get("anim_speed", {"idle":0.18, "run":0.24, "attack":0.22, "hit":0.18, "death":0.18})
 
         self.state = "run"
-        self.frame_index = 0.0
+        self.anim = Animator(self._state_fps("run"))
         self.image = self.animations[self.state][0]
         spawn_y_offset = int(cfg.get("spawn_y_offset", 0))
         self.rect = self.image.get_rect(midbottom=(pos[0], pos[1] + spawn_y_offset))
@@ -164,7 +170,10 @@ class Enemy(pygame.sprite.Sprite):
             return
         if self.state != state:
             self.state = state
-            self.frame_index = 0.0
+            self.anim.play(self._state_fps(state), "once" if state in ONE_SHOT_STATES else "loop")
+
+    def _state_fps(self, state):
+        return speed_to_fps(self.anim_speed.get(state, 0.18))
 
     def start_challenge(self, player):
         self.challenge_ms_left = self.challenge_ms_total
@@ -187,33 +196,25 @@ class Enemy(pygame.sprite.Sprite):
         else:
             self.set_state("idle")
 
-    def animate(self):
+    def animate(self, dt_ms=None):
         self.just_finished = None
         frames = self.animations.get(self.state) or [_dummy_frame()]
-        end = len(frames)
-        if end == 0: return
+        if not frames: return
 
-        self.frame_index += self.anim_speed.get(self.state, 0.18)
-
-        if self.state in ("hit", "attack"):
-            if self.frame_index >= end:
-                self.frame_index = 0.0
-                self.just_finished = self.state
+        if self.anim.advance(dt_ms, len(frames)):
+            self.just_finished = self.state
+            if self.state == "death":
+                self.kill()
+            else:
+                # hit/attack จบ: เริ่มท่าเดิมใหม่ (ถ้ายังดวลอยู่ think() จะเปลี่ยนเป็น idle เอง)
+                self.anim.restart()
                 self.locked = False
                 if not self.dead and self.challenge_ms_left is None:
                     self.set_state("idle")
-        elif self.state == "death":
-            if self.frame_index >= end:
-                self.frame_index = end-1
-                self.just_finished = "death"
-                self.kill()
-        else:
-            if self.frame_index >= end:
-                self.frame_index = 0.0
+                    frames = self.animations.get(self.state) or [_dummy_frame()]
 
-        surf = frames[int(self.frame_index)]
-        if self.facing == -1:
-            surf = pygame.transform.flip(surf, True, False)
+        table = self.animations_flipped if self.facing == -1 else self.animations
+        surf = (table.get(self.state) or frames)[self.anim.index]
         midbottom = self.rect.midbottom
         self.image = surf
         self.rect = self.image.get_rect(midbottom=midbottom)
@@ -225,7 +226,7 @@ class Enemy(pygame.sprite.Sprite):
             self.shoot_cd_ms = max(0, self.shoot_cd_ms - dt_ms)
 
         self.think(player, dt_ms)
-        self.animate()
+        self.animate(dt_ms)
 
     # ★ ยิงกระสุน (เมธอดว่างสำหรับศัตรูทั่วไป / มีลอจิกสำหรับตัวที่ยิงได้)
     def shoot_tick(self, player, dt_ms, projectile_group, ProjectileClass):
@@ -242,7 +243,7 @@ class Enemy(pygame.sprite.Sprite):
         # เล่นแอนิเมชันโจมตีสั้น ๆ
         self.locked = True
         self.set_state("attack")
-        self.frame_index = 0.0
+        self.anim.restart()
 
         # จุดเริ่มกระสุน (ยิงซ้าย)
         dir_x = -1
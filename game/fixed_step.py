@@ -0,0 +1,58 @@
+# fixed_step.py
+# จำลองเกมด้วย timestep คงที่ (SIM_HZ) แยกจากอัตราการวาด
+# ค่าความเร็วทุกตัวในเกม (gravity 0.8/tick, enemy speed, coin 10px/tick, anim_speed ...) จูนไว้ที่ 60 tick/วินาที
+# -> เดิน simulation ทีละ STEP_MS เสมอ ไม่ว่าจะวาดที่ 30, 60 หรือ 144 FPS แล้ววาดตำแหน่งแบบ interpolate ระหว่าง 2 tick
+SIM_HZ = 60
+STEP_MS = 1000.0 / SIM_HZ
+MAX_STEPS_PER_FRAME = 5       # เครื่องช้ามาก ๆ: ยอมให้เกมช้าลงดีกว่าวนไล่ tick ไม่จบ (spiral of death)
+MAX_LERP_PX = 200             # ขยับเกินนี้ใน tick เดียว = วาร์ป/เกิดใหม่ ไม่ต้อง interpolate
+
+
+class FixedStep:
+    """ตัวสะสมเวลา: advance(ms ของเฟรมที่วาด) คืนจำนวน tick ที่ต้องเดิน, alpha = เศษที่เหลือ (0..1)"""
+
+    def __init__(self, hz=SIM_HZ, max_steps=MAX_STEPS_PER_FRAME):
+        self.step_ms = 1000.0 / hz
+        self.max_steps = max_steps
+        self.acc = 0.0
+        self.dropped_ms = 0.0     # เวลาที่ทิ้งไปเพราะเกิน max_steps
+
+    def advance(self, frame_ms):
+        self.acc += frame_ms
+        steps = int(self.acc // self.step_ms)
+        if steps > self.max_steps:
+            self.dropped_ms += (steps - self.max_steps) * self.step_ms
+            self.acc -= (steps - self.max_steps) * self.step_ms
+            steps = self.max_steps
+        self.acc -= steps * self.step_ms
+        return steps
+
+    @property
+    def alpha(self):
+        return self.acc / self.step_ms
+
+    def reset(self):
+        self.acc = 0.0
+
+
+def snapshot_positions(*groups):
+    """{sprite: rect.topleft} ก่อนเดิน tick — ใช้เป็นจุดเริ่มของการ interpolate"""
+    return {spr: spr.rect.topleft for group in groups for spr in group}
+
+
+def lerp(a, b, alpha):
+    return a + (b - a) * alpha
+
+
+def draw_interpolated(screen, group, prev, alpha):
+    """แทน group.draw(screen): วาดแต่ละ sprite ที่ตำแหน่งระหว่าง tick ก่อนหน้ากับ tick ปัจจุบัน คืนลิสต์ rect ที่วาด"""
+    blit = screen.blit
+    rects = []
+    for spr in group:
+        x, y = spr.rect.topleft
+        p = prev.get(spr)
+        if p is not None and abs(x - p[0]) <= MAX_LERP_PX and abs(y - p[1]) <= MAX_LERP_PX:
+            x = round(lerp(p[0], x, alpha))
+            y = round(lerp(p[1], y, alpha))
+        rects.append(blit(spr.image, (x, y)))
+    return rects
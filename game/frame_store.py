@@ -0,0 +1,98 @@
+# frame_store.py
+# แคชเฟรมบนดิสก์: เก็บผล slice + align + scale ของแต่ละชีตเป็นไฟล์ binary ไฟล์เดียว
+# key = hash เนื้อไฟล์ PNG + พารามิเตอร์โหลด -> เปลี่ยนรูปหรือพารามิเตอร์ก็สร้างใหม่เอง
+import os
+import struct
+import hashlib
+import threading
+import pygame
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+# ค่าเริ่มต้นอ้างจากโฟลเดอร์ game/ (ไม่ขึ้นกับ cwd ของคนเรียก), "" = ปิดแคชดิสก์
+CACHE_DIR = os.environ.get("RINGFIT_FRAME_CACHE", os.path.join(GAME_DIR, ".frame_cache"))
+FORMAT_VERSION = 1
+
+_MAGIC = b"RFFC"
+_HEADER = struct.Struct("<4sHI")   # magic, version, จำนวนเฟรม
+_ENTRY = struct.Struct("<HH")      # ตารางดัชนี: w, h ของแต่ละเฟรม
+
+
+def enabled():
+    return bool(CACHE_DIR)
+
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def entry_key(path, params):
+    """ชื่อไฟล์แคช: sha1(เนื้อไฟล์ต้นฉบับ + พารามิเตอร์ + เวอร์ชันรูปแบบ)"""
+    h = hashlib.sha1()
+    h.update(_file_digest(path).encode())
+    h.update(repr((FORMAT_VERSION,) + tuple(params)).encode())
+    return h.hexdigest()
+
+
+def _blob_path(key):
+    return os.path.join(CACHE_DIR, key + ".bin")
+
+
+def pack_frames(frames):
+    """[Surface] -> bytes: header + ตาราง (w,h) + พิกเซล RGBA เรียงต่อกัน"""
+    parts = [_HEADER.pack(_MAGIC, FORMAT_VERSION, len(frames))]
+    parts += [_ENTRY.pack(f.get_width(), f.get_height()) for f in frames]
+    parts += [pygame.image.tobytes(f, "RGBA") for f in frames]
+    return b"".join(parts)
+
+
+def unpack_frames(blob, convert=True):
+    magic, version, count = _HEADER.unpack_from(blob, 0)
+    if magic != _MAGIC or version != FORMAT_VERSION:
+        raise ValueError("frame cache: bad header")
+    off = _HEADER.size
+    sizes = [_ENTRY.unpack_from(blob, off + i * _ENTRY.size) for i in range(count)]
+    off += count * _ENTRY.size
+
+    view = memoryview(blob)
+    convert = convert and pygame.display.get_surface() is not None
+    frames = []
+    for w, h in sizes:
+        n = w * h * 4
+        if off + n > len(blob):
+            raise ValueError("frame cache: truncated blob")
+        surf = pygame.image.frombytes(bytes(view[off:off + n]), (w, h), "RGBA")
+        frames.append(surf.convert_alpha() if convert else surf)
+        off += n
+    return frames
+
+
+def load(key, convert=True):
+    """คืน list เฟรม หรือ None ถ้าไม่มี/ไฟล์เสีย (convert=False ใช้จาก thread อื่นที่ไม่ใช่ main)"""
+    if not enabled():
+        return None
+    try:
+        with open(_blob_path(key), "rb") as f:
+            return unpack_frames(f.read(), convert=convert)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print("⚠️ frame cache อ่านไม่ได้ จะสร้างใหม่:", e)
+        return None
+
+
+def save(key, frames):
+    if not enabled():
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        final = _blob_path(key)
+        tmp = f"{final}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(pack_frames(frames))
+        os.replace(tmp, final)  # เขียนแบบ atomic กันไฟล์ครึ่ง ๆ
+    except Exception as e:
+        print("⚠️ frame cache เขียนไม่ได้:", e)
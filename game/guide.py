@@ -1,5 +1,6 @@
 import pygame
-from animation_helper import slice_by_alpha_regions, align_and_pad
+from animation_helper import load_frames_cached
+from anim_clock import Animator, speed_to_fps
 
 class Guide(pygame.sprite.Sprite):
     def __init__(self, animations_dict, pos, scale=1.0):
@@ -11,18 +12,15 @@ class Guide(pygame.sprite.Sprite):
         super().__init__()
         self.animations = {}
         for key, path in animations_dict.items():
-            # slice sprite sheet เป็น frames
-            raw_frames = slice_by_alpha_regions(path)
-            frames = align_and_pad(raw_frames)
-            if scale != 1.0:
-                frames = [pygame.transform.scale(f, (int(f.get_width()*scale), int(f.get_height()*scale))) for f in frames]
+            # slice sprite sheet เป็น frames (ผ่านแคชกลาง)
+            frames = load_frames_cached(path, scale=scale)
             if not frames:
                 frames = [pygame.Surface((50,50), pygame.SRCALPHA)]
             self.animations[key] = frames
 
         self.state = list(self.animations.keys())[0]  # animation เริ่มต้น
-        self.frame_index = 0.0
-        self.anim_speed = 0.05  # ปรับความเร็ว animation
+        self.anim_speed = 0.05  # ปรับความเร็ว animation (เฟรมต่อ tick ที่ 60Hz)
+        self.anim = Animator(speed_to_fps(self.anim_speed))
         self.image = self.animations[self.state][0]
         self.rect = self.image.get_rect(center=pos)
 
@@ -35,10 +33,10 @@ class Guide(pygame.sprite.Sprite):
         """
         if state in self.animations:
             self.state = state
-            self.frame_index = 0.0
+            self.anim.restart()
 
     def update(self, dt=None):
-            """อัปเดตแอนิเมชัน รองรับ dt (ms)"""
+            """อัปเดตแอนิเมชัน ตามเวลาจริง dt (ms) ไม่ส่งมา = 1 tick"""
             if not self.active:
                 return
 
@@ -46,11 +44,5 @@ class Guide(pygame.sprite.Sprite):
             if not frames:
                 return
 
-            # ถ้าไม่มี dt ให้ขยับปกติ; ถ้ามี dt ให้สเกลตาม 60fps ≈ 16ms/เฟรม
-            time_scale = (dt / 16.0) if dt is not None else 1.0
-            self.frame_index += self.anim_speed * time_scale
-
-            if self.frame_index >= len(frames):
-                self.frame_index = 0.0
-
-            self.image = frames[int(self.frame_index)]
\ No newline at end of file
+            self.anim.advance(dt, len(frames))
+            self.image = frames[self.anim.index]
\ No newline at end of file
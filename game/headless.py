@@ -0,0 +1,269 @@
+# headless.py
+# รัน GameScene แบบไม่มีหน้าต่าง ไม่รอเวลาจริง: เดิน tick ต่อกันเร็วที่สุดเท่าที่เครื่องไหว
+# ใช้ soak test เลเวล 5 (วนไม่รู้จบ) หลายชั่วโมงของเวลาในเกมภายในไม่กี่นาที แล้วดูว่ามี leak / ช้าลงไหม
+#
+#   python headless.py --minutes 60                      (บอทเล่นเองตั้งแต่เลเวล 1 จน 60 นาทีในเกม)
+#   python headless.py --level 5 --immortal --hours 4    (soak เลเวล 5)
+#   python headless.py --replay floor.srl --loop         (input จาก log ของ serial_replay.py)
+#   python headless.py --level 5 --minutes 10 --record logs   (เก็บ session log ไว้เล่นซ้ำด้วย session_log.py)
+import os
+import sys
+import time
+import argparse
+
+# ต้องตั้งก่อน import pygame / serial_input
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("RINGFIT_SERIAL_PORT", os.devnull)   # ไม่แตะบอร์ดจริง
+
+import pygame
+
+from fixed_step import STEP_MS
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+
+class HeadlessManager:
+    """แทน SceneManager: จำแค่ว่าฉากขอไปไหน (game_over / home)"""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.requested = None
+
+    def go(self, name, **kwargs):
+        self.requested = name
+
+    def quit(self):
+        self.requested = "quit"
+
+
+class BotInput:
+    """
+    input แบบสคริปต์: ตอบสนองตามสถานะเกมเหมือนผู้เล่นที่ทำตามไกด์
+    เดิน (D) ตลอด, เก็บเหรียญ (I), กระโดดข้ามอุปสรรค (W), กดปุ่มชาเลนจ์ตามที่เกมต้องการ
+    """
+
+    def __init__(self, walk_every_ms=100, press_every_ms=150):
+        self.walk_every_ms = walk_every_ms
+        self.press_every_ms = press_every_ms
+        self._walk_ms = 0.0
+        self._press_ms = 0.0
+
+    def commands(self, scene, dt):
+        cmds = []
+        p = scene.player_group.sprite
+        self._walk_ms += dt
+        self._press_ms += dt
+        if self._walk_ms >= self.walk_every_ms:
+            self._walk_ms = 0.0
+            cmds.append("D")
+        if getattr(p, "coin_lock", False):
+            cmds.append("I")
+        obstacle = scene.obstacle_group.sprites()[0] if scene.obstacle_group.sprites() else None
+        if getattr(p, "obstacle_lock", False) and obstacle and getattr(obstacle, "state", "") == "wait":
+            cmds.append("W")
+        enemy = scene.enemy_group.sprites()[0] if scene.enemy_group.sprites() else None
+        if enemy and enemy.challenge_ms_left is not None and self._press_ms >= self.press_every_ms:
+            self._press_ms = 0.0
+            cmds.append(scene.challenge_expect_key if scene.level >= 3 else "J")
+        return cmds
+
+
+class ReplayInput:
+    """input จากไฟล์ .srl: ส่งคำสั่งตามเวลาที่บันทึก แต่นับด้วยเวลาในเกม (ไม่ใช่เวลาจริง)"""
+
+    def __init__(self, path, loop=False):
+        from serial_replay import iter_records
+        from serial_lines import LineAssembler, parse_serial_bytes
+
+        assembler = LineAssembler()
+        self.schedule = []      # (ms, [cmd, ...])
+        for ts_ns, data in iter_records(path):
+            cmds = parse_serial_bytes(data, assembler)
+            if cmds:
+                self.schedule.append((ts_ns / 1e6, cmds))
+        self.loop = loop
+        self.span_ms = (self.schedule[-1][0] + STEP_MS) if self.schedule else 0.0
+        self.t_ms = 0.0
+        self.base_ms = 0.0
+        self.idx = 0
+
+    @property
+    def finished(self):
+        return not self.loop and self.idx >= len(self.schedule)
+
+    def commands(self, scene, dt):
+        self.t_ms += dt
+        cmds = []
+        while True:
+            if self.idx >= len(self.schedule):
+                if not self.loop or not self.schedule:
+                    break
+                self.idx = 0
+                self.base_ms += self.span_ms
+            at, batch = self.schedule[self.idx]
+            if self.base_ms + at > self.t_ms:
+                break
+            cmds += batch
+            self.idx += 1
+        return cmds
+
+
+def _rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _sprite_count(scene):
+    return sum(len(g) for g in scene._world_groups())
+
+
+def _kills(scene):
+    return scene.level2_kills + scene.level3_kills + scene.level4_kills + scene.level5_kills_total
+
+
+def run_headless(sim_seconds, player_class="wizard", level=1, source=None, immortal=False,
+                 draw=False, report_every_s=60.0, quiet=True, out=None, record=None):
+    """
+    เดิน GameScene ไป sim_seconds วินาทีของเวลาในเกม (tick ละ STEP_MS) เร็วที่สุดเท่าที่ทำได้
+    ไม่ flip หน้าจอ (และไม่วาดเลย ยกเว้น draw=True) คืน dict สรุปผล
+    record = โฟลเดอร์เก็บ session log (session_log.py) ชีวิตละไฟล์
+    """
+    if record:
+        os.environ["RINGFIT_SESSION_LOG"] = record
+    out = out or sys.stdout
+    pygame.init()
+    screen = pygame.display.get_surface() or pygame.display.set_mode((960, 540))
+
+    # print ของเกม (level up, challenge ...) ช้าและรก เวลารันเป็นล้าน tick
+    devnull = open(os.devnull, "w") if quiet else None
+    real_stdout = sys.stdout
+    if devnull:
+        sys.stdout = devnull
+    try:
+        from main import GameScene
+
+        manager = HeadlessManager(screen)
+        source = source or BotInput()
+
+        def new_scene():
+            scene = GameScene(manager, player_class=player_class)
+            scene.level = level
+            if scene.recorder is not None and immortal:
+                scene.recorder.meta["immortal"] = True
+            return scene
+
+        scene = new_scene()
+        total_ticks = round(sim_seconds * 1000 / STEP_MS)
+        report_ticks = max(1, round(report_every_s * 1000 / STEP_MS))
+        deaths = 0
+        t0 = window_t0 = time.perf_counter()
+        window_ticks = 0
+        history = []
+
+        for tick in range(1, total_ticks + 1):
+            if immortal:
+                p = scene.player_group.sprite
+                p.hp = p.max_hp
+            scene.update(STEP_MS, (), source.commands(scene, STEP_MS))
+            if draw:
+                scene.draw(screen, 1.0)
+            window_ticks += 1
+
+            if manager.requested is not None:
+                if manager.requested == "game_over":
+                    deaths += 1
+                scene.leave()
+                manager.requested = None
+                scene = new_scene()
+
+            if tick % report_ticks == 0:
+                now = time.perf_counter()
+                row = {
+                    "sim_s": tick * STEP_MS / 1000,
+                    "wall_s": now - t0,
+                    "ticks_per_s": window_ticks / max(now - window_t0, 1e-9),
+                    "level": scene.level,
+                    "kills": _kills(scene),
+                    "deaths": deaths,
+                    "sprites": _sprite_count(scene),
+                    "rss_mb": _rss_mb(),
+                }
+                history.append(row)
+                rss = f"{row['rss_mb']:.1f} MB" if row["rss_mb"] is not None else "n/a"
+                print(
+                    f"⏱ sim {row['sim_s']:9.0f}s  wall {row['wall_s']:7.1f}s  "
+                    f"{row['ticks_per_s']:8.0f} tick/s  Lv{row['level']}  kills {row['kills']}  "
+                    f"deaths {deaths}  sprites {row['sprites']}  rss {rss}",
+                    file=out, flush=True,
+                )
+                window_t0, window_ticks = now, 0
+
+            if getattr(source, "finished", False):
+                total_ticks = tick
+                break
+
+        wall = time.perf_counter() - t0
+        scene.leave()
+    finally:
+        sys.stdout = real_stdout
+        if devnull:
+            devnull.close()
+
+    sim = total_ticks * STEP_MS / 1000
+    summary = {
+        "sim_s": sim,
+        "wall_s": wall,
+        "sim_per_wall": sim / wall if wall > 0 else float("inf"),
+        "ticks": total_ticks,
+        "deaths": deaths,
+        "history": history,
+    }
+    print(
+        f"✅ sim {sim:.1f}s in {wall:.1f}s wall -> {summary['sim_per_wall']:.1f} sim-s/wall-s "
+        f"({total_ticks / wall:.0f} tick/s, deaths {deaths})",
+        file=out,
+    )
+    return summary
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="headless, uncapped GameScene simulation")
+    span = ap.add_mutually_exclusive_group()
+    span.add_argument("--seconds", type=float)
+    span.add_argument("--minutes", type=float)
+    span.add_argument("--hours", type=float)
+    ap.add_argument("--player", default="wizard")
+    ap.add_argument("--level", type=int, default=1, help="เริ่มที่เลเวลไหน (5 = soak ลูปบอส)")
+    ap.add_argument("--replay", default=None, help="ไฟล์ .srl จาก serial_replay.py (ไม่ใส่ = บอท)")
+    ap.add_argument("--loop", action="store_true", help="วน replay ซ้ำจนครบเวลา")
+    ap.add_argument("--immortal", action="store_true", help="เติม HP ทุก tick (soak ไม่ต้องเริ่มใหม่)")
+    ap.add_argument("--draw", action="store_true", help="วาดทุก tick ด้วย (ยังไม่ flip) เพื่อรวมต้นทุนการวาด")
+    ap.add_argument("--report-every", type=float, default=60.0, help="พิมพ์สถิติทุกกี่วินาทีของเวลาในเกม")
+    ap.add_argument("--verbose", action="store_true", help="ไม่ปิด print ของเกม")
+    ap.add_argument("--record", default=None, help="โฟลเดอร์เก็บ session log (.rfs) ไว้เล่นซ้ำ/ทำ benchmark")
+    args = ap.parse_args(argv)
+
+    if args.hours is not None:
+        sim_seconds = args.hours * 3600
+    elif args.minutes is not None:
+        sim_seconds = args.minutes * 60
+    else:
+        sim_seconds = args.seconds if args.seconds is not None else 600
+
+    replay = os.path.abspath(args.replay) if args.replay else None
+    record = os.path.abspath(args.record) if args.record else None
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))   # asset อ้าง path จากโฟลเดอร์ game/
+    source = ReplayInput(replay, loop=args.loop) if replay else None
+    run_headless(sim_seconds, args.player, args.level, source, args.immortal,
+                 args.draw, args.report_every, quiet=not args.verbose, record=record)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
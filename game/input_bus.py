@@ -0,0 +1,90 @@
+# input_bus.py
+# รวม input ทุกทาง (คีย์บอร์ด pygame, คำสั่ง serial จาก STM32, session replay ที่สร้าง event เดิมขึ้นใหม่)
+# ให้เป็น action ชนิดเดียวกัน แล้วฉากส่งต่อผ่านตาราง dispatch เดียว: ทุก event ถูกจัดการครั้งเดียว O(จำนวน event)
+#
+#   actions = input_bus.collect(events, serial_cmds)     # คีย์บอร์ดก่อน แล้วตามด้วย serial ตามลำดับที่มา
+#   input_bus.dispatch(actions, {ATTACK: on_attack, ...}) # action ที่ไม่มีในตาราง = ข้าม
+import pygame
+
+# ---------- ชนิดของ action ----------
+ATTACK = "ATTACK"              # J
+ALT_ATTACK = "ALT_ATTACK"      # M (wizard) / P (swordman) — arg = ตัวอักษรที่กดจริง
+COLLECT = "COLLECT"            # I เก็บเหรียญ
+JUMP = "JUMP"                  # W / SPACE / UP กระโดดข้ามอุปสรรค
+WALK_IMPULSE = "WALK_IMPULSE"  # D จากบอร์ด: เดินต่ออีกช่วงสั้น ๆ
+REVIVE = "REVIVE"              # R (ดีบัก)
+PAUSE = "PAUSE"
+RESUME = "RESUME"
+START = "START"                # ปุ่ม start บนบอร์ด
+JOY = "JOY"                    # arg = dict {"type": "JOY", "x", "y", "btn"}
+
+KEYBOARD = "key"
+SERIAL = "serial"
+
+
+class Action:
+    __slots__ = ("kind", "arg", "source")
+
+    def __init__(self, kind, arg=None, source=SERIAL):
+        self.kind = kind
+        self.arg = arg
+        self.source = source
+
+    def __repr__(self):
+        return f"Action({self.kind}, {self.arg!r}, {self.source})"
+
+
+# ปุ่มคีย์บอร์ด -> (ชนิด, arg)
+KEY_ACTIONS = {
+    pygame.K_j: (ATTACK, None),
+    pygame.K_m: (ALT_ATTACK, "M"),
+    pygame.K_p: (ALT_ATTACK, "P"),
+    pygame.K_i: (COLLECT, None),
+    pygame.K_SPACE: (JUMP, None),
+    pygame.K_w: (JUMP, None),
+    pygame.K_UP: (JUMP, None),
+    pygame.K_r: (REVIVE, None),
+}
+
+# คำสั่ง serial (str จาก serial_lines / serial_binary) -> (ชนิด, arg)
+SERIAL_ACTIONS = {
+    "PAUSE": (PAUSE, None),
+    "RESUME": (RESUME, None),
+    "START": (START, None),
+    " ": (JUMP, None),
+}
+for _ch, _action in (("J", ATTACK), ("M", ALT_ATTACK), ("P", ALT_ATTACK), ("I", COLLECT),
+                     ("W", JUMP), ("D", WALK_IMPULSE)):
+    _arg = _ch if _action == ALT_ATTACK else None
+    SERIAL_ACTIONS[_ch] = SERIAL_ACTIONS[_ch.lower()] = (_action, _arg)
+
+
+def collect(events, serial_cmds):
+    """pygame events + คำสั่ง serial -> ลิสต์ Action (สิ่งที่ไม่ใช่ input ของเกมถูกทิ้ง)"""
+    actions = []
+    for e in events:
+        if e.type == pygame.KEYDOWN:
+            hit = KEY_ACTIONS.get(e.key)
+            if hit is not None:
+                actions.append(Action(hit[0], hit[1], KEYBOARD))
+    for cmd in serial_cmds:
+        if isinstance(cmd, dict):
+            if cmd.get("type") == "JOY":
+                actions.append(Action(JOY, cmd))
+            continue
+        hit = SERIAL_ACTIONS.get(cmd)
+        if hit is not None:
+            actions.append(Action(hit[0], hit[1]))
+    return actions
+
+
+def dispatch(actions, table):
+    """
+    เรียก table[action.kind](action) ตามลำดับ
+    handler คืน True = หยุด (เช่นออกจากฉากกลางเฟรม) -> dispatch คืน True ด้วย
+    """
+    for action in actions:
+        handler = table.get(action.kind)
+        if handler is not None and handler(action):
+            return True
+    return False
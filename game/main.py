@@ -1,70 +1,56 @@
 # main.py
+# ฉากเล่นเกม (GameScene) + ฉาก Game Over — รันผ่าน app.py (scene manager)
+#   python main.py wizard   -> เข้าเกมตรง ๆ ด้วยตัวละครที่เลือก
 import pygame
-from sys import exit
 import random
-import subprocess
+import sys
 
 from player import Player
 from coin import Coin
 from parallax import ParallaxBG
 
-from serial_input import poll_serial_commands, send_reset_signal
-import sys
+from serial_input import send_reset_signal, send_serial
 
 
 from guide import Guide
 from enemy import Enemy
 from obstacle import Obstacle
 from projectile import Fireball  # ใช้หรือไม่ใช้ก็ได้
+from sprite_pool import PooledSprite, SpritePool
+from preloader import AssetPreloader
+from fixed_step import draw_interpolated, lerp, snapshot_positions
+from dirty_render import DirtyRenderer, dirty_rects_enabled
+from text_cache import get_font, render_text
+from session_log import open_recorder
+import input_bus
+import profiler
 
 pygame.init()
 W, H = 960, 540
-screen = pygame.display.set_mode((W, H))
-clock = pygame.time.Clock()
 GROUND_Y = 440
-font = pygame.font.SysFont(None, 28)
-
-chosen = sys.argv[1] if len(sys.argv) > 1 else "Unknown"
-
-# ---------- Player class / alt key ----------
-PLAYER_CLASS = chosen  # "wizard" หรือ "swordman"
-ALT_KEY = "M" if PLAYER_CLASS.lower() == "wizard" else "P"
-
-# ใช้เฉพาะเลเวล >= 3 เวลาอยู่ใน challenge (เริ่มที่ J)
-challenge_expect_key = "J"
+SCREEN_RECT = pygame.Rect(0, 0, W, H)
+font = get_font(None, 28)
 
 # ---------- Game variables ----------
-level = 1
-coins_collected = 0
 COINS_TO_PASS = 3
 
 # Lv2
-level2_kills = 0
 LEVEL2_KILL_TARGET = 2
 
 # Lv3
-level3_kills = 0
 LEVEL3_KILL_TARGET = 3
 
 # Lv4 (บอสไฟ)
-level4_kills = 14
 LEVEL4_KILL_TARGET = 15
 
 # Lv5 (ลูป)
-level5_kills_total = 0
-level5_cycle_kills = 0
 LEVEL5_CYCLE_TARGET = 5
-level5_force_boss_next = False
 
 # progress
-progress = 0.0  # ใช้ในเลเวล 1
 PROGRESS_TO_SPAWN = 100
 PROGRESS_SPEED_PER_MS = 0.05
 
 LEVEL2_PROGRESS_MAX = 100  # ใช้ในเลเวล 2–4
-level2_progress = 0.0
-
-sequence = None
 
 # Spawn rates
 COIN_PROB_L2 = 0.25
@@ -73,17 +59,13 @@ COIN_PROB_L4 = 0.25
 L3_MONSTER_VS_OBS = 0.75
 L4_MONSTER_VS_OBS = 0.90
 
-# ---------- Sprite groups ----------
-player_group = pygame.sprite.GroupSingle(Player(PLAYER_CLASS, (500, GROUND_Y)))
-coin_group = pygame.sprite.Group()
-enemy_group = pygame.sprite.Group()
-obstacle_group = pygame.sprite.Group()
-projectile_group = pygame.sprite.Group()
-prop_group = pygame.sprite.Group()
-
-# ---------- Props scroll ----------
-next_prop_px = 0
-prop_scroll_accum = 0.0  # เก็บเศษทศนิยมของพิกเซลไว้รวมรอบถัดไป
+# ---------- Enemy pool ต่อเลเวล (ต้องตรงกับ spawn ด้านล่าง) ----------
+LEVEL_ENEMY_POOL = {
+    2: ["mushroom", "flying eye"],
+    3: ["mushroom", "goblin", "skeleton", "flying eye"],
+    4: ["mushroom", "goblin", "skeleton", "gorgon"],
+    5: ["mushroom", "goblin", "skeleton", "flying eye", "evil", "neon phantom", "gorgon"],
+}
 
 PROP_TYPES = [
     {"path": "graphics/props/crate-stack.png", "weight": 1, "scale": 1.0},
@@ -92,6 +74,8 @@ PROP_TYPES = [
     {"path": "graphics/props/well.png", "weight": 1, "scale": 1.0},
 ]
 
+COIN_SHEET = "graphics/items/Coin.png"
+
 # ---------- Guide ----------
 animations_dict = {
     "collect_coin": "graphics/guide/collect_coin.png",
@@ -100,61 +84,24 @@ animations_dict = {
     "swordman_attack": "graphics/guide/swordman_attack.png",
     "squat": "graphics/guide/squat.png",
 }
-guide = Guide(animations_dict, pos=(180, 350), scale=4.0)
-guide_group = pygame.sprite.Group(guide)
-guide.visible = False
-guide.active = False
-
-# ตัวจับเวลาให้ไกด์หายเอง + ธงว่าถูกบังคับระหว่างชาเลนจ์/อุปสรรค
-guide_timer_ms = 0
-guide_forced = False
-
-
-# def go_home():
-#     """กลับหน้า Home"""
-#     send_reset_signal()
-#     pygame.quit()
-#     subprocess.run(["python", "home.py"])
-#     sys.exit()
-
-
-def go_home():
-    """กลับหน้า Home"""
-    try:
-        from serial_input import ser
-
-        if ser and ser.is_open:
-            ser.close()
-            print("🔌 Closed COM3 before launching home.py")
-    except Exception as e:
-        print("⚠️ Could not close serial port:", e)
-
-    send_reset_signal()  # ส่ง R ไป STM32
-    pygame.quit()
-    import subprocess
-
-    subprocess.run(["python", "home.py"])
-    sys.exit()
-
-
-def show_guide(state_name, duration_ms=1200):
-    """แสดงไกด์ state_name ชั่วคราว แล้วหายหลังครบ duration_ms"""
-    global guide_timer_ms
-    if state_name in guide.animations:
-        guide.set_state(state_name)
-        guide.visible = True
-        guide.active = True
-        guide.frame_index = 0.0
-        guide_timer_ms = duration_ms
 
 
 # === พื้นหลังไกด์แบบเก่า ===
 USE_OLD_GUIDE_BG = True
 GUIDE_BG_OLD_PATH = "graphics/guide/background.png"
-try:
-    GUIDE_BG_OLD = pygame.image.load(GUIDE_BG_OLD_PATH).convert_alpha()
-except:
-    GUIDE_BG_OLD = None
+GUIDE_BG_OLD = None  # โหลดครั้งแรกที่ใช้ (convert_alpha ต้องมีหน้าจอก่อน)
+_guide_bg_loaded = False
+
+
+def _guide_bg():
+    global GUIDE_BG_OLD, _guide_bg_loaded
+    if not _guide_bg_loaded:
+        _guide_bg_loaded = True
+        try:
+            GUIDE_BG_OLD = pygame.image.load(GUIDE_BG_OLD_PATH).convert_alpha()
+        except:
+            GUIDE_BG_OLD = None
+    return GUIDE_BG_OLD
 
 
 def draw_guide_background(screen, target_rect):
@@ -163,10 +110,10 @@ def draw_guide_background(screen, target_rect):
     - ถ้ารูปมีขนาดเท่าหน้าจอ -> วาดที่ (0,0) เลย (เพราะกรอบถูกวางแบบ absolute ในไฟล์)
     - ถ้ารูปเล็ก -> จัดกลางตามตำแหน่งของ guide (เลื่อนลงนิดหน่อย)
     """
-    if not (USE_OLD_GUIDE_BG and GUIDE_BG_OLD):
+    bg = _guide_bg()
+    if not (USE_OLD_GUIDE_BG and bg):
         return
 
-    bg = GUIDE_BG_OLD
     bw, bh = bg.get_size()
 
     # 1) ภาพเต็มจอ → วาดทับทั้งจอ
@@ -182,20 +129,24 @@ def draw_guide_background(screen, target_rect):
 
 
 # ---------- Parallax ----------
-parallax = ParallaxBG(
-    W,
-    H,
-    [
-        ("graphics/background/sky.png", 0.0),
-        ("graphics/background/town.png", 0.25),
-        ("graphics/background/houses.png", 0.17, (1400, 420), GROUND_Y + 12),
-        ("graphics/background/ground.png", 0.34),
-    ],
-)
+PARALLAX_LAYERS = [
+    ("graphics/background/sky.png", 0.0),
+    ("graphics/background/town.png", 0.25),
+    ("graphics/background/houses.png", 0.17, (1400, 420), GROUND_Y + 12),
+    ("graphics/background/ground.png", 0.34),
+]
 PARALLAX_SCROLL_RATE = 0.12  # ต้องตรงกับ ParallaxBG.update()
 HOUSES_LAYER_SPEED = 0.17  # ต้องตรงกับ speed ของ houses ใน layers
 
 
+def _backdrop_base():
+    """พื้นหลังสีเทา + เส้นพื้น (อยู่ใต้ทุกเลเยอร์) ให้ ParallaxBG อบรวมกับ sky ไว้ครั้งเดียว"""
+    base = pygame.Surface((W, H))
+    base.fill((30, 30, 30))
+    pygame.draw.line(base, (70, 70, 70), (0, GROUND_Y), (W, GROUND_Y), 2)
+    return base
+
+
 # ---------- Helpers ----------
 def load_img_scaled(path, scale=1.0):
     img = pygame.image.load(path).convert_alpha()
@@ -205,20 +156,29 @@ def load_img_scaled(path, scale=1.0):
     return img
 
 
-def spawn_prop():
-    weights = [t.get("weight", 1) for t in PROP_TYPES]
-    idx = random.choices(range(len(PROP_TYPES)), weights=weights, k=1)[0]
-    cfg = PROP_TYPES[idx]
-    img = load_img_scaled(cfg["path"], cfg.get("scale", 1.0))
-    spr = pygame.sprite.Sprite()
-    spr.image = img
-    spr.rect = img.get_rect(midbottom=(W + img.get_width() // 2, GROUND_Y - 17))
-    prop_group.add(spr)
+_prop_images = None
+
 
+def prop_image(idx):
+    """รูป prop แบบที่ idx ใน PROP_TYPES (โหลด+สเกลทุกแบบครั้งแรกที่เรียก แล้วใช้ซ้ำ)"""
+    global _prop_images
+    if _prop_images is None:
+        _prop_images = [load_img_scaled(cfg["path"], cfg.get("scale", 1.0)) for cfg in PROP_TYPES]
+    return _prop_images[idx]
 
-def spawn_coin():
-    coin = Coin((W + 50, GROUND_Y - 70), "graphics/items/Coin.png")
-    coin_group.add(coin)
+
+class Prop(PooledSprite):
+    """ของประดับบนพื้น (ลังไม้, เสาไฟ, ...) ที่เลื่อนตามฉาก"""
+
+    def __init__(self):
+        super().__init__()
+        self.image = prop_image(0)
+        self.rect = self.image.get_rect()
+
+    def reset(self, image):
+        self.image = image
+        self.rect.size = image.get_size()
+        self.rect.midbottom = (W + image.get_width() // 2, GROUND_Y - 17)
 
 
 def start_sequence(steps):
@@ -226,8 +186,10 @@ def start_sequence(steps):
 
 
 def draw_hearts(screen, player, pos=(20, 20), spacing=4):
+    """วาดหัวใจ 5 ดวง คืน rect ที่ครอบทั้งแถว"""
     hp_per_heart = player.max_hp / 5
     x, y = pos
+    area = pygame.Rect(pos, (0, 0))
     for i in range(5):
         heart_hp = player.hp - i * hp_per_heart
         if heart_hp >= 4:
@@ -240,8 +202,9 @@ def draw_hearts(screen, player, pos=(20, 20), spacing=4):
             idx = 3
         else:
             idx = 4
-        screen.blit(player.heart_images[idx], (x, y))
+        area.union_ip(screen.blit(player.heart_images[idx], (x, y)))
         x += player.heart_images[idx].get_width() + spacing
+    return area
 
 
 OBSTACLE_ASSETS = [
@@ -249,894 +212,995 @@ OBSTACLE_ASSETS = [
     "graphics/obstacles/crate.png",
 ]
 
-
-def spawn_obstacle():
-    obstacle = Obstacle(
-        pos=(W + 100, GROUND_Y),
-        stop_offset=120,
-        approach_speed=3,
-        exit_speed=6,
-        pass_margin=150,
-        image_paths=OBSTACLE_ASSETS,
-        scale=1.5,
-    )
-    obstacle_group.add(obstacle)
-
-
 # ---------- UART walk impulse ----------
 RUN_IMPULSE_MS = 200
-serial_run_ms = 0
-serial_dir = 1
 IMPULSE_ADD_MS = 140
 IMPULSE_MAX_MS = 300
 
-# ---------- Pause Control (จาก COM3) ----------
-game_paused = False  # จะถูกเปลี่ยนโดยสัญญาณ PAUSE/RESUME จาก STM32
-pause_menu_selection = 0
-
+# ---------- Pause Control (จาก STM32) ----------
 pause_menu_items = ["Resume", "Exit"]
-pause_input_cooldown = 0
-
-
-def show_game_over():
-    """แสดงหน้า Game Over แล้วรอให้ผู้เล่นเลือกว่าจะกลับหน้า Home โดยกดปุ่ม Joystick"""
-    overlay = pygame.Surface((W, H))
-    overlay.fill((0, 0, 0))
-    overlay.set_alpha(200)
-    screen.blit(overlay, (0, 0))
-
-    game_over_font = pygame.font.SysFont(None, 72)
-    small_font = pygame.font.SysFont(None, 36)
-
-    text = game_over_font.render("GAME OVER", True, (255, 0, 0))
-    sub = small_font.render("Press Joystick to go Home", True, (255, 255, 255))
-
-    screen.blit(text, text.get_rect(center=(W // 2, H // 2 - 40)))
-    screen.blit(sub, sub.get_rect(center=(W // 2, H // 2 + 40)))
-    pygame.display.flip()
-
-    # 🔄 ส่งสัญญาณรีเซ็ตไป STM32 ทันทีที่ Game Over
-    try:
-        from serial_input import ser
-
-        if ser:
-            ser.write(b"R\n")
-            ser.flush()
-            print("📤 Sent 'R' to  STM32 (reset LCD/Game Over)")
-    except Exception as e:
-        print("⚠️ Could not send reset signal:", e)
 
-    # 🎮 รอ input จากผู้เล่น
-    waiting = True
-    while waiting:
-        # ✅ อ่านจาก serial (ปุ่ม joystick)
-        serial_cmds = poll_serial_commands()
-        for cmd in serial_cmds:
-            # กรณีข้อมูลมาจาก dictionary แบบ {"type":"JOY", "x":..., "y":..., "btn":...}
-            if isinstance(cmd, dict) and cmd.get("type") == "JOY":
-                if cmd.get("btn") == 1:  # ปุ่มถูกกด
-                    print("🏠 Joystick button pressed — returning Home")
-                    go_home()
-
-            # ถ้าเป็นข้อความทั่วไป (เช่น "BTN" หรือ "I" "J" "M" ที่มาจาก MCU)
-            elif cmd == "BTN" or cmd == "R":
-                print("🏠 Joystick button signal — returning Home")
-                go_home()
 
-        # ✅ รองรับกดจากคีย์บอร์ดด้วย (ใช้ตอนเทสต์)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                send_reset_signal()
-                pygame.quit()
-                sys.exit()
-
-            elif event.type == pygame.KEYDOWN:
-                if event.key in (pygame.K_SPACE, pygame.K_RETURN):
-                    print("🏠 Space/Enter pressed — returning Home")
-                    go_home()
-
-
-# 🎵 Initialize mixer
-pygame.mixer.init()
-
-# โหลดและเล่นเพลงพื้นหลัง (.wav)
-try:
-    pygame.mixer.music.load("sounds/bgm.wav")
-    pygame.mixer.music.set_volume(0.5)  # ปรับระดับเสียง (0.0 - 1.0)
-    pygame.mixer.music.play(-1)  # ✅ เล่นวนลูป (-1 = วนไม่จำกัด)
-    print("🎶 BGM started looping.")
-except Exception as e:
-    print("⚠️ Failed to load or play BGM:", e)
-
-
-# ---------- Main loop ----------
-while True:
-    dt = clock.tick(60)
-
-    frame_resolved = False
-    pending_start_next = False
-
-    # ===== Events =====
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            send_reset_signal()  # ✅ ใช้พอร์ตเดิม ไม่ต้องเปิดใหม่
-            pygame.quit()
-            sys.exit()
-
-        if event.type == pygame.KEYDOWN:
-            p = player_group.sprite
-            enemy = enemy_group.sprites()[0] if enemy_group.sprites() else None
-            in_challenge = bool(enemy and enemy.challenge_ms_left is not None)
-            in_sequence = sequence is not None
-
-            # --- J ---
-            if event.key == pygame.K_j:
-                if in_challenge:
-                    need_j = (level == 2 and challenge_expect_key == "J") or (
-                        level >= 3 and challenge_expect_key == "J"
-                    )
-                    if need_j:
-                        p.attack_pressed_total += 1
-                elif not in_sequence and not (p.full_lock or p.locked or p.dead):
-                    p.play_attack_anim_named("attack")
-
-            # --- M/P (ALT) + โชว์ไกด์ตามปุ่มที่กด ---
-            if event.key in (pygame.K_m, pygame.K_p):
-                alt_ok = (ALT_KEY == "M" and event.key == pygame.K_m) or (
-                    ALT_KEY == "P" and event.key == pygame.K_p
-                )
-
-                # แสดงไกด์ทันทีตามปุ่ม
-                if event.key == pygame.K_m:
-                    show_guide("wizard_attack", 1200)
-                if event.key == pygame.K_p:
-                    show_guide("swordman_attack", 1200)
-
-                if (
-                    in_challenge
-                    and level >= 3
-                    and alt_ok
-                    and challenge_expect_key == ALT_KEY
-                ):
-                    p.attack_pressed_total += 1
-                elif not in_sequence and not (p.full_lock or p.locked or p.dead):
-                    p.play_attack_anim_named("attack2")
-
-            if event.key == pygame.K_r:
-                p.revive()
-
-            # ---- Pick coin (I) ----
-            if event.key == pygame.K_i:
-                if getattr(p, "coin_lock", False) and coin_group.sprites():
-                    coin_group.sprites()[0].kill()
-                    if level == 1:
-                        progress = 0
-                        guide.visible = False
-                        guide.active = False
-                        p.guide_shown = False
-                    else:
-                        level2_progress = 0.0
-                    p.coin_lock = False
-                    coins_collected += 1
-
-            # --- Jump over obstacle ---
-            if event.key in (pygame.K_SPACE, pygame.K_w, pygame.K_UP):
-                obstacle = (
-                    obstacle_group.sprites()[0] if obstacle_group.sprites() else None
-                )
-                if (
-                    getattr(p, "obstacle_lock", False)
-                    and obstacle
-                    and getattr(obstacle, "state", "") == "wait"
-                ):
-                    if p.on_ground and not (p.full_lock or p.locked or p.dead):
-                        p.vel_y = -p.jump_power
-                        p.on_ground = False
-                        p.set_state("jump")
-                    p.obstacle_lock = False
-                    obstacle.start_pass(p)
-                # ไม่โชว์ squat ตรงนี้แล้ว — ให้ขึ้นเฉพาะตอน obstacle อยู่ใน state "wait"
-
-    # ===== Serial input =====
-    keys = pygame.key.get_pressed()
-    p = player_group.sprite
-    enemy = enemy_group.sprites()[0] if enemy_group.sprites() else None
-
-    serial_cmds = poll_serial_commands()
-    for cmd in serial_cmds:
-        if isinstance(cmd, dict) and cmd["type"] == "JOY":
-            print(f"Joystick X={cmd['x']} Y={cmd['y']} BTN={cmd['btn']}")
-        elif cmd == "PAUSE":
-            # หยุดเกม
-            pass
-        elif cmd == "RESUME":
-            pygame.mixer.music.unpause()
-            # เล่นต่อ
-            pass
-
-    # ---- รับคำสั่ง PAUSE/RESUME จาก STM32 (COM3) ----
-    if "PAUSE" in serial_cmds:
-        if not game_paused:
-            pygame.mixer.music.pause()  # ⏸ หยุดเพลง
-            print("⏸ Game paused from STM32")
-            try:
-                from serial_input import ser
-
-                if ser:
-                    ser.write(b"P\n")
-                    ser.flush()
-                    print("📤 Sent 'P' to STM32 (pause timer)")
-            except Exception as e:
-                print("⚠️ Could not send P:", e)
-        game_paused = True
-
-    if "RESUME" in serial_cmds:
-        if game_paused:
-            pygame.mixer.music.unpause()
-            print("▶️ Game resumed from STM32")
-        game_paused = False
-
-    # ====== Pause menu joystick control ======
-    if game_paused:
-        for cmd in serial_cmds:
-            if isinstance(cmd, dict) and cmd["type"] == "JOY":
-                y_val = cmd["y"]
-                btn_val = cmd["btn"]
-
-                center_y = 2054
-                deadzone = 300
-
-                # ป้องกัน input ซ้ำเร็วเกินไป
-                if pause_input_cooldown > 0:
-                    pause_input_cooldown -= dt
-                    continue
-
-                # ✅ ใช้ joystick แกน Y เพื่อเลื่อน
-                if y_val > center_y + deadzone:
-                    pause_menu_selection = (pause_menu_selection + 1) % len(
-                        pause_menu_items
-                    )
-                    pause_input_cooldown = 300  # หน่วง 0.3 วินาที
-                elif y_val < center_y - deadzone:
-                    pause_menu_selection = (pause_menu_selection - 1) % len(
-                        pause_menu_items
-                    )
-                    pause_input_cooldown = 300
-
-                # ✅ กดปุ่ม joystick เพื่อเลือก
-                if btn_val == 1:
-                    if pause_menu_selection == 0:
-                        # ✅ Resume
-                        game_paused = False
-                        print("▶️ Resume selected by joystick")
-
-                        # ส่งสัญญาณให้ STM32 นับเวลาต่อ
-                        try:
-                            from serial_input import ser
-
-                            if ser:
-                                ser.write(b"S\n")
-                                ser.flush()
-                                print("📤 Sent 'S' to STM32 (resume timer)")
-                        except Exception as e:
-                            print("⚠️ Could not send S:", e)
-
-                    elif pause_menu_selection == 1:
-                        print("🏠 Exit selected by joystick")
-                        try:
-                            from serial_input import ser
-
-                            if ser:
-                                ser.write(b"R\n")
-                                ser.flush()
-                                print("📤 Sent 'R' to STM32 (reset LCD)")
-                        except Exception as e:
-                            print("⚠️ Could not send R:", e)
-
-                        pygame.mixer.music.stop()
-                        pygame.quit()
-                        go_home()
-                        sys.exit()
-
-                    # elif pause_menu_selection == 1:
-                    #     print("🏠 Exit selected by joystick")
-                    #     go_home()
-
-    # ถ้าหยุดเกม ให้หยุดแรงขับการเดินที่มาจาก serial ด้วย
-    if game_paused:
-        serial_run_ms = 0
-        p.external_dir = 0
-
-    if serial_cmds and not game_paused:
-        in_challenge = bool(enemy and enemy.challenge_ms_left is not None)
-        in_sequence = sequence is not None
-
-        if any(ch in ("W", "w") for ch in serial_cmds) or any(
-            ch == " " for ch in serial_cmds
-        ):
-            obstacle = obstacle_group.sprites()[0] if obstacle_group.sprites() else None
-            if (
-                getattr(p, "obstacle_lock", False)
-                and obstacle
-                and getattr(obstacle, "state", "") == "wait"
-            ):
-                if p.on_ground and not (p.full_lock or p.locked or p.dead):
-                    p.vel_y = -p.jump_power
-                    p.on_ground = False
-                    p.set_state("jump")
-                p.obstacle_lock = False
-                obstacle.start_pass(p)
-            # ไม่โชว์ squat ตรงนี้ — โชว์ตอน "wait" เท่านั้น
-
-        if any(ch in ("J", "j") for ch in serial_cmds):
-            need_j = (level == 2 and challenge_expect_key == "J") or (
-                level >= 3 and challenge_expect_key == "J"
-            )
-            if in_challenge and need_j:
-                p.attack_pressed_total += 1
-            elif not in_sequence and not (p.full_lock or p.locked or p.dead):
-                p.play_attack_anim_named("attack")
-
-        if any(ch in ("M", "m", "P", "p") for ch in serial_cmds):
-            alt_hit = (
-                ("M" in serial_cmds or "m" in serial_cmds)
-                if ALT_KEY == "M"
-                else ("P" in serial_cmds or "p" in serial_cmds)
+class GameScene:
+    """เกมหลัก เลเวล 1–5 (สร้างใหม่ทุกครั้งที่เข้าฉาก = เริ่มเกมใหม่)"""
+
+    fixed_step = True  # app.py เรียก update ทีละ STEP_MS แล้ววาดด้วย draw(screen, alpha)
+
+    def __init__(self, manager, player_class="Unknown", seed=None):
+        self.manager = manager
+
+        # ---------- Session log (RINGFIT_SESSION_LOG / session_log.py replay) ----------
+        # seed ของ random ต้องตั้งก่อนสร้างอะไรก็ตามที่สุ่ม (pool อุปสรรคสุ่มรูปตั้งแต่ตอนสร้าง)
+        self.recorder = open_recorder(player_class) if seed is None else None
+        if self.recorder is not None:
+            seed = self.recorder.seed
+        self.deterministic = seed is not None
+        if self.deterministic:
+            random.seed(seed)
+        self.key_state = None  # ตอนเล่นซ้ำใช้แทน pygame.key.get_pressed()
+
+        # ---------- Player class / alt key ----------
+        self.PLAYER_CLASS = player_class  # "wizard" หรือ "swordman"
+        self.ALT_KEY = "M" if self.PLAYER_CLASS.lower() == "wizard" else "P"
+
+        # ใช้เฉพาะเลเวล >= 3 เวลาอยู่ใน challenge (เริ่มที่ J)
+        self.challenge_expect_key = "J"
+
+        self.level = 1
+        self.coins_collected = 0
+        self.level2_kills = 0
+        self.level3_kills = 0
+        self.level4_kills = 14
+        self.level5_kills_total = 0
+        self.level5_cycle_kills = 0
+        self.level5_force_boss_next = False
+
+        self.progress = 0.0  # ใช้ในเลเวล 1
+        self.level2_progress = 0.0  # ใช้ในเลเวล 2–4
+        self.sequence = None
+
+        # อุ่นชีตศัตรูของเลเวลถัดไปใน thread แยก ระหว่างที่ยังเล่นเลเวลปัจจุบัน
+        self.preloader = AssetPreloader()
+        self.preloaded_for_level = None
+
+        # ---------- Sprite groups ----------
+        self.player_group = pygame.sprite.GroupSingle(Player(self.PLAYER_CLASS, (500, GROUND_Y)))
+        self.coin_group = pygame.sprite.Group()
+        self.enemy_group = pygame.sprite.Group()
+        self.obstacle_group = pygame.sprite.Group()
+        self.projectile_group = pygame.sprite.Group()
+        self.prop_group = pygame.sprite.Group()
+
+        # ---------- Pools: sprite ที่เกิด/ตายบ่อยสร้างไว้ล่วงหน้า kill() แล้วกลับเข้า pool ----------
+        self.coin_pool = SpritePool(lambda: Coin((0, 0), COIN_SHEET), prefill=8)
+        self.obstacle_pool = SpritePool(
+            lambda: Obstacle(
+                stop_offset=120,
+                approach_speed=3,
+                exit_speed=6,
+                pass_margin=150,
+                image_paths=OBSTACLE_ASSETS,
+                scale=1.5,
+            ),
+            prefill=4,
+        )
+        self.prop_pool = SpritePool(Prop, prefill=12)
+
+        # ---------- Props scroll ----------
+        self.next_prop_px = 0
+        self.prop_scroll_accum = 0.0  # เก็บเศษทศนิยมของพิกเซลไว้รวมรอบถัดไป
+
+        self.guide = Guide(animations_dict, pos=(180, 350), scale=4.0)
+        self.guide_group = pygame.sprite.Group(self.guide)
+        self.guide.visible = False
+        self.guide.active = False
+
+        # ตัวจับเวลาให้ไกด์หายเอง + ธงว่าถูกบังคับระหว่างชาเลนจ์/อุปสรรค
+        self.guide_timer_ms = 0
+        self.guide_forced = False
+
+        self.parallax = ParallaxBG(W, H, PARALLAX_LAYERS, base=_backdrop_base())
+
+        self.serial_run_ms = 0
+        self.serial_dir = 1
+
+        self.game_paused = False  # จะถูกเปลี่ยนโดยสัญญาณ PAUSE/RESUME จาก STM32
+        self.pause_menu_selection = 0
+        self.pause_input_cooldown = 0
+
+        # โหมด dirty rect (RINGFIT_DIRTY_RECTS=1): วาด/อัปเดตเฉพาะส่วนที่เปลี่ยนเมื่อฉากหลังนิ่ง
+        self.renderer = DirtyRenderer((W, H)) if dirty_rects_enabled() else None
+
+        # input ทุกทาง -> action (input_bus.py) -> handler ตามตารางนี้
+        self.input_table = self._input_table()
+        self._tick_dt = 0
+
+        # ตำแหน่งก่อน tick ล่าสุด (ไว้ interpolate ตอนวาด)
+        self._prev_pos = {}
+        self._prev_parallax_t = self.parallax.t
+
+    # ---------- ฉาก ----------
+    def enter(self):
+        # 🎵 โหลดและเล่นเพลงพื้นหลัง (.wav)
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.music.load("sounds/bgm.wav")
+            pygame.mixer.music.set_volume(0.5)  # ปรับระดับเสียง (0.0 - 1.0)
+            pygame.mixer.music.play(-1)  # ✅ เล่นวนลูป (-1 = วนไม่จำกัด)
+            print("🎶 BGM started looping.")
+        except Exception as e:
+            print("⚠️ Failed to load or play BGM:", e)
+
+    def leave(self):
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+        self.preloader.stop()
+        if self.recorder is not None:
+            self.recorder.close(self)
+
+    def on_quit(self):
+        send_reset_signal()  # ✅ ใช้พอร์ตเดิม ไม่ต้องเปิดใหม่
+
+    def go_home(self):
+        """กลับหน้า Home (ฉากเดิมในโปรเซสเดียวกัน ไม่ต้องปิด/เปิดพอร์ตใหม่)"""
+        send_reset_signal()  # ส่ง R ไป STM32
+        self.manager.go("home")
+
+    # ---------- Helpers ----------
+    def show_guide(self, state_name, duration_ms=1200):
+        """แสดงไกด์ state_name ชั่วคราว แล้วหายหลังครบ duration_ms"""
+        if state_name in self.guide.animations:
+            self.guide.set_state(state_name)
+            self.guide.visible = True
+            self.guide.active = True
+            self.guide.anim.restart()
+            self.guide_timer_ms = duration_ms
+
+    def spawn_prop(self):
+        weights = [t.get("weight", 1) for t in PROP_TYPES]
+        idx = random.choices(range(len(PROP_TYPES)), weights=weights, k=1)[0]
+        self.prop_group.add(self.prop_pool.acquire(prop_image(idx)))
+
+    def spawn_enemy(self, etype, candidates=None):
+        """spawn ศัตรู ถ้าชีตยังอุ่นไม่เสร็จ ใช้ตัวอื่นใน candidates ที่พร้อมแล้วแทน (ไม่มีก็โหลดเลย)"""
+        # (โหมดบันทึก/เล่นซ้ำ: ห้ามสลับตัว เพราะขึ้นกับจังหวะของ thread -> เล่นซ้ำไม่ได้ผลเดิม)
+        if not self.deterministic and not self.preloader.is_ready(etype) and candidates:
+            ready = [t for t in candidates if self.preloader.is_ready(t)]
+            if ready:
+                etype = random.choice(ready)
+        self.enemy_group.add(Enemy(etype, pos=(W + 120, GROUND_Y)))
+
+    def spawn_coin(self):
+        self.coin_group.add(self.coin_pool.acquire((W + 50, GROUND_Y - 70)))
+
+    def spawn_obstacle(self):
+        self.obstacle_group.add(self.obstacle_pool.acquire((W + 100, GROUND_Y)))
+
+    # ---------- Input (input_bus: คีย์บอร์ด + serial + replay ผ่านตารางเดียว) ----------
+    def _input_table(self):
+        return {
+            input_bus.ATTACK: self.on_attack,
+            input_bus.ALT_ATTACK: self.on_alt_attack,
+            input_bus.COLLECT: self.on_collect,
+            input_bus.JUMP: self.on_jump,
+            input_bus.WALK_IMPULSE: self.on_walk_impulse,
+            input_bus.REVIVE: self.on_revive,
+            input_bus.PAUSE: self.on_pause,
+            input_bus.RESUME: self.on_resume,
+            input_bus.JOY: self.on_joy,
+        }
+
+    def _in_challenge(self):
+        enemy = self.enemy_group.sprites()[0] if self.enemy_group.sprites() else None
+        return bool(enemy and enemy.challenge_ms_left is not None)
+
+    def _can_act(self, p):
+        return self.sequence is None and not (p.full_lock or p.locked or p.dead)
+
+    def on_attack(self, action):
+        # --- J ---
+        if self.game_paused:
+            return
+        p = self.player_group.sprite
+        if self._in_challenge():
+            need_j = (self.level == 2 and self.challenge_expect_key == "J") or (
+                self.level >= 3 and self.challenge_expect_key == "J"
             )
-            # แสดงไกด์แอทแทคด้วยเมื่อมีสัญญาณอนุกรม
-            if "M" in serial_cmds or "m" in serial_cmds:
-                show_guide("wizard_attack", 1200)
-            if "P" in serial_cmds or "p" in serial_cmds:
-                show_guide("swordman_attack", 1200)
-
-            if (
-                in_challenge
-                and level >= 3
-                and alt_hit
-                and challenge_expect_key == ALT_KEY
-            ):
+            if need_j:
                 p.attack_pressed_total += 1
-            elif not in_sequence and not (p.full_lock or p.locked or p.dead):
-                p.play_attack_anim_named("attack2")
+        elif self._can_act(p):
+            p.play_attack_anim_named("attack")
+
+    def on_alt_attack(self, action):
+        # --- M/P (ALT) + โชว์ไกด์ตามปุ่มที่กด ---
+        if self.game_paused:
+            return
+        p = self.player_group.sprite
+        if action.arg == "M":
+            self.show_guide("wizard_attack", 1200)
+        else:
+            self.show_guide("swordman_attack", 1200)
 
-        if any(ch in ("D", "d") for ch in serial_cmds) and not (
-            p.full_lock or p.locked or p.dead
+        if (
+            self._in_challenge()
+            and self.level >= 3
+            and action.arg == self.ALT_KEY
+            and self.challenge_expect_key == self.ALT_KEY
         ):
-            serial_dir = 1
-            serial_run_ms = min(serial_run_ms + IMPULSE_ADD_MS, IMPULSE_MAX_MS)
-
-        if any(ch in ("I", "i") for ch in serial_cmds):
-            if getattr(p, "coin_lock", False) and coin_group.sprites():
-                coin_group.sprites()[0].kill()
-                if level == 1:
-                    progress = 0
-                    guide.visible = False
-                    guide.active = False
-                    p.guide_shown = False
-                else:
-                    level2_progress = 0.0
-                p.coin_lock = False
-                coins_collected += 1
-
-    if serial_run_ms > 0 and not (p.full_lock or p.locked or p.dead):
-        p.external_move = True
-        p.external_dir = serial_dir
-        serial_run_ms -= dt
-    else:
-        p.external_dir = 0
-
-    # ===== Update =====
-    if not game_paused:
-        player_group.update(keys, GROUND_Y)
-
-        # enemies
-        for e in enemy_group.sprites():
-            e.update(p, dt)
-
-        # ----- Guide timer -----
-        if guide_timer_ms > 0:
-            guide_timer_ms = max(0, guide_timer_ms - dt)
-            if guide_timer_ms == 0 and not guide_forced:
-                guide.visible = False
-                guide.active = False
-
-        # ===== Props on ground =====
-        if p.is_moving:
-            prop_scroll_accum += dt * PARALLAX_SCROLL_RATE * HOUSES_LAYER_SPEED
-
-        move_px = int(prop_scroll_accum)
-        if move_px > 0:
-            for pr in prop_group.sprites():
-                pr.rect.x -= move_px
-                if pr.rect.right < 0:
-                    pr.kill()
-            next_prop_px -= move_px
-            prop_scroll_accum -= move_px
-
-        if next_prop_px <= 0:
-            spawn_prop()
-            next_prop_px = random.randint(100, 400)
-
-        for obs in obstacle_group.sprites():
-            obs.update(p, dt)
-
-        # โปรเจกไทล์
-        for fb in projectile_group.sprites():
-            fb.update(dt, screen_w=W)
-
-    # ===== Level 1 =====
-    if level == 1:
-        if len(coin_group) == 0:
-            spawn_coin()
-        coin = coin_group.sprites()[0] if coin_group.sprites() else None
-
-        if p.is_moving and not getattr(p, "coin_lock", False):
-            progress += PROGRESS_SPEED_PER_MS * dt
-            if progress > PROGRESS_TO_SPAWN:
-                progress = PROGRESS_TO_SPAWN
-
-        if progress >= PROGRESS_TO_SPAWN and coin:
-            if coin.rect.centerx > p.rect.centerx:
-                if p.is_moving:
-                    coin.rect.centerx -= 10
+            p.attack_pressed_total += 1
+        elif self._can_act(p):
+            p.play_attack_anim_named("attack2")
+
+    def on_collect(self, action):
+        # ---- Pick coin (I) ----
+        if self.game_paused:
+            return
+        p = self.player_group.sprite
+        if getattr(p, "coin_lock", False) and self.coin_group.sprites():
+            self.coin_group.sprites()[0].kill()
+            if self.level == 1:
+                self.progress = 0
+                self.guide.visible = False
+                self.guide.active = False
+                p.guide_shown = False
             else:
-                if not getattr(p, "guide_shown", False):
-                    guide.set_state("collect_coin")
-                    guide.active = True
-                    guide.visible = True
-                    guide.frame_index = 0.0
-                    p.guide_shown = True
-                p.coin_lock = True
-                p.is_moving = False
-                p.set_state("idle")
-
-        if coins_collected >= COINS_TO_PASS:
-            level = 2
-            progress = 0
-            level2_progress = 0
-            challenge_expect_key = "J"
-            coin_group.empty()
-            guide.visible = False
-            guide.active = False
+                self.level2_progress = 0.0
             p.coin_lock = False
-            p.guide_shown = False
-
-    # ===== Level 2/3/4/5: spawn =====
-    if level in (2, 3, 4, 5):
-        no_enemy = not enemy_group.sprites()
-        no_coin = not coin_group.sprites()
-        no_obs = not obstacle_group.sprites()
-        no_event = no_enemy and no_coin and no_obs
-
-        if (sequence is None) and no_event and p.is_moving:
-            level2_progress += PROGRESS_SPEED_PER_MS * dt
-            if level2_progress > LEVEL2_PROGRESS_MAX:
-                level2_progress = LEVEL2_PROGRESS_MAX
-
-        if no_event and (level2_progress >= LEVEL2_PROGRESS_MAX):
-            level2_progress = 0.0
-
-            if level == 2:
-                if random.random() < COIN_PROB_L2:
-                    spawn_coin()
-                else:
-                    etype = random.choice(["mushroom", "flying eye"])
-                    enemy_group.add(Enemy(etype, pos=(W + 120, GROUND_Y)))
+            self.coins_collected += 1
+
+    def on_jump(self, action):
+        # --- Jump over obstacle --- (squat โชว์ตอนอุปสรรคอยู่ใน state "wait" เท่านั้น)
+        if self.game_paused:
+            return
+        p = self.player_group.sprite
+        obstacle = self.obstacle_group.sprites()[0] if self.obstacle_group.sprites() else None
+        if (
+            getattr(p, "obstacle_lock", False)
+            and obstacle
+            and getattr(obstacle, "state", "") == "wait"
+        ):
+            if p.on_ground and not (p.full_lock or p.locked or p.dead):
+                p.vel_y = -p.jump_power
+                p.on_ground = False
+                p.set_state("jump")
+            p.obstacle_lock = False
+            obstacle.start_pass(p)
+
+    def on_walk_impulse(self, action):
+        # D จากบอร์ด = เดินต่ออีก IMPULSE_ADD_MS (สะสมได้ไม่เกิน IMPULSE_MAX_MS)
+        p = self.player_group.sprite
+        if self.game_paused or p.full_lock or p.locked or p.dead:
+            return
+        self.serial_dir = 1
+        self.serial_run_ms = min(self.serial_run_ms + IMPULSE_ADD_MS, IMPULSE_MAX_MS)
+
+    def on_revive(self, action):
+        if not self.game_paused:
+            self.player_group.sprite.revive()
+
+    def on_pause(self, action):
+        # ---- รับคำสั่ง PAUSE จาก STM32 ----
+        if not self.game_paused:
+            pygame.mixer.music.pause()  # ⏸ หยุดเพลง
+            print("⏸ Game paused from STM32")
+            send_serial(b"P\n", "pause timer")
+        self.game_paused = True
 
-            elif level == 3:
-                if random.random() < COIN_PROB_L3:
-                    spawn_coin()
+    def on_resume(self, action):
+        pygame.mixer.music.unpause()
+        if self.game_paused:
+            print("▶️ Game resumed from STM32")
+        self.game_paused = False
+
+    def on_joy(self, action):
+        """joystick: ใช้เลื่อน/เลือกเมนู pause คืน True ถ้าออกจากฉาก (หยุด dispatch)"""
+        cmd = action.arg
+        print(f"Joystick X={cmd['x']} Y={cmd['y']} BTN={cmd['btn']}")
+        if not self.game_paused:
+            return False
+
+        # ป้องกัน input ซ้ำเร็วเกินไป
+        if self.pause_input_cooldown > 0:
+            self.pause_input_cooldown -= self._tick_dt
+            return False
+
+        center_y = 2054
+        deadzone = 300
+        # ✅ ใช้ joystick แกน Y เพื่อเลื่อน
+        if cmd["y"] > center_y + deadzone:
+            self.pause_menu_selection = (self.pause_menu_selection + 1) % len(pause_menu_items)
+            self.pause_input_cooldown = 300  # หน่วง 0.3 วินาที
+        elif cmd["y"] < center_y - deadzone:
+            self.pause_menu_selection = (self.pause_menu_selection - 1) % len(pause_menu_items)
+            self.pause_input_cooldown = 300
+
+        # ✅ กดปุ่ม joystick เพื่อเลือก
+        if cmd["btn"] == 1:
+            if self.pause_menu_selection == 0:
+                # ✅ Resume
+                self.game_paused = False
+                print("▶️ Resume selected by joystick")
+                # ส่งสัญญาณให้ STM32 นับเวลาต่อ
+                send_serial(b"S\n", "resume timer")
+            elif self.pause_menu_selection == 1:
+                print("🏠 Exit selected by joystick")
+                self.go_home()
+                return True
+        return False
+
+    # ---------- Update ----------
+    def update(self, dt, events, serial_cmds):
+        keys = self.key_state if self.key_state is not None else pygame.key.get_pressed()
+        if self.recorder is not None:
+            self.recorder.tick(self, dt, keys, events, serial_cmds)
+
+        frame_resolved = False
+        pending_start_next = False
+
+        self._prev_pos = snapshot_positions(*self._world_groups())
+        self._prev_parallax_t = self.parallax.t
+
+        profiler.section("preload")
+        # ===== Asset preload =====
+        if self.preloaded_for_level != self.level:
+            self.preloader.warm_enemies(LEVEL_ENEMY_POOL.get(self.level + 1, LEVEL_ENEMY_POOL[5]))
+            self.preloaded_for_level = self.level
+        self.preloader.pump()
+
+        profiler.section("input")
+        # ===== Input: คีย์บอร์ด + serial -> action -> handler (ทีละ event ครั้งเดียว ตามลำดับที่มา) =====
+        p = self.player_group.sprite
+        self._tick_dt = dt
+        if input_bus.dispatch(input_bus.collect(events, serial_cmds), self.input_table):
+            return
+
+        # ถ้าหยุดเกม ให้หยุดแรงขับการเดินที่มาจาก serial ด้วย
+        if self.game_paused:
+            self.serial_run_ms = 0
+            p.external_dir = 0
+
+        if self.serial_run_ms > 0 and not (p.full_lock or p.locked or p.dead):
+            p.external_move = True
+            p.external_dir = self.serial_dir
+            self.serial_run_ms -= dt
+        else:
+            p.external_dir = 0
+
+        profiler.section("sprites")
+        # ===== Update =====
+        if not self.game_paused:
+            self.player_group.update(keys, GROUND_Y, dt)
+            self.coin_group.update(dt)
+
+            # enemies
+            for e in self.enemy_group.sprites():
+                e.update(p, dt)
+
+            # ----- Guide timer -----
+            if self.guide_timer_ms > 0:
+                self.guide_timer_ms = max(0, self.guide_timer_ms - dt)
+                if self.guide_timer_ms == 0 and not self.guide_forced:
+                    self.guide.visible = False
+                    self.guide.active = False
+
+            # ===== Props on ground =====
+            if p.is_moving:
+                self.prop_scroll_accum += dt * PARALLAX_SCROLL_RATE * HOUSES_LAYER_SPEED
+
+            move_px = int(self.prop_scroll_accum)
+            if move_px > 0:
+                for pr in self.prop_group.sprites():
+                    pr.rect.x -= move_px
+                    if pr.rect.right < 0:
+                        pr.kill()
+                self.next_prop_px -= move_px
+                self.prop_scroll_accum -= move_px
+
+            if self.next_prop_px <= 0:
+                self.spawn_prop()
+                self.next_prop_px = random.randint(100, 400)
+
+            for obs in self.obstacle_group.sprites():
+                obs.update(p, dt)
+
+            # โปรเจกไทล์
+            for fb in self.projectile_group.sprites():
+                fb.update(dt, SCREEN_RECT)
+
+        profiler.section("level_logic")
+        # ===== Level 1 =====
+        if self.level == 1:
+            if len(self.coin_group) == 0:
+                self.spawn_coin()
+            coin = self.coin_group.sprites()[0] if self.coin_group.sprites() else None
+
+            if p.is_moving and not getattr(p, "coin_lock", False):
+                self.progress += PROGRESS_SPEED_PER_MS * dt
+                if self.progress > PROGRESS_TO_SPAWN:
+                    self.progress = PROGRESS_TO_SPAWN
+
+            if self.progress >= PROGRESS_TO_SPAWN and coin:
+                if coin.rect.centerx > p.rect.centerx:
+                    if p.is_moving:
+                        coin.rect.centerx -= 10
                 else:
-                    if random.random() < L3_MONSTER_VS_OBS:
-                        etype = random.choice(
-                            ["mushroom", "goblin", "skeleton", "flying eye"]
-                        )
-                        enemy_group.add(Enemy(etype, pos=(W + 120, GROUND_Y)))
+                    if not getattr(p, "guide_shown", False):
+                        self.guide.set_state("collect_coin")
+                        self.guide.active = True
+                        self.guide.visible = True
+                        self.guide.anim.restart()
+                        p.guide_shown = True
+                    p.coin_lock = True
+                    p.is_moving = False
+                    p.set_state("idle")
+
+            if self.coins_collected >= COINS_TO_PASS:
+                self.level = 2
+                self.progress = 0
+                self.level2_progress = 0
+                self.challenge_expect_key = "J"
+                self.coin_group.empty()
+                self.guide.visible = False
+                self.guide.active = False
+                p.coin_lock = False
+                p.guide_shown = False
+
+        # ===== Level 2/3/4/5: spawn =====
+        if self.level in (2, 3, 4, 5):
+            no_enemy = not self.enemy_group.sprites()
+            no_coin = not self.coin_group.sprites()
+            no_obs = not self.obstacle_group.sprites()
+            no_event = no_enemy and no_coin and no_obs
+
+            if (self.sequence is None) and no_event and p.is_moving:
+                self.level2_progress += PROGRESS_SPEED_PER_MS * dt
+                if self.level2_progress > LEVEL2_PROGRESS_MAX:
+                    self.level2_progress = LEVEL2_PROGRESS_MAX
+
+            if no_event and (self.level2_progress >= LEVEL2_PROGRESS_MAX):
+                self.level2_progress = 0.0
+
+                if self.level == 2:
+                    if random.random() < COIN_PROB_L2:
+                        self.spawn_coin()
                     else:
-                        spawn_obstacle()
+                        pool = ["mushroom", "flying eye"]
+                        self.spawn_enemy(random.choice(pool), pool)
 
-            elif level == 4:
-                if level4_kills == LEVEL4_KILL_TARGET - 1:
-                    roll = random.random()
-                    if roll < COIN_PROB_L4:
-                        spawn_coin()
+                elif self.level == 3:
+                    if random.random() < COIN_PROB_L3:
+                        self.spawn_coin()
                     else:
-                        if random.random() < L4_MONSTER_VS_OBS:
-                            enemy_group.add(Enemy("gorgon", pos=(W + 120, GROUND_Y)))
+                        if random.random() < L3_MONSTER_VS_OBS:
+                            pool = ["mushroom", "goblin", "skeleton", "flying eye"]
+                            self.spawn_enemy(random.choice(pool), pool)
                         else:
-                            spawn_obstacle()
-                else:
-                    roll = random.random()
-                    if roll < COIN_PROB_L4:
-                        spawn_coin()
+                            self.spawn_obstacle()
+
+                elif self.level == 4:
+                    if self.level4_kills == LEVEL4_KILL_TARGET - 1:
+                        roll = random.random()
+                        if roll < COIN_PROB_L4:
+                            self.spawn_coin()
+                        else:
+                            if random.random() < L4_MONSTER_VS_OBS:
+                                self.spawn_enemy("gorgon")
+                            else:
+                                self.spawn_obstacle()
                     else:
-                        if random.random() < L4_MONSTER_VS_OBS:
-                            etype = random.choice(["mushroom", "goblin", "skeleton"])
-                            enemy_group.add(Enemy(etype, pos=(W + 120, GROUND_Y)))
+                        roll = random.random()
+                        if roll < COIN_PROB_L4:
+                            self.spawn_coin()
                         else:
-                            spawn_obstacle()
-
-            elif level == 5:
-                roll = random.random()
-                if level5_force_boss_next:
-                    level5_force_boss_next = False
-                    boss_type = random.choice(["evil", "neon phantom", "gorgon"])
-                    enemy_group.add(Enemy(boss_type, pos=(W + 120, GROUND_Y)))
-                else:
-                    if roll < COIN_PROB_L4:
-                        spawn_coin()
+                            if random.random() < L4_MONSTER_VS_OBS:
+                                pool = ["mushroom", "goblin", "skeleton"]
+                                self.spawn_enemy(random.choice(pool), pool)
+                            else:
+                                self.spawn_obstacle()
+
+                elif self.level == 5:
+                    roll = random.random()
+                    if self.level5_force_boss_next:
+                        self.level5_force_boss_next = False
+                        bosses = ["evil", "neon phantom", "gorgon"]
+                        self.spawn_enemy(random.choice(bosses), bosses)
                     else:
-                        if random.random() < L4_MONSTER_VS_OBS:
-                            etype = random.choice(
-                                ["mushroom", "goblin", "skeleton", "flying eye"]
-                            )
-                            enemy_group.add(Enemy(etype, pos=(W + 120, GROUND_Y)))
+                        if roll < COIN_PROB_L4:
+                            self.spawn_coin()
                         else:
-                            spawn_obstacle()
+                            if random.random() < L4_MONSTER_VS_OBS:
+                                pool = ["mushroom", "goblin", "skeleton", "flying eye"]
+                                self.spawn_enemy(random.choice(pool), pool)
+                            else:
+                                self.spawn_obstacle()
+
+            coin = self.coin_group.sprites()[0] if self.coin_group.sprites() else None
+            if coin:
+                if not getattr(p, "coin_lock", False):
+                    if coin.rect.centerx > p.rect.centerx:
+                        if p.is_moving:
+                            coin.rect.centerx -= 10
+                    else:
+                        p.coin_lock = True
+                        p.is_moving = False
+                        p.set_state("idle")
+
+        profiler.section("challenge")
+        # ===== Challenge countdown =====
+        enemy = self.enemy_group.sprites()[0] if self.enemy_group.sprites() else None
+        if enemy and enemy.challenge_ms_left is not None and not frame_resolved:
+            enemy.challenge_ms_left -= dt
+            if enemy.challenge_ms_left <= 0 and self.sequence is None:
+                delta = p.attack_pressed_total - enemy.player_attack_baseline
+                p.attack_pressed_total = 0
+                enemy.challenge_ms_left = None
+                p.set_challenge_lock(False)
 
-        coin = coin_group.sprites()[0] if coin_group.sprites() else None
-        if coin:
-            if not getattr(p, "coin_lock", False):
-                if coin.rect.centerx > p.rect.centerx:
-                    if p.is_moving:
-                        coin.rect.centerx -= 10
-                else:
-                    p.coin_lock = True
-                    p.is_moving = False
-                    p.set_state("idle")
+                need_delta = getattr(enemy, "required_delta", 3)
 
-    # ===== Challenge countdown =====
-    enemy = enemy_group.sprites()[0] if enemy_group.sprites() else None
-    if enemy and enemy.challenge_ms_left is not None and not frame_resolved:
-        enemy.challenge_ms_left -= dt
-        if enemy.challenge_ms_left <= 0 and sequence is None:
-            delta = p.attack_pressed_total - enemy.player_attack_baseline
-            p.attack_pressed_total = 0
-            enemy.challenge_ms_left = None
-            p.set_challenge_lock(False)
+                if delta >= need_delta:
+                    enemy.hp -= 1
 
-            need_delta = getattr(enemy, "required_delta", 3)
+                    if self.level >= 3:
+                        just_used_key = self.challenge_expect_key
+                        self.challenge_expect_key = (
+                            self.ALT_KEY if self.challenge_expect_key == "J" else "J"
+                        )
+                        anim = "attack2" if (just_used_key == self.ALT_KEY) else "attack"
+                    else:
+                        self.challenge_expect_key = "J"
+                        anim = "attack"
+
+                    if enemy.hp <= 0:
+                        if self.level == 2:
+                            self.level2_kills += 1
+                        elif self.level == 3:
+                            self.level3_kills += 1
+                        elif self.level == 4:
+                            self.level4_kills += 1
+                        elif self.level == 5:
+                            self.level5_kills_total += 1
+                            self.level5_cycle_kills += 1
+                            if self.level5_cycle_kills >= LEVEL5_CYCLE_TARGET:
+                                self.level5_cycle_kills = 0
+                                self.level5_force_boss_next = True
+                        self.sequence = start_sequence(["player_attack", "enemy_death"])
+                    else:
+                        self.sequence = start_sequence(["player_attack", "enemy_hit"])
 
-            if delta >= need_delta:
-                enemy.hp -= 1
+                    self.sequence["attack_anim"] = anim
+                    frame_resolved = True
 
-                if level >= 3:
-                    just_used_key = challenge_expect_key
-                    challenge_expect_key = (
-                        ALT_KEY if challenge_expect_key == "J" else "J"
-                    )
-                    anim = "attack2" if (just_used_key == ALT_KEY) else "attack"
-                else:
-                    challenge_expect_key = "J"
-                    anim = "attack"
-
-                if enemy.hp <= 0:
-                    if level == 2:
-                        level2_kills += 1
-                    elif level == 3:
-                        level3_kills += 1
-                    elif level == 4:
-                        level4_kills += 1
-                    elif level == 5:
-                        level5_kills_total += 1
-                        level5_cycle_kills += 1
-                        if level5_cycle_kills >= LEVEL5_CYCLE_TARGET:
-                            level5_cycle_kills = 0
-                            level5_force_boss_next = True
-                    sequence = start_sequence(["player_attack", "enemy_death"])
                 else:
-                    sequence = start_sequence(["player_attack", "enemy_hit"])
-
-                sequence["attack_anim"] = anim
-                frame_resolved = True
-
+                    if self.level >= 3:
+                        self.challenge_expect_key = (
+                            self.ALT_KEY if self.challenge_expect_key == "J" else "J"
+                        )
+                    else:
+                        self.challenge_expect_key = "J"
+                    self.sequence = start_sequence(["enemy_attack", "player_hit"])
+                    frame_resolved = True
+
+        # ===== Force guide while challenge OR obstacle(wait) =====
+        # 1) Challenge: บังคับโชว์ตามปุ่มที่ต้องกด
+        enemy = self.enemy_group.sprites()[0] if self.enemy_group.sprites() else None
+        # ===== Force guide while coin-lock / challenge / obstacle(wait) =====
+        forced_now = False
+
+        # 0) Coin-lock (เลเวล 1 ขณะต้องเก็บเหรียญ) -> บังคับโชว์ collect_coin
+        if getattr(p, "coin_lock", False):
+            desired = "collect_coin"
+            if self.guide.state != desired or not self.guide.visible:
+                self.guide.set_state(desired)
+                self.guide.visible = True
+                self.guide.active = True
+                self.guide.anim.restart()
+            forced_now = True
+
+        # 1) Challenge ...
+        enemy = self.enemy_group.sprites()[0] if self.enemy_group.sprites() else None
+        if enemy and enemy.challenge_ms_left:
+            need_key = self.challenge_expect_key if self.level >= 3 else "J"
+            if need_key == "J":
+                desired = "squeeze"
             else:
-                if level >= 3:
-                    challenge_expect_key = (
-                        ALT_KEY if challenge_expect_key == "J" else "J"
-                    )
-                else:
-                    challenge_expect_key = "J"
-                sequence = start_sequence(["enemy_attack", "player_hit"])
-                frame_resolved = True
-
-    # ===== Force guide while challenge OR obstacle(wait) =====
-    # 1) Challenge: บังคับโชว์ตามปุ่มที่ต้องกด
-    enemy = enemy_group.sprites()[0] if enemy_group.sprites() else None
-    # ===== Force guide while coin-lock / challenge / obstacle(wait) =====
-    forced_now = False
-
-    # 0) Coin-lock (เลเวล 1 ขณะต้องเก็บเหรียญ) -> บังคับโชว์ collect_coin
-    if getattr(p, "coin_lock", False):
-        desired = "collect_coin"
-        if guide.state != desired or not guide.visible:
-            guide.set_state(desired)
-            guide.visible = True
-            guide.active = True
-            guide.frame_index = 0.0
-        forced_now = True
-
-    # 1) Challenge ...
-    enemy = enemy_group.sprites()[0] if enemy_group.sprites() else None
-    if enemy and enemy.challenge_ms_left:
-        need_key = challenge_expect_key if level >= 3 else "J"
-        if need_key == "J":
-            desired = "squeeze"
-        else:
-            desired = "wizard_attack" if ALT_KEY == "M" else "swordman_attack"
-        if guide.state != desired or not guide.visible:
-            guide.set_state(desired)
-            guide.visible = True
-            guide.active = True
-            guide.frame_index = 0.0
-        forced_now = True
-
-    # 2) Obstacle wait -> squat
-    obs = obstacle_group.sprites()[0] if obstacle_group.sprites() else None
-    if obs and getattr(obs, "state", "") == "wait":
-        if guide.state != "squat" or not guide.visible:
-            guide.set_state("squat")
-            guide.visible = True
-            guide.active = True
-            guide.frame_index = 0.0
-        forced_now = True
-
-    guide_forced = forced_now
-    if not guide_forced and guide_timer_ms == 0:
-        guide.visible = False
-        guide.active = False
-
-    # ===== Run sequence =====
-    if sequence and enemy:
-        step = sequence["steps"][sequence["idx"]]
-
-        if step == "player_attack":
-            if not sequence["started"]:
-                desired = sequence.get("attack_anim", "attack")
-                if desired not in ("attack", "attack2") or (
-                    desired not in p.animations
-                ):
-                    desired = "attack"
-                p.play_attack_anim_named(desired, ignore_locked=True)
-                sequence["started"] = True
-
-            if p.just_finished in ("attack", "attack2"):
-                sequence["idx"] += 1
-                sequence["started"] = False
-
-        elif step == "enemy_hit":
-            if not sequence["started"]:
-                enemy.locked = True
-                enemy.set_state("hit")
-                sequence["started"] = True
-            if enemy.just_finished == "hit":
-                sequence["idx"] += 1
-                sequence["started"] = False
-
-        elif step == "enemy_death":
-            if not sequence["started"]:
-                enemy.locked = True
-                enemy.set_state("death")
-                sequence["started"] = True
-            if enemy.just_finished == "death":
-                enemy.challenge_ms_left = None
-                enemy.dead = True
-                enemy.kill()
-                enemy_group.empty()
-                level2_progress = 0.0
-                p.set_full_lock(False)
-                p.set_challenge_lock(False)
-                p.locked = False
-                if p.on_ground:
-                    p.set_state("idle")
-                sequence = None
-                enemy = None
-
-        elif step == "enemy_attack":
-            if not sequence["started"]:
-                enemy.locked = True
-                enemy.set_state("attack")
-                sequence["started"] = True
-            if enemy.just_finished == "attack":
-                dmg = getattr(enemy, "damage", 1)
-                p.start_hit(damage=dmg)
-                sequence["idx"] += 1
-                sequence["started"] = False
-
-        elif step == "player_hit":
-            if not sequence["started"]:
-                sequence["started"] = True
-            if p.just_finished == "hit":
-                sequence["idx"] += 1
-                sequence["started"] = False
-
-        if sequence and sequence["idx"] >= len(sequence["steps"]):
-            sequence = None
-            e2 = enemy_group.sprites()[0] if enemy_group.sprites() else None
-            if e2 and not e2.dead:
-                pending_start_next = True
-
-    # ===== Level up =====
-    if level == 2 and level2_kills >= LEVEL2_KILL_TARGET:
-        level2_kills = 0
-        level = 3
-        level2_progress = 0
-        enemy_group.empty()
-        coin_group.empty()
-        obstacle_group.empty()
-        challenge_expect_key = "J"
-
-    if level == 3 and level3_kills >= LEVEL3_KILL_TARGET:
-        level3_kills = 0
-        level = 4
-        level2_progress = 0
-        enemy_group.empty()
-        coin_group.empty()
-        obstacle_group.empty()
-        challenge_expect_key = "J"
-
-    if level == 4 and level4_kills >= LEVEL4_KILL_TARGET:
-        level = 5
-        level2_progress = 0.0
-        enemy_group.empty()
-        coin_group.empty()
-        obstacle_group.empty()
-        projectile_group.empty()
-        p.set_full_lock(False)
-        p.set_challenge_lock(False)
-
-    # ----- Orphan sequence cleanup -----
-    if sequence is not None and not enemy_group.sprites():
-        sequence = None
-
-    # ===== Centralize locks =====
-    enemy = enemy_group.sprites()[0] if enemy_group.sprites() else None
-    in_sequence = sequence is not None
-    in_challenge = bool(enemy and enemy.challenge_ms_left is not None)
-    in_approach = bool(
-        enemy and enemy.challenge_ms_left is None and enemy.state == "run"
-    )
-    in_combat = bool(enemy) and (in_sequence or in_challenge or in_approach)
-
-    p.set_full_lock(in_combat)
-    p.set_challenge_lock(in_challenge)
-
-    if not in_combat:
-        p.locked = False
-        p.set_challenge_lock(False)
-        if p.on_ground and p.state not in ("idle", "run"):
-            p.set_state("idle")
-
-    if pending_start_next:
-        e2 = enemy_group.sprites()[0] if enemy_group.sprites() else None
-        if e2 and not e2.dead:
-            e2.start_challenge(p)
-        pending_start_next = False
+                desired = "wizard_attack" if self.ALT_KEY == "M" else "swordman_attack"
+            if self.guide.state != desired or not self.guide.visible:
+                self.guide.set_state(desired)
+                self.guide.visible = True
+                self.guide.active = True
+                self.guide.anim.restart()
+            forced_now = True
+
+        # 2) Obstacle wait -> squat
+        obs = self.obstacle_group.sprites()[0] if self.obstacle_group.sprites() else None
+        if obs and getattr(obs, "state", "") == "wait":
+            if self.guide.state != "squat" or not self.guide.visible:
+                self.guide.set_state("squat")
+                self.guide.visible = True
+                self.guide.active = True
+                self.guide.anim.restart()
+            forced_now = True
+
+        self.guide_forced = forced_now
+        if not self.guide_forced and self.guide_timer_ms == 0:
+            self.guide.visible = False
+            self.guide.active = False
+
+        profiler.section("sequence")
+        # ===== Run sequence =====
+        if self.sequence and enemy:
+            step = self.sequence["steps"][self.sequence["idx"]]
+
+            if step == "player_attack":
+                if not self.sequence["started"]:
+                    desired = self.sequence.get("attack_anim", "attack")
+                    if desired not in ("attack", "attack2") or (
+                        desired not in p.animations
+                    ):
+                        desired = "attack"
+                    p.play_attack_anim_named(desired, ignore_locked=True)
+                    self.sequence["started"] = True
+
+                if p.just_finished in ("attack", "attack2"):
+                    self.sequence["idx"] += 1
+                    self.sequence["started"] = False
+
+            elif step == "enemy_hit":
+                if not self.sequence["started"]:
+                    enemy.locked = True
+                    enemy.set_state("hit")
+                    self.sequence["started"] = True
+                if enemy.just_finished == "hit":
+                    self.sequence["idx"] += 1
+                    self.sequence["started"] = False
+
+            elif step == "enemy_death":
+                if not self.sequence["started"]:
+                    enemy.locked = True
+                    enemy.set_state("death")
+                    self.sequence["started"] = True
+                if enemy.just_finished == "death":
+                    enemy.challenge_ms_left = None
+                    enemy.dead = True
+                    enemy.kill()
+                    self.enemy_group.empty()
+                    self.level2_progress = 0.0
+                    p.set_full_lock(False)
+                    p.set_challenge_lock(False)
+                    p.locked = False
+                    if p.on_ground:
+                        p.set_state("idle")
+                    self.sequence = None
+                    enemy = None
+
+            elif step == "enemy_attack":
+                if not self.sequence["started"]:
+                    enemy.locked = True
+                    enemy.set_state("attack")
+                    self.sequence["started"] = True
+                if enemy.just_finished == "attack":
+                    dmg = getattr(enemy, "damage", 1)
+                    p.start_hit(damage=dmg)
+                    self.sequence["idx"] += 1
+                    self.sequence["started"] = False
+
+            elif step == "player_hit":
+                if not self.sequence["started"]:
+                    self.sequence["started"] = True
+                if p.just_finished == "hit":
+                    self.sequence["idx"] += 1
+                    self.sequence["started"] = False
+
+            if self.sequence and self.sequence["idx"] >= len(self.sequence["steps"]):
+                self.sequence = None
+                e2 = self.enemy_group.sprites()[0] if self.enemy_group.sprites() else None
+                if e2 and not e2.dead:
+                    pending_start_next = True
+
+        profiler.section("level_up")
+        # ===== Level up =====
+        if self.level == 2 and self.level2_kills >= LEVEL2_KILL_TARGET:
+            self.level2_kills = 0
+            self.level = 3
+            self.level2_progress = 0
+            self.enemy_group.empty()
+            self.coin_group.empty()
+            self.obstacle_group.empty()
+            self.challenge_expect_key = "J"
+
+        if self.level == 3 and self.level3_kills >= LEVEL3_KILL_TARGET:
+            self.level3_kills = 0
+            self.level = 4
+            self.level2_progress = 0
+            self.enemy_group.empty()
+            self.coin_group.empty()
+            self.obstacle_group.empty()
+            self.challenge_expect_key = "J"
+
+        if self.level == 4 and self.level4_kills >= LEVEL4_KILL_TARGET:
+            self.level = 5
+            self.level2_progress = 0.0
+            self.enemy_group.empty()
+            self.coin_group.empty()
+            self.obstacle_group.empty()
+            self.projectile_group.empty()
+            p.set_full_lock(False)
+            p.set_challenge_lock(False)
 
-    # ===== Draw =====
-    screen.fill((30, 30, 30))
-    pygame.draw.line(screen, (70, 70, 70), (0, GROUND_Y), (W, GROUND_Y), 2)
-    parallax.update(p.is_moving, dt)
-    parallax.draw(screen)
-    prop_group.draw(screen)
-
-    # พอ pause ให้หยุด parallax ด้วย (ส่ง dt=0 และ is_moving=False)
-    if not game_paused:
-        parallax.update(p.is_moving, dt)
-    else:
-        parallax.update(False, 0)
-    parallax.draw(screen)
-    prop_group.draw(screen)
-
-    # Guide (วาดพื้นหลังเก่าก่อน แล้วค่อยวาดไกด์)
-    guide_group.update()  # Guide.update() ของคุณไม่รับ dt
-    if guide.visible:
-        draw_guide_background(screen, guide.rect)
-        guide_group.draw(screen)
-
-    player_group.draw(screen)
-    coin_group.draw(screen)
-    obstacle_group.draw(screen)
-    enemy_group.draw(screen)
-    projectile_group.draw(screen)
-
-    # Progress bar
-    bar_w, bar_h = 320, 14
-    x, y = 620, 16
-    pygame.draw.rect(screen, (80, 80, 80), (x, y, bar_w, bar_h), border_radius=6)
-    fill_w = int(
-        bar_w
-        * (
-            (progress / PROGRESS_TO_SPAWN)
-            if level == 1
-            else (level2_progress / LEVEL2_PROGRESS_MAX)
+        # ----- Orphan sequence cleanup -----
+        if self.sequence is not None and not self.enemy_group.sprites():
+            self.sequence = None
+
+        profiler.section("locks")
+        # ===== Centralize locks =====
+        enemy = self.enemy_group.sprites()[0] if self.enemy_group.sprites() else None
+        in_sequence = self.sequence is not None
+        in_challenge = bool(enemy and enemy.challenge_ms_left is not None)
+        in_approach = bool(
+            enemy and enemy.challenge_ms_left is None and enemy.state == "run"
         )
-    )
-    pygame.draw.rect(screen, (180, 220, 120), (x, y, fill_w, bar_h), border_radius=6)
+        in_combat = bool(enemy) and (in_sequence or in_challenge or in_approach)
 
-    # Hearts
-    draw_hearts(screen, p, pos=(20, 20), spacing=4)
+        p.set_full_lock(in_combat)
+        p.set_challenge_lock(in_challenge)
 
-    # Text
-    if level == 1:
-        txt = font.render(
-            f"Level {level} - Coins {coins_collected}/{COINS_TO_PASS}", True, (0, 0, 0)
-        )
-    elif level == 2:
-        txt = font.render(
-            f"Level {level} - Kills {level2_kills}/{LEVEL2_KILL_TARGET}",
-            True,
-            (0, 0, 0),
-        )
-    elif level == 3:
-        txt = font.render(
-            f"Level {level} - Kills {level3_kills}/{LEVEL3_KILL_TARGET}",
-            True,
-            (0, 0, 0),
-        )
-    elif level == 4:
-        txt = font.render(
-            f"Level {level} - Kills {level4_kills}/{LEVEL4_KILL_TARGET}",
-            True,
-            (0, 0, 0),
-        )
-    else:
-        txt = font.render(
-            f"Level {level} - Kills {level5_kills_total} (boss every {LEVEL5_CYCLE_TARGET})",
-            True,
-            (0, 0, 0),
+        if not in_combat:
+            p.locked = False
+            p.set_challenge_lock(False)
+            if p.on_ground and p.state not in ("idle", "run"):
+                p.set_state("idle")
+
+        if pending_start_next:
+            e2 = self.enemy_group.sprites()[0] if self.enemy_group.sprites() else None
+            if e2 and not e2.dead:
+                e2.start_challenge(p)
+            pending_start_next = False
+
+        profiler.section("parallax")
+        # พอ pause ให้หยุด parallax ด้วย (ส่ง dt=0 และ is_moving=False)
+        if not self.game_paused:
+            self.parallax.update(p.is_moving, dt)
+        else:
+            self.parallax.update(False, 0)
+        self.guide_group.update(dt)
+        profiler.end_section()
+
+        # ===== ตรวจสอบถ้าตายหมดหัวใจ =====
+        if p.dead or p.hp <= 0:
+            print("💀 Player is dead — showing Game Over")
+            self.manager.go("game_over")
+
+    # ---------- Draw ----------
+    def _world_groups(self):
+        return (
+            self.prop_group,
+            self.player_group,
+            self.coin_group,
+            self.obstacle_group,
+            self.enemy_group,
+            self.projectile_group,
         )
-    screen.blit(txt, (x, y + 20))
-
-    # Challenge HUD
-    enemy = enemy_group.sprites()[0] if enemy_group.sprites() else None
-    if enemy:
-        txt2 = font.render(f"Enemy HP: {enemy.hp}", True, (0, 0, 0))
-        screen.blit(txt2, (20, 60))
-        if enemy.challenge_ms_left:
-            left = max(0, enemy.challenge_ms_left) // 1000 + 1
-            need_key = challenge_expect_key if level >= 3 else "J"
-            txt3 = font.render(
-                f"Challenge: press {need_key} >=3 in {left}s", True, (0, 0, 0)
+
+    def backdrop_key(self, alpha=1.0):
+        """
+        สิ่งที่กำหนดหน้าตาฉากหลัง (parallax + props + กรอบไกด์) — ค่าเดิม = ฉากหลังนิ่ง ใช้ dirty rect ได้
+        None = ต้องวาดเต็มจอ (หน้า pause มี overlay ทับทั้งจอ)
+        """
+        if self.game_paused:
+            return None
+        parallax_t = lerp(self._prev_parallax_t, self.parallax.t, alpha)
+        props = tuple(spr.rect.topleft for spr in self.prop_group)
+        return (round(parallax_t, 3), props, self.guide.visible)
+
+    def draw_backdrop(self, screen, alpha=1.0):
+        """ฉากหลังที่ไม่ขยับถ้าผู้เล่นไม่เดิน: พื้น, parallax, props, กรอบไกด์"""
+        prev = self._prev_pos
+        parallax_t = lerp(self._prev_parallax_t, self.parallax.t, alpha)
+        # พื้น + เส้นพื้น + sky อยู่ใน background ของ parallax แล้ว (blit ครั้งเดียว)
+        if not self.parallax.opaque:
+            screen.fill((30, 30, 30))
+        self.parallax.draw(screen, parallax_t)
+        draw_interpolated(screen, self.prop_group, prev, alpha)
+
+        # Guide (วาดพื้นหลังเก่าก่อน แล้วค่อยวาดไกด์)
+        if self.guide.visible:
+            draw_guide_background(screen, self.guide.rect)
+
+    def draw_actors(self, screen, alpha=1.0):
+        """ไกด์ + sprite ที่ขยับ/เล่นแอนิเมชัน คืนลิสต์ rect ที่วาด"""
+        prev = self._prev_pos
+        rects = []
+        if self.guide.visible:
+            rects += draw_interpolated(screen, self.guide_group, prev, alpha)
+
+        rects += draw_interpolated(screen, self.player_group, prev, alpha)
+        rects += draw_interpolated(screen, self.coin_group, prev, alpha)
+        rects += draw_interpolated(screen, self.obstacle_group, prev, alpha)
+        rects += draw_interpolated(screen, self.enemy_group, prev, alpha)
+        rects += draw_interpolated(screen, self.projectile_group, prev, alpha)
+        return rects
+
+    def draw_hud(self, screen):
+        """แถบ progress, หัวใจ, ข้อความเลเวล/ชาเลนจ์ คืนลิสต์ rect ที่วาด"""
+        p = self.player_group.sprite
+        # Progress bar
+        bar_w, bar_h = 320, 14
+        x, y = 620, 16
+        rects = [pygame.draw.rect(screen, (80, 80, 80), (x, y, bar_w, bar_h), border_radius=6)]
+        fill_w = int(
+            bar_w
+            * (
+                (self.progress / PROGRESS_TO_SPAWN)
+                if self.level == 1
+                else (self.level2_progress / LEVEL2_PROGRESS_MAX)
             )
-            screen.blit(txt3, (20, 84))
+        )
+        rects.append(pygame.draw.rect(screen, (180, 220, 120), (x, y, fill_w, bar_h), border_radius=6))
 
-            # delta แบบเรียลไทม์
-            current_delta = max(
-                0, p.attack_pressed_total - enemy.player_attack_baseline
+        # Hearts
+        rects.append(draw_hearts(screen, p, pos=(20, 20), spacing=4))
+
+        # Text
+        if self.level == 1:
+            txt = render_text(
+                font, f"Level {self.level} - Coins {self.coins_collected}/{COINS_TO_PASS}", (0, 0, 0)
+            )
+        elif self.level == 2:
+            txt = render_text(
+                font,
+                f"Level {self.level} - Kills {self.level2_kills}/{LEVEL2_KILL_TARGET}",
+                (0, 0, 0),
+            )
+        elif self.level == 3:
+            txt = render_text(
+                font,
+                f"Level {self.level} - Kills {self.level3_kills}/{LEVEL3_KILL_TARGET}",
+                (0, 0, 0),
             )
-            need_total = getattr(enemy, "required_delta", 3)
-            txt_delta = font.render(
-                f"Count: {current_delta}/{need_total}", True, (0, 0, 0)
+        elif self.level == 4:
+            txt = render_text(
+                font,
+                f"Level {self.level} - Kills {self.level4_kills}/{LEVEL4_KILL_TARGET}",
+                (0, 0, 0),
+            )
+        else:
+            txt = render_text(
+                font,
+                f"Level {self.level} - Kills {self.level5_kills_total} (boss every {LEVEL5_CYCLE_TARGET})",
+                (0, 0, 0),
             )
-            screen.blit(txt_delta, (20, 108))
+        rects.append(screen.blit(txt, (x, y + 20)))
+
+        # Challenge HUD
+        enemy = self.enemy_group.sprites()[0] if self.enemy_group.sprites() else None
+        if enemy:
+            txt2 = render_text(font, f"Enemy HP: {enemy.hp}", (0, 0, 0))
+            rects.append(screen.blit(txt2, (20, 60)))
+            if enemy.challenge_ms_left:
+                left = int(max(0, enemy.challenge_ms_left)) // 1000 + 1   # นับถอยหลังเป็น float ตั้งแต่ใช้ STEP_MS
+                need_key = self.challenge_expect_key if self.level >= 3 else "J"
+                txt3 = render_text(
+                    font, f"Challenge: press {need_key} >=3 in {left}s", (0, 0, 0)
+                )
+                rects.append(screen.blit(txt3, (20, 84)))
 
-    # hint = font.render(
-    #     f"J = attack, ALT = {ALT_KEY}, I = collect coin, R = Revive", True, (0, 0, 0)
-    # )
-    # screen.blit(hint, (20, 132))
+                # delta แบบเรียลไทม์
+                current_delta = max(
+                    0, p.attack_pressed_total - enemy.player_attack_baseline
+                )
+                need_total = getattr(enemy, "required_delta", 3)
+                txt_delta = render_text(font, f"Count: {current_delta}/{need_total}", (0, 0, 0))
+                rects.append(screen.blit(txt_delta, (20, 108)))
+
+        # hint = font.render(
+        #     f"J = attack, ALT = {ALT_KEY}, I = collect coin, R = Revive", True, (0, 0, 0)
+        # )
+        # screen.blit(hint, (20, 132))
+        return rects
+
+    def draw_pause(self, screen):
+        # ===== Overlay เมื่อ pause =====
+        if self.game_paused:
+            overlay = pygame.Surface((W, H))
+            overlay.set_alpha(180)
+            overlay.fill((0, 0, 0))
+            screen.blit(overlay, (0, 0))
+
+            # วาดหัวข้อ
+            title = render_text(font, "GAME PAUSED", (255, 255, 255))
+            screen.blit(title, title.get_rect(center=(W // 2, H // 2 - 80)))
+
+            # วาดเมนูแต่ละตัว
+            for i, item in enumerate(pause_menu_items):
+                color = (255, 255, 0) if i == self.pause_menu_selection else (200, 200, 200)
+                text = render_text(font, item, color)
+                rect = text.get_rect(center=(W // 2, H // 2 + i * 40))
+                screen.blit(text, rect)
+
+    def mark_dirty(self, rect):
+        """ของที่วาดทับหลังฉากนี้ (เช่น profiler overlay) ให้ dirty renderer ลบออกเฟรมหน้า"""
+        if self.renderer is not None:
+            self.renderer.mark_dirty(rect)
+
+    def draw(self, screen, alpha=1.0):
+        """
+        alpha = สัดส่วนเวลาระหว่าง tick ก่อนหน้ากับ tick ล่าสุด (0..1)
+        คืน None = ให้ flip ทั้งจอ, คืนลิสต์ rect = อัปเดตเฉพาะส่วนนั้น (โหมด dirty rect)
+        """
+        if self.renderer is not None:
+            return self.renderer.draw(self, screen, alpha)
+
+        profiler.section("draw_world")
+        self.draw_backdrop(screen, alpha)
+        self.draw_actors(screen, alpha)
+        profiler.section("draw_hud")
+        self.draw_hud(screen)
+        profiler.section("draw_pause")
+        self.draw_pause(screen)
+        profiler.end_section()
+        return None
+
+
+class GameOverScene:
+    """หน้า Game Over: ค้างภาพเฟรมสุดท้ายไว้ใต้ overlay แล้วรอให้ผู้เล่นกด Joystick กลับหน้า Home"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.background = manager.screen.copy()
+        self.game_over_font = get_font(None, 72)
+        self.small_font = get_font(None, 36)
+
+    def enter(self):
+        # 🔄 ส่งสัญญาณรีเซ็ตไป STM32 ทันทีที่ Game Over
+        send_serial(b"R\n", "reset LCD/Game Over")
+
+    def on_quit(self):
+        send_reset_signal()
+
+    def go_home(self):
+        send_reset_signal()
+        self.manager.go("home")
+
+    def update(self, dt, events, serial_cmds):
+        # ✅ อ่านจาก serial (ปุ่ม joystick)
+        for cmd in serial_cmds:
+            # กรณีข้อมูลมาจาก dictionary แบบ {"type":"JOY", "x":..., "y":..., "btn":...}
+            if isinstance(cmd, dict) and cmd.get("type") == "JOY":
+                if cmd.get("btn") == 1:  # ปุ่มถูกกด
+                    print("🏠 Joystick button pressed — returning Home")
+                    self.go_home()
+                    return
 
-    # ===== Overlay เมื่อ pause =====
-    if game_paused:
+            # ถ้าเป็นข้อความทั่วไป (เช่น "BTN" หรือ "I" "J" "M" ที่มาจาก MCU)
+            elif cmd == "BTN" or cmd == "R":
+                print("🏠 Joystick button signal — returning Home")
+                self.go_home()
+                return
+
+        # ✅ รองรับกดจากคีย์บอร์ดด้วย (ใช้ตอนเทสต์)
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_SPACE, pygame.K_RETURN):
+                print("🏠 Space/Enter pressed — returning Home")
+                self.go_home()
+                return
+
+    def draw(self, screen):
+        screen.blit(self.background, (0, 0))
         overlay = pygame.Surface((W, H))
-        overlay.set_alpha(180)
         overlay.fill((0, 0, 0))
+        overlay.set_alpha(200)
         screen.blit(overlay, (0, 0))
 
-        # วาดหัวข้อ
-        title = font.render("GAME PAUSED", True, (255, 255, 255))
-        screen.blit(title, title.get_rect(center=(W // 2, H // 2 - 80)))
+        text = render_text(self.game_over_font, "GAME OVER", (255, 0, 0))
+        sub = render_text(self.small_font, "Press Joystick to go Home", (255, 255, 255))
+
+        screen.blit(text, text.get_rect(center=(W // 2, H // 2 - 40)))
+        screen.blit(sub, sub.get_rect(center=(W // 2, H // 2 + 40)))
 
-        # วาดเมนูแต่ละตัว
-        for i, item in enumerate(pause_menu_items):
-            color = (255, 255, 0) if i == pause_menu_selection else (200, 200, 200)
-            text = font.render(item, True, color)
-            rect = text.get_rect(center=(W // 2, H // 2 + i * 40))
-            screen.blit(text, rect)
 
-    # ===== ตรวจสอบถ้าตายหมดหัวใจ =====
-    if p.dead or p.hp <= 0:
-        print("💀 Player is dead — showing Game Over")
-        show_game_over()
+if __name__ == "__main__":
+    import app
 
-    pygame.display.flip()
+    app.run("game", player_class=sys.argv[1] if len(sys.argv) > 1 else "Unknown")
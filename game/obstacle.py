@@ -1,5 +1,8 @@
 # obstacle.py
 import pygame, random
+from sprite_pool import PooledSprite
+
+_IMAGES = {}   # (path, scale) -> surface ที่สเกลแล้ว (ทุกอุปสรรคใช้รูปชุดเดียวกัน โหลดครั้งเดียว)
 
 def _load_image(path, scale):
     surf = pygame.image.load(path).convert_alpha()
@@ -11,7 +14,14 @@ def _load_image(path, scale):
         surf = pygame.transform.smoothscale(surf, (int(scale[0]), int(scale[1])))
     return surf
 
-class Obstacle(pygame.sprite.Sprite):
+def _cached_image(path, scale):
+    key = (path, tuple(scale) if isinstance(scale, list) else scale)
+    surf = _IMAGES.get(key)
+    if surf is None:
+        surf = _IMAGES[key] = _load_image(path, scale)
+    return surf
+
+class Obstacle(PooledSprite):
     def __init__(
         self,
         pos=(900, 420),
@@ -24,17 +34,20 @@ class Obstacle(pygame.sprite.Sprite):
     ):
         super().__init__()
 
-        # ===== สุ่มรูปจาก assets =====
+        # ===== รูปจาก assets (โหลดผ่านแคช ทุกไฟล์ในลิสต์ครั้งเดียว) =====
         if image_paths:
-            path = random.choice(image_paths) if isinstance(image_paths, (list, tuple)) else image_paths
-            self.image = _load_image(path, scale)
+            self.random_image = isinstance(image_paths, (list, tuple))
+            paths = image_paths if self.random_image else [image_paths]
+            self.images = [_cached_image(path, scale) for path in paths]
         else:
             # ถ้าไม่ส่ง assets มา ใช้สี่เหลี่ยมเดิม
-            self.image = pygame.Surface((40, 40), pygame.SRCALPHA)
-            self.image.fill((220, 160, 80))
+            fallback = pygame.Surface((40, 40), pygame.SRCALPHA)
+            fallback.fill((220, 160, 80))
+            self.random_image = False
+            self.images = [fallback]
 
-        # วางให้ "ฐาน" ชิดพื้นด้วย midbottom
-        self.rect = self.image.get_rect(midbottom=pos)
+        self.image = self.images[0]
+        self.rect = self.image.get_rect()
 
         # พารามิเตอร์
         self.stop_offset   = stop_offset
@@ -42,6 +55,15 @@ class Obstacle(pygame.sprite.Sprite):
         self.exit_step     = exit_speed
         self.pass_margin   = pass_margin
 
+        self.reset(pos)
+
+    def reset(self, pos=(900, 420)):
+        """สุ่มรูปใหม่ + วางที่ pos + กลับไปสถานะ approach (ใช้ตอนดึงจาก pool)"""
+        self.image = random.choice(self.images) if self.random_image else self.images[0]
+        # วางให้ "ฐาน" ชิดพื้นด้วย midbottom
+        self.rect.size = self.image.get_size()
+        self.rect.midbottom = pos
+
         # สถานะ
         self.state    = "approach"    # approach -> wait -> pass -> tail
         self.target_x = None
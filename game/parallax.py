@@ -1,17 +1,38 @@
+from math import gcd
+
 import pygame
 
+MAX_STRIP_W = 8192  # strip ที่รวมหลายเลเยอร์กว้างได้ไม่เกินนี้ (ค.ร.น. ของความกว้าง) ไม่งั้นแยก strip
+
+
 def load_scaled_alpha(path, size):
     img = pygame.image.load(path).convert_alpha()
     return pygame.transform.scale(img, size)
 
+
+def is_opaque(surf):
+    """ทุกพิกเซล alpha = 255 -> ใช้ convert() ได้ (blit แบบไม่ต้อง blend เร็วกว่า)"""
+    w, h = surf.get_size()
+    return pygame.mask.from_surface(surf, 254).count() == w * h
+
+
+def _finish(surf):
+    return surf.convert() if is_opaque(surf) else surf.convert_alpha()
+
+
 class ParallaxBG:
     """
     layers รับได้หลายรูปแบบ:
       (path, speed)
       (path, speed, scale)                # scale เป็น float หรือ (w,h)
       (path, speed, scale, bottom_y)      # จัดขอบล่างให้อยู่ที่ bottom_y (เช่น GROUND_Y)
+
+    ตอนสร้างจะประกอบภาพไว้ก่อน:
+      - base (surface ขนาดจอ ถ้ามี) + เลเยอร์ speed 0 ชุดล่างสุด -> background ภาพเดียว
+      - เลเยอร์ที่ติดกันและ speed เท่ากัน -> รวมเป็น strip เดียว ปูซ้ำไว้กว้างพอ (รอบ + W)
+    draw = blit background 1 ครั้ง + strip ละ 1 ครั้ง (เลือกช่วงด้วย area แทนการปูกระเบื้องทุกเฟรม)
     """
-    def __init__(self, W, H, layers):
+    def __init__(self, W, H, layers, base=None):
         self.W, self.H = W, H
         self.layers = []
         for item in layers:
@@ -37,17 +58,79 @@ class ParallaxBG:
             self.layers.append({"surf": surf, "sp": float(sp), "w": w, "y": y})
 
         self.t = 0.0
+        self._bake(base)
+
+    # ---------- ประกอบภาพล่วงหน้า ----------
+    def _tile(self, dst, L, width, top=0):
+        """ปูเลเยอร์ L ลง dst ตั้งแต่ x=0 ถึง width (offset 0)"""
+        surf, w = L["surf"], L["w"]
+        for x in range(0, width, w):
+            dst.blit(surf, (x, L["y"] - top))
+
+    def _bake(self, base):
+        rest = list(self.layers)
+
+        # 1) เลเยอร์นิ่งที่อยู่ล่างสุด (เช่น sky) -> รวมกับ base เป็นฉากหลังภาพเดียว
+        static = []
+        while rest and rest[0]["sp"] == 0:
+            static.append(rest.pop(0))
+        if base is not None or static:
+            bg = pygame.Surface((self.W, self.H), pygame.SRCALPHA)
+            if base is not None:
+                bg.blit(base, (0, 0))
+            for L in static:
+                self._tile(bg, L, self.W)
+            # ฉากหลังทึบเต็มจอ = ไม่ต้อง fill จอก่อนวาด
+            self.opaque = is_opaque(bg)
+            self.background = bg.convert() if self.opaque else bg.convert_alpha()
+        else:
+            self.background = None
+            self.opaque = False
+
+        # 2) เลเยอร์ที่เหลือ: จับกลุ่มที่ติดกันและ speed เท่ากัน (ลำดับการซ้อนยังเหมือนเดิม)
+        groups = []
+        for L in rest:
+            g = groups[-1] if groups else None
+            if g and g["sp"] == L["sp"]:
+                period = g["period"] * L["w"] // gcd(g["period"], L["w"])
+                if period <= MAX_STRIP_W:
+                    g["layers"].append(L)
+                    g["period"] = period
+                    continue
+            groups.append({"sp": L["sp"], "period": L["w"], "layers": [L]})
+
+        self.strips = [self._build_strip(g) for g in groups]
+
+    def _build_strip(self, g):
+        layers, period = g["layers"], g["period"]
+        top = min(L["y"] for L in layers)
+        bottom = max(L["y"] + L["surf"].get_height() for L in layers)
+        width = period + self.W
+        strip = pygame.Surface((width, bottom - top), pygame.SRCALPHA)
+        for L in layers:
+            self._tile(strip, L, width, top)
+
+        # ตัดแถวโปร่งใสบน/ล่างทิ้ง (ground.png ส่วนใหญ่โปร่งใส -> blit พื้นที่น้อยลงมาก)
+        box = strip.get_bounding_rect()
+        if box.h and box.h < strip.get_height():
+            strip = strip.subsurface((0, box.y, width, box.h)).copy()
+            top += box.y
+        return {"surf": _finish(strip), "sp": g["sp"], "period": period, "y": top, "h": strip.get_height()}
+
+    @property
+    def blits_per_frame(self):
+        return len(self.strips) + (1 if self.background is not None else 0)
 
     def update(self, moving, dt_ms):
         if moving:
             self.t += dt_ms * 0.12
 
-    def draw(self, screen):
-        for L in self.layers:
-            surf, sp, w, y = L["surf"], L["sp"], L["w"], L["y"]
-            off = int(self.t * sp) % w
-            # ปูกระเบื้องแนวนอนให้เต็มจอ
-            x0 = -off
-            tiles = (self.W // w) + 2
-            for i in range(-1, tiles):
-                screen.blit(surf, (x0 + i * w, y))
+    def draw(self, screen, t=None):
+        """t = ตำแหน่งเลื่อนที่จะวาด (ค่า interpolate ระหว่าง tick) ไม่ใส่ = self.t"""
+        t = self.t if t is None else t
+        if self.background is not None:
+            screen.blit(self.background, (0, 0))
+        W = self.W
+        for S in self.strips:
+            off = int(t * S["sp"]) % S["period"]
+            screen.blit(S["surf"], (0, S["y"]), (off, 0, W, S["h"]))
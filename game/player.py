@@ -1,6 +1,9 @@
 # player.py
 import pygame
 from animation_helper import load_animation_with_fallback, _ensure_animation_safety
+from anim_clock import Animator, speed_to_fps
+
+ONE_SHOT_STATES = ("attack", "attack2", "hit", "death")   # เล่นรอบเดียวแล้วแจ้ง just_finished
 
 CHAR_CONFIGS = {
     "wizard": {
@@ -50,7 +53,7 @@ class Player(pygame.sprite.Sprite):
         self.anim_speed = cfg["anim_speed"]
 
         self.state = "idle"
-        self.frame_index = 0.0
+        self.anim = Animator(self._state_fps("idle"))
         self.image = self.animations[self.state][0]
         self.rect = self.image.get_rect(midbottom=pos)
 
@@ -91,7 +94,11 @@ class Player(pygame.sprite.Sprite):
             return
         if self.state != new_state:
             self.state = new_state
-            self.frame_index = 0.0
+            self.anim.play(self._state_fps(new_state),
+                           "once" if new_state in ONE_SHOT_STATES else "loop")
+
+    def _state_fps(self, state):
+        return speed_to_fps(self.anim_speed.get(state, 0.18))
 
     def set_full_lock(self, active: bool):
         self.full_lock = active
@@ -188,30 +195,20 @@ class Player(pygame.sprite.Sprite):
                     if not self.locked:
                         self.set_state("idle")
 
-    def animate(self):
+    def animate(self, dt_ms=None):
         self.just_finished = None
         frames = self.animations.get(self.state) or self.animations["idle"]
-        end = len(frames)
-        if end == 0:
+        if not frames:
             return
 
-        self.frame_index += self.anim_speed.get(self.state, 0.18)
-
-        if self.state in ("attack","attack2","hit"):
-            if self.frame_index >= end:
-                self.frame_index = 0.0
-                self.just_finished = self.state
+        if self.anim.advance(dt_ms, len(frames)):
+            self.just_finished = self.state
+            if self.state != "death":   # death ค้างเฟรมสุดท้าย
                 self.locked = False
                 self.set_state("idle" if self.on_ground else "jump")
-        elif self.state == "death":
-            if self.frame_index >= end:
-                self.frame_index = end-1
-                self.just_finished = "death"
-        else:
-            if self.frame_index >= end:
-                self.frame_index = 0.0
-
-        surf = frames[int(self.frame_index)]
+                frames = self.animations.get(self.state) or self.animations["idle"]
+
+        surf = frames[self.anim.index]
         midbottom = self.rect.midbottom
         self.image = surf
         self.rect = self.image.get_rect(midbottom=midbottom)
@@ -223,4 +220,4 @@ class Player(pygame.sprite.Sprite):
 
         self.handle_input(keys)
         self.apply_gravity(ground_y)
-        self.animate()
+        self.animate(dt_ms)
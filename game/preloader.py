@@ -0,0 +1,126 @@
+# preloader.py
+# อุ่นแคชเฟรมล่วงหน้าใน thread แยก: ระหว่างเล่นเลเวลปัจจุบัน ก็ decode ชีตของศัตรูเลเวลถัดไปไว้
+# worker thread: อ่านไฟล์ + decode (PNG หรือ blob จาก frame_store) เท่านั้น
+# main thread:   pump() เอาผลมา convert / slice / ใส่แคชกลาง ทีละนิดตามงบเวลาต่อเฟรม
+import queue
+import threading
+import time
+import pygame
+
+import frame_store
+from animation_helper import (
+    frames_from_sheet,
+    is_frames_cached,
+    put_frames_cached,
+    resolve_asset_path,
+)
+from enemy import CHAR_CONFIGS as ENEMY_CONFIGS
+
+
+def _enemy_sheets(enemy_type):
+    cfg = ENEMY_CONFIGS.get(enemy_type, ENEMY_CONFIGS["mushroom"])
+    sheets = []
+    for paths in cfg["assets"].values():
+        path = resolve_asset_path(paths)
+        if path is not None:
+            sheets.append((path, cfg["scale"]))
+    return sheets
+
+
+class AssetPreloader:
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._done = queue.Queue()
+        self._pending = set()      # key ที่ส่งให้ worker แล้วแต่ยังไม่เข้าแคช (main thread เท่านั้น)
+        self._thread = threading.Thread(target=self._run, name="asset-preloader", daemon=True)
+        self._thread.start()
+
+    # ---------- ฝั่ง worker ----------
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            kind = job[0]
+            if kind == "save":
+                _, blob_key, frames = job
+                frame_store.save(blob_key, frames)
+                continue
+
+            _, key, path, scale = job
+            try:
+                blob_key = None
+                if frame_store.enabled():
+                    blob_key = frame_store.entry_key(path, (float(scale), None, "midbottom"))
+                    frames = frame_store.load(blob_key, convert=False)
+                    if frames is not None:
+                        self._done.put(("frames", key, frames, None))
+                        continue
+                sheet = pygame.image.load(path)      # decode PNG นอก main thread
+                self._done.put(("sheet", key, sheet, blob_key))
+            except Exception as e:
+                self._done.put(("error", key, e, None))
+
+    # ---------- ฝั่ง main thread ----------
+    def warm_sheet(self, path, scale):
+        key = (path, scale)
+        if key in self._pending or is_frames_cached(path, scale):
+            return
+        self._pending.add(key)
+        self._jobs.put(("load", key, path, scale))
+
+    def warm_enemies(self, enemy_types):
+        """สั่งอุ่นชีตทุก state ของศัตรูในลิสต์ (เรียกตอนเริ่มเลเวล สำหรับ pool ของเลเวลถัดไป)"""
+        for etype in enemy_types:
+            for path, scale in _enemy_sheets(etype):
+                self.warm_sheet(path, scale)
+
+    def pump(self, budget_ms=4.0):
+        """รับผลจาก worker มาใส่แคช ไม่เกิน budget_ms ต่อครั้ง (อย่างน้อย 1 ชีตถ้ามีงาน)"""
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        handled = 0
+        while True:
+            try:
+                kind, key, payload, blob_key = self._done.get_nowait()
+            except queue.Empty:
+                break
+            path, scale = key
+            self._pending.discard(key)
+            if kind == "frames":
+                frames = [f.convert_alpha() for f in payload] if pygame.display.get_surface() else payload
+                put_frames_cached(path, frames, scale)
+            elif kind == "sheet":
+                frames = frames_from_sheet(payload, scale)
+                put_frames_cached(path, frames, scale)
+                if blob_key is not None:
+                    self._jobs.put(("save", blob_key, frames))
+            else:
+                print("⚠️ preload ไม่สำเร็จ:", path, payload)
+            handled += 1
+            if time.perf_counter() >= deadline:
+                break
+        return handled
+
+    def is_ready(self, enemy_type):
+        """ชีตทุก state ของศัตรูชนิดนี้อยู่ในแคชแล้ว -> spawn ได้โดยไม่สะดุด"""
+        return all(is_frames_cached(path, scale) for path, scale in _enemy_sheets(enemy_type))
+
+    def ready_state(self, enemy_types):
+        return {etype: self.is_ready(etype) for etype in enemy_types}
+
+    @property
+    def busy(self):
+        return bool(self._pending)
+
+    def wait(self, enemy_types, timeout_s=5.0):
+        """บล็อกจนศัตรูในลิสต์พร้อม (ใช้ตอนโหลดหน้าจอ ไม่ใช่ระหว่างเล่น)"""
+        deadline = time.perf_counter() + timeout_s
+        while not all(self.is_ready(t) for t in enemy_types):
+            if self.pump(budget_ms=50) == 0:
+                if not self._pending or time.perf_counter() >= deadline:
+                    break
+                time.sleep(0.001)
+        return all(self.is_ready(t) for t in enemy_types)
+
+    def stop(self):
+        self._jobs.put(None)
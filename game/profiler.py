@@ -0,0 +1,229 @@
+# profiler.py
+# จับเวลาแต่ละช่วงของเฟรม (events / serial / update / spawn / draw / flip ...) แล้วโชว์ p50/p95/p99 แบบ rolling
+#
+#   RINGFIT_PROFILE=1                    เปิดตั้งแต่เริ่ม (หรือกด F3 ระหว่างเล่นเพื่อเปิด/ปิด + overlay)
+#   RINGFIT_PROFILE_OUT=prof.jsonl       บันทึกทุกเฟรมลงไฟล์ (.jsonl = 1 เฟรม/บรรทัด, .csv = frame,scope,ms)
+#
+# ใช้งาน:
+#   profiler.section("serial")   ปิดช่วงก่อนหน้าแล้วเริ่มช่วงใหม่ (ไม่ต้องย่อหน้าโค้ดเดิม)
+#   with profiler.scope("x"):    จับเวลาเฉพาะบล็อก
+#   profiler.frame_end()         เรียกครั้งเดียวต่อเฟรม (หลัง flip)
+# ปิดอยู่ = ทุกฟังก์ชันเช็ก flag ตัวเดียวแล้ว return
+import os
+import csv
+import atexit
+import json
+import time
+from collections import deque
+
+WINDOW = 300                   # จำนวนเฟรมล่าสุดที่ใช้คิด percentile (~5 วินาทีที่ 60 FPS)
+OVERLAY_REFRESH_MS = 250       # render ตาราง overlay ใหม่ทุกกี่ ms (ไม่ render ทุกเฟรม)
+DUMP_FLUSH_FRAMES = 60         # flush ไฟล์ dump ทุกกี่เฟรม
+
+_now = time.perf_counter_ns
+
+_enabled = False
+_frame = {}                    # scope -> ns สะสมในเฟรมปัจจุบัน (update หลาย tick ต่อเฟรมรวมกัน)
+_windows = {}                  # scope -> deque ของ ms ต่อเฟรม
+_open_name = None
+_open_t0 = 0
+_frame_t0 = 0
+_frame_no = 0
+
+_dump_file = None
+_dump_writer = None            # csv.writer หรือ None (= jsonl)
+
+_overlay = None
+_overlay_at = 0
+_overlay_font = None
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(on):
+    global _enabled, _open_name, _frame_t0
+    _enabled = bool(on)
+    _frame.clear()
+    _open_name = None
+    _frame_t0 = _now()
+
+
+def toggle():
+    set_enabled(not _enabled)
+    print("⏱ profiler", "on" if _enabled else "off")
+    return _enabled
+
+
+def section(name):
+    """ปิดช่วงที่เปิดอยู่ แล้วเริ่มช่วง name"""
+    global _open_name, _open_t0
+    if not _enabled:
+        return
+    t = _now()
+    if _open_name is not None:
+        _frame[_open_name] = _frame.get(_open_name, 0) + (t - _open_t0)
+    _open_name = name
+    _open_t0 = t
+
+
+def end_section():
+    global _open_name
+    if not _enabled or _open_name is None:
+        return
+    _frame[_open_name] = _frame.get(_open_name, 0) + (_now() - _open_t0)
+    _open_name = None
+
+
+class _Scope:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = _now()
+        return self
+
+    def __exit__(self, *exc):
+        _frame[self.name] = _frame.get(self.name, 0) + (_now() - self.t0)
+        return False
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+def scope(name):
+    return _Scope(name) if _enabled else _NULL_SCOPE
+
+
+def frame_end():
+    """ปิดเฟรม: ย้ายเวลาสะสมเข้า rolling window และเขียนลงไฟล์ (ถ้าเปิด dump)"""
+    global _frame_t0, _frame_no
+    if not _enabled:
+        return
+    end_section()
+    t = _now()
+    _frame["frame"] = t - _frame_t0
+    _frame_t0 = t
+    _frame_no += 1
+
+    row = {}
+    for name, ns in _frame.items():
+        ms = ns / 1e6
+        row[name] = ms
+        win = _windows.get(name)
+        if win is None:
+            win = _windows[name] = deque(maxlen=WINDOW)
+        win.append(ms)
+    _frame.clear()
+
+    if _dump_file is not None:
+        if _dump_writer is not None:
+            for name, ms in row.items():
+                _dump_writer.writerow((_frame_no, name, f"{ms:.4f}"))
+        else:
+            _dump_file.write(json.dumps({"frame": _frame_no, "t_ns": t, "ms": row}) + "\n")
+        if _frame_no % DUMP_FLUSH_FRAMES == 0:
+            _dump_file.flush()   # เกมแครช/ถูก kill ก็ยังได้ข้อมูลถึงวินาทีล่าสุด
+
+
+def _pct(sorted_vals, q):
+    i = min(len(sorted_vals) - 1, int(q * (len(sorted_vals) - 1) + 0.5))
+    return sorted_vals[i]
+
+
+def percentiles(name):
+    """(p50, p95, p99) เป็น ms ของ scope name หรือ None ถ้ายังไม่มีข้อมูล"""
+    win = _windows.get(name)
+    if not win:
+        return None
+    vals = sorted(win)
+    return _pct(vals, 0.50), _pct(vals, 0.95), _pct(vals, 0.99)
+
+
+def summary():
+    """{scope: (p50, p95, p99)} เรียงจาก p95 มากไปน้อย"""
+    rows = {name: percentiles(name) for name in _windows}
+    return dict(sorted(rows.items(), key=lambda kv: -kv[1][1]))
+
+
+def reset():
+    _windows.clear()
+    _frame.clear()
+
+
+def start_dump(path):
+    """เริ่มบันทึกทุกเฟรมลงไฟล์ (.csv หรือ .jsonl) และเปิด profiler"""
+    global _dump_file, _dump_writer
+    stop_dump()
+    _dump_file = open(path, "w", newline="")
+    if path.lower().endswith(".csv"):
+        _dump_writer = csv.writer(_dump_file)
+        _dump_writer.writerow(("frame", "scope", "ms"))
+    else:
+        _dump_writer = None
+    if not _enabled:
+        set_enabled(True)
+    print(f"⏱ profiler dump -> {path}")
+
+
+@atexit.register
+def stop_dump():
+    """ปิดไฟล์ dump (app.py เรียกตอนปิดเกม + ลงทะเบียน atexit ไว้เผื่อ entry point อื่น)"""
+    global _dump_file, _dump_writer
+    if _dump_file is not None:
+        _dump_file.close()
+    _dump_file = None
+    _dump_writer = None
+
+
+def draw_overlay(screen, pos=(10, None)):
+    """วาดตาราง p50/p95/p99 มุมล่างซ้าย (render ใหม่ทุก OVERLAY_REFRESH_MS เท่านั้น) คืน rect ที่วาด"""
+    global _overlay, _overlay_at, _overlay_font
+    if not _enabled:
+        return None
+    import pygame
+
+    now_ms = pygame.time.get_ticks()
+    if _overlay is None or now_ms - _overlay_at >= OVERLAY_REFRESH_MS:
+        if _overlay_font is None:
+            _overlay_font = pygame.font.SysFont("consolas", 14)
+        font = _overlay_font
+        rows = [("scope", "p50", "p95", "p99 ms")]
+        for name, (p50, p95, p99) in summary().items():
+            rows.append((name, f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}"))
+        # วางทีละคอลัมน์ (ฟอนต์อาจไม่ใช่ monospace)
+        name_w = max(font.size(r[0])[0] for r in rows) + 10
+        num_w = font.size("000.00 ms")[0]
+        lh = font.get_linesize()
+        _overlay = pygame.Surface((name_w + num_w * 3 + 12, lh * len(rows) + 8), pygame.SRCALPHA)
+        _overlay.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            y = 4 + i * lh
+            _overlay.blit(font.render(row[0], True, (230, 255, 230)), (6, y))
+            for j, cell in enumerate(row[1:]):
+                _overlay.blit(font.render(cell, True, (230, 255, 230)), (6 + name_w + j * num_w, y))
+        _overlay_at = now_ms
+
+    x, y = pos
+    if y is None:
+        y = screen.get_height() - _overlay.get_height() - 10
+    return screen.blit(_overlay, (x, y))
+
+
+if os.environ.get("RINGFIT_PROFILE_OUT"):
+    start_dump(os.environ["RINGFIT_PROFILE_OUT"])
+elif os.environ.get("RINGFIT_PROFILE", "0") not in ("", "0"):
+    set_enabled(True)
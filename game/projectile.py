@@ -1,5 +1,8 @@
 # projectile.py
 import pygame
+from anim_clock import Animator
+
+_FRAMES = {}   # (path, frames, scale) -> เฟรมที่ตัด/สเกลแล้ว (ลูกไฟทุกลูกใช้ชุดเดียวกัน)
 
 def load_sheet(path):
     try:
@@ -24,6 +27,13 @@ def slice_sheet_horiz(sheet, frames=None, scale=None):
         images.append(surf)
     return images
 
+def load_frames_cached(path, frames=None, scale=None):
+    key = (path, frames, tuple(scale) if scale else None)
+    images = _FRAMES.get(key)
+    if images is None:
+        images = _FRAMES[key] = slice_sheet_horiz(load_sheet(path), frames=frames, scale=scale)
+    return images
+
 class Fireball(pygame.sprite.Sprite):
     def __init__(
         self,
@@ -42,6 +52,16 @@ class Fireball(pygame.sprite.Sprite):
         explode_fps=22
     ):
         super().__init__()
+
+        # ชีต + ตัดเฟรม (ผ่านแคช โหลดจากดิสก์ครั้งเดียว)
+        self.move_frames = load_frames_cached(move_path, frames=move_frames, scale=move_scale)
+        self.explode_frames = load_frames_cached(explode_path, frames=explode_frames, scale=explode_scale)
+
+        # ตั้งค่าอนิเมะ
+        self._move_fps = max(1, int(move_fps))
+        self._explode_fps = max(1, int(explode_fps))
+        self.anim = Animator(self._move_fps)
+
         self.dir_x = dir_x
         self.speed = speed
         self.damage = int(damage)
@@ -49,49 +69,33 @@ class Fireball(pygame.sprite.Sprite):
         self.timer_ms = 0
         self.max_life_ms = max_life_ms
 
-        # โหลดชีต + ตัดเฟรม
-        move_sheet = load_sheet(move_path)
-        explode_sheet = load_sheet(explode_path)
-        self.move_frames = slice_sheet_horiz(move_sheet, frames=move_frames, scale=move_scale)
-        self.explode_frames = slice_sheet_horiz(explode_sheet, frames=explode_frames, scale=explode_scale)
-
-        # ตั้งค่าอนิเมะ
-        self._move_fps = max(1, int(move_fps))
-        self._explode_fps = max(1, int(explode_fps))
-        self._move_frame_time = 1000 // self._move_fps
-        self._explode_frame_time = 1000 // self._explode_fps
-        self._move_acc = 0
-        self._explode_acc = 0
-        self._move_idx = 0
-        self._explode_idx = 0
-
         # รูปเริ่มต้น
-        self.image = self.move_frames[self._move_idx] if self.move_frames else move_sheet
+        self.image = self.move_frames[0]
         self.rect = self.image.get_rect(center=pos)
 
     def explode(self):
         if self.state == "explode":
             return
         self.state = "explode"
-        self._explode_acc = 0
-        self._explode_idx = 0
+        self.anim.play(self._explode_fps, "once")
         # รีเซ็นเตอร์รูปเฟรมแรกของระเบิด
-        center = self.rect.center
-        self.image = self.explode_frames[0] if self.explode_frames else self.image
-        self.rect = self.image.get_rect(center=center)
+        self._show(self.explode_frames[0] if self.explode_frames else self.image)
+
+    def _show(self, image):
+        if image is not self.image:
+            center = self.rect.center
+            self.image = image
+            self.rect.size = image.get_size()
+            self.rect.center = center
 
     def update(self, dt_ms, screen_rect=None):
         self.timer_ms += dt_ms
 
         if self.state == "fly":
             # อนิเมะบิน
-            self._move_acc += dt_ms
-            while self._move_acc >= self._move_frame_time and self.move_frames:
-                self._move_acc -= self._move_frame_time
-                self._move_idx = (self._move_idx + 1) % len(self.move_frames)
-                center = self.rect.center
-                self.image = self.move_frames[self._move_idx]
-                self.rect = self.image.get_rect(center=center)
+            if self.move_frames:
+                self.anim.advance(dt_ms, len(self.move_frames))
+                self._show(self.move_frames[self.anim.index])
 
             # เคลื่อนที่
             self.rect.x += int(self.dir_x * self.speed)
@@ -103,13 +107,7 @@ class Fireball(pygame.sprite.Sprite):
 
         elif self.state == "explode":
             # อนิเมะระเบิด (เล่นจบแล้ว kill)
-            self._explode_acc += dt_ms
-            while self._explode_acc >= self._explode_frame_time and self.explode_frames:
-                self._explode_acc -= self._explode_frame_time
-                self._explode_idx += 1
-                if self._explode_idx >= len(self.explode_frames):
-                    self.kill()
-                    return
-                center = self.rect.center
-                self.image = self.explode_frames[self._explode_idx]
-                self.rect = self.image.get_rect(center=center)
+            if not self.explode_frames or self.anim.advance(dt_ms, len(self.explode_frames)):
+                self.kill()
+                return
+            self._show(self.explode_frames[self.anim.index])
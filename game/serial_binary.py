@@ -0,0 +1,119 @@
+# serial_binary.py
+# โปรโตคอลแบบ binary (ทางเลือก) สำหรับลิงก์ STM32 แทนบรรทัด ASCII
+#
+# เฟรม:  A5 5A | LEN | TYPE | PAYLOAD (LEN-1 bytes) | SUM
+#   LEN = จำนวน byte ของ TYPE + PAYLOAD
+#   SUM = (ผลรวมของ LEN, TYPE และ PAYLOAD) & 0xFF
+#
+# ต่อพอร์ตแล้ว host ส่ง "BIN?\n" ถ้าเฟิร์มแวร์รองรับจะตอบบรรทัด "BIN OK" แล้วสลับเป็นเฟรม binary
+# ไม่ตอบภายในเวลาที่กำหนด -> ใช้ ASCII ต่อเหมือนเดิม
+import struct
+import time
+
+SYNC = b"\xA5\x5A"
+HELLO = b"BIN?\n"
+ACK = b"BIN OK"
+
+T_JOY = 0x01      # payload "<HHB": x, y, btn
+T_BUTTON = 0x02   # payload 1 byte: ตัวอักษร J/M/P/D/I/W
+T_PAUSE = 0x03
+T_RESUME = 0x04
+T_TEXT = 0x05     # payload utf-8 (เช่น "Time mm:ss ... Calories=") — เกมไม่ใช้ ข้ามไป
+
+_JOY = struct.Struct("<HHB")
+_BUTTONS = {c: chr(c).upper() for c in b"JMPDIWjmpdiw"}
+MAX_FRAME_LEN = 64
+
+
+def encode_frame(ftype, payload=b""):
+    body = bytes([len(payload) + 1, ftype]) + payload
+    return SYNC + body + bytes([sum(body) & 0xFF])
+
+
+def encode_joy(x, y, btn):
+    return encode_frame(T_JOY, _JOY.pack(x, y, btn))
+
+
+def encode_button(letter):
+    return encode_frame(T_BUTTON, letter.encode("ascii"))
+
+
+class BinaryFrameDecoder:
+    """ต่อเฟรมข้ามการ read, ตรวจ checksum, ถอด JOY ด้วย struct.unpack_from บน memoryview"""
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.stats = {"frames": 0, "bad_checksum": 0, "resync_bytes": 0, "unknown": 0}
+
+    def feed(self, data):
+        buf = self.buf
+        buf += data
+        cmds = []
+        pos = 0
+        n = len(buf)
+        with memoryview(buf) as view:
+            while n - pos >= 5:
+                if buf[pos] != 0xA5 or buf[pos + 1] != 0x5A:
+                    nxt = buf.find(SYNC, pos + 1)
+                    skip_to = nxt if nxt >= 0 else n - 1
+                    self.stats["resync_bytes"] += skip_to - pos
+                    pos = skip_to
+                    continue
+                length = buf[pos + 2]
+                if length == 0 or length > MAX_FRAME_LEN:
+                    self.stats["resync_bytes"] += 1
+                    pos += 1
+                    continue
+                end = pos + 3 + length
+                if end >= n:
+                    break                       # เฟรมยังมาไม่ครบ รอ read ถัดไป
+                if (sum(view[pos + 2:end]) & 0xFF) != buf[end]:
+                    self.stats["bad_checksum"] += 1
+                    pos += 1                    # เลื่อนหา sync ถัดไป
+                    continue
+                cmd = self._decode(buf[pos + 3], view, pos + 4, length - 1)
+                if cmd is not None:
+                    cmds.append(cmd)
+                self.stats["frames"] += 1
+                pos = end + 1
+        del buf[:pos]
+        return cmds
+
+    def _decode(self, ftype, view, off, size):
+        if ftype == T_JOY and size == _JOY.size:
+            x, y, btn = _JOY.unpack_from(view, off)
+            return {"type": "JOY", "x": x, "y": y, "btn": btn}
+        if ftype == T_BUTTON and size == 1:
+            return _BUTTONS.get(view[off])
+        if ftype == T_PAUSE:
+            return "PAUSE"
+        if ftype == T_RESUME:
+            return "RESUME"
+        if ftype != T_TEXT:
+            self.stats["unknown"] += 1
+        return None
+
+
+def negotiate_binary(port, timeout_s=0.3):
+    """
+    ถามเฟิร์มแวร์ว่ารองรับ binary ไหม
+    คืน (ok, ascii_bytes, binary_bytes) — bytes ที่อ่านมาระหว่างรอ:
+      ascii_bytes  = ส่วนก่อน ACK (หรือทั้งหมดถ้าไม่มี ACK) ให้ป้อน LineAssembler
+      binary_bytes = ส่วนหลังบรรทัด ACK ให้ป้อน BinaryFrameDecoder
+    """
+    port.write(HELLO)
+    port.flush()
+    got = bytearray()
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        chunk = port.read(64)
+        if not chunk:
+            continue
+        got += chunk
+        i = got.find(ACK)
+        if i >= 0:
+            nl = got.find(b"\n", i)
+            if nl < 0:
+                continue
+            return True, bytes(got[:i]), bytes(got[nl + 1:])
+    return False, bytes(got), b""
@@ -0,0 +1,398 @@
+# serial_broker.py
+# โปรเซสกลางที่ถือพอร์ต STM32 ไว้ตลอด แล้วกระจายคำสั่งที่ parse แล้วให้หลาย client ผ่าน Unix domain socket
+# เกม / หน้าจอแต่ละหน้า / เครื่องมือ monitor ต่อ broker แทนการเปิด COM3 เอง -> ไม่ต้องเปิด-ปิดพอร์ตซ้ำ
+#
+# รัน broker:   python serial_broker.py serve --port COM3
+# ให้เกมใช้:    RINGFIT_SERIAL_BROKER=<socket> python app.py        (serial_input จะต่อ broker แทนพอร์ต)
+# ดูสด:         python serial_broker.py monitor
+#
+# โปรโตคอลบน socket: JSON ทีละบรรทัด
+#   client -> broker: {"hello": "game", "role": "consumer" | "monitor"}   (บรรทัดแรก)
+#                     {"send": "P\n"}      ส่งต่อไป STM32 (รับเฉพาะ S / P / R)
+#                     {"ack": seq}         consumer รับ event ถึง seq แล้ว
+#   broker -> client: {"seq": n, "t": monotonic_ns, "cmd": ..., "line": "X=...,Y=...,BTN=0"}
+#                     cmd = null สำหรับบรรทัดที่ไม่ใช่คำสั่ง (Time/Calories, INFO: ...), line มีเฉพาะโปรโตคอล ASCII
+#
+# หน้าจอใน home/FITRING_Adventure_Full ที่อ่านบรรทัดดิบใช้ BrokerClient.readline() แทน serial.Serial.readline()
+#
+# consumer ที่ต่อเข้ามาใหม่จะได้ event ที่ค้างตั้งแต่ ack ล่าสุดของ consumer ก่อนหน้า -> สลับหน้าจอไม่ทำคำสั่งหาย
+# monitor ได้เฉพาะ event สด และไม่มีผลกับการ ack
+# client แต่ละตัวมีคิว + thread ส่งของตัวเอง: thread อ่านพอร์ตแค่ใส่คิว ไม่รอ socket ของใคร
+# client ที่รับไม่ทัน (คิวเต็ม) ถูกตัดทิ้ง — consumer ต่อใหม่แล้วได้ event ที่ยังไม่ ack ครบ
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+from collections import deque
+
+import serial_binary
+from serial_lines import LineAssembler, parse_serial_line
+
+DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), "ringfit-serial.sock")
+BACKLOG_MAX = 1024            # event ล่าสุดที่เก็บไว้ส่งให้ consumer ที่ต่อเข้ามาใหม่
+CLIENT_QUEUE_MAX = 2 * BACKLOG_MAX   # payload ที่ค้างส่งได้ต่อ client ก่อนถูกตัดว่าช้าเกิน
+OUTBOUND = {b"S", b"P", b"R"}
+
+
+def _socket_for(address):
+    """'tcp:127.0.0.1:47011' -> TCP (เครื่องที่ไม่มี AF_UNIX), นอกนั้นเป็น path ของ Unix socket"""
+    if address.startswith("tcp:"):
+        host, port = address[4:].rsplit(":", 1)
+        return socket.socket(socket.AF_INET, socket.SOCK_STREAM), (host, int(port))
+    return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM), address
+
+
+def _encode(obj):
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _Client:
+    """client หนึ่งตัว: send() แค่ใส่คิว (ไม่บล็อก) แล้ว thread ของ client เป็นคน sendall"""
+
+    def __init__(self, conn, name, role, on_error):
+        self.conn = conn
+        self.name = name
+        self.role = role
+        self.acked = 0
+        self.queue = deque()
+        self.ready = threading.Condition()
+        self.closed = False
+        self._on_error = on_error      # เรียกจาก thread ส่งเมื่อ socket พัง
+        self._writer = threading.Thread(target=self._write_loop, name=f"broker-send-{name}", daemon=True)
+        self._writer.start()
+
+    def send(self, payload):
+        """คืน False ถ้าคิวเต็ม (client รับไม่ทัน) หรือปิดไปแล้ว"""
+        with self.ready:
+            if self.closed or len(self.queue) >= CLIENT_QUEUE_MAX:
+                return False
+            self.queue.append(payload)
+            self.ready.notify()
+        return True
+
+    def close(self):
+        with self.ready:
+            self.closed = True
+            self.queue.clear()
+            self.ready.notify()
+
+    def _write_loop(self):
+        while True:
+            with self.ready:
+                while not self.queue and not self.closed:
+                    self.ready.wait()
+                if self.closed:
+                    return
+                batch = b"".join(self.queue)
+                self.queue.clear()
+            try:
+                self.conn.sendall(batch)
+            except OSError:
+                self._on_error(self)
+                return
+
+
+class SerialBroker:
+    def __init__(self, port, address=DEFAULT_ADDRESS, protocol="ascii"):
+        self.port = port
+        self.address = address
+        self.protocol = protocol
+        self.assembler = LineAssembler()
+        self.decoder = None
+        self.events = deque(maxlen=BACKLOG_MAX)   # (seq, payload)
+        self.seq = 0
+        self.consumed_seq = 0                     # ack ล่าสุดจาก consumer
+        self.clients = []
+        self.lock = threading.Lock()              # events / seq / clients
+        self.write_lock = threading.Lock()        # port.write จากหลาย client
+        self.stats = {"events": 0, "sent": 0, "rejected": 0, "clients": 0}
+        self._stop_evt = threading.Event()
+        self._server = None
+
+    # ---------- ฝั่งพอร์ต ----------
+    def _negotiate(self):
+        if self.protocol != "auto":
+            return []
+        ok, ascii_bytes, binary_bytes = serial_binary.negotiate_binary(self.port)
+        events = self._ascii_events(ascii_bytes)
+        if ok:
+            self.decoder = serial_binary.BinaryFrameDecoder()
+            events += [(cmd, None) for cmd in self.decoder.feed(binary_bytes)]
+        print("✅ STM32 link:", "binary frames" if ok else "ASCII lines")
+        return events
+
+    def _ascii_events(self, data):
+        """bytes -> [(cmd หรือ None, บรรทัดดิบ)] — เก็บบรรทัดที่ไม่ใช่คำสั่งไว้ด้วย (หน้า home/ อ่านเวลา/แคลอรี่จากมัน)"""
+        return [(parse_serial_line(line, self.assembler), line) for line in self.assembler.feed(data)]
+
+    def _decode(self, data):
+        if self.decoder is not None:
+            return [(cmd, None) for cmd in self.decoder.feed(data)]
+        return self._ascii_events(data)
+
+    def _read_port(self):
+        self._publish(self._negotiate(), time.monotonic_ns())
+        while not self._stop_evt.is_set():
+            try:
+                data = self.port.read(1024)
+            except Exception as e:
+                if not self._stop_evt.is_set():
+                    print("Serial read error:", e)
+                    self.stop()
+                return
+            if data:
+                self._publish(self._decode(data), time.monotonic_ns())
+
+    def _publish(self, events, ts_ns):
+        if not events:
+            return
+        with self.lock:
+            for cmd, line in events:
+                self.seq += 1
+                msg = {"seq": self.seq, "t": ts_ns, "cmd": cmd}
+                if line is not None:
+                    msg["line"] = line
+                payload = _encode(msg)
+                self.events.append((self.seq, payload))
+                self.stats["events"] += 1
+                for c in list(self.clients):
+                    self._send_or_drop(c, payload)
+
+    def _send_or_drop(self, client, payload):
+        if not client.send(payload):
+            print(f"🐢 client '{client.name}' ({client.role}) รับไม่ทัน ตัดการเชื่อมต่อ")
+            self._drop(client)
+
+    def _on_send_error(self, client):
+        with self.lock:
+            self._drop(client)
+
+    def _drop(self, client):
+        """เรียกใต้ self.lock"""
+        if client in self.clients:
+            self.clients.remove(client)
+            print(f"🔌 client '{client.name}' ({client.role}) หลุด")
+        client.close()
+        try:
+            client.conn.shutdown(socket.SHUT_RDWR)   # ปลุก thread ที่ค้าง recv / sendall อยู่
+        except OSError:
+            pass
+        try:
+            client.conn.close()
+        except OSError:
+            pass
+
+    def write(self, data):
+        with self.write_lock:
+            self.port.write(data)
+            self.port.flush()
+
+    # ---------- ฝั่ง client ----------
+    def _serve_client(self, conn):
+        f = conn.makefile("rb")
+        client = None
+        try:
+            hello = json.loads(f.readline() or b"{}")
+            client = _Client(conn, hello.get("hello", "?"), hello.get("role", "consumer"), self._on_send_error)
+            with self.lock:
+                if client.role == "consumer":
+                    # ส่ง event ที่ consumer ตัวก่อนยังไม่ได้ ack ก่อน แล้วค่อยรับ event สด (อยู่ใต้ lock เดียวกัน -> ไม่ซ้ำ ไม่ขาด)
+                    for seq, payload in self.events:
+                        if seq > self.consumed_seq:
+                            client.send(payload)
+                self.clients.append(client)
+                self.stats["clients"] += 1
+            print(f"🔗 client '{client.name}' ({client.role}) ต่อแล้ว")
+
+            for line in f:
+                msg = json.loads(line)
+                if "ack" in msg and client.role == "consumer":
+                    client.acked = msg["ack"]
+                    with self.lock:
+                        self.consumed_seq = max(self.consumed_seq, client.acked)
+                if "send" in msg:
+                    data = msg["send"].encode("latin-1")
+                    if data.strip() in OUTBOUND:
+                        self.write(data)
+                        self.stats["sent"] += 1
+                        print(f"📤 {client.name} -> STM32 {data!r}")
+                    else:
+                        self.stats["rejected"] += 1
+                        print(f"⚠️ ไม่ส่ง {data!r} จาก {client.name} (รับเฉพาะ S/P/R)")
+        except (OSError, ValueError) as e:
+            if not self._stop_evt.is_set():
+                print("⚠️ client error:", e)
+        finally:
+            f.close()
+            with self.lock:
+                if client is not None:
+                    self._drop(client)
+                else:
+                    conn.close()
+
+    def serve_forever(self):
+        server, addr = _socket_for(self.address)
+        if server.family == getattr(socket, "AF_UNIX", None) and os.path.exists(addr):
+            os.unlink(addr)   # socket ค้างจากรอบก่อน
+        server.bind(addr)
+        server.listen()
+        self._server = server
+        print(f"🛰 serial broker: {self.address}")
+
+        threading.Thread(target=self._read_port, name="broker-serial", daemon=True).start()
+        try:
+            while not self._stop_evt.is_set():
+                try:
+                    conn, _ = server.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self._serve_client, args=(conn,), name="broker-client", daemon=True).start()
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stop_evt.set()
+        if self._server is not None:
+            try:
+                self._server.close()
+            except OSError:
+                pass
+            if self._server.family == getattr(socket, "AF_UNIX", None) and os.path.exists(self.address):
+                os.unlink(self.address)
+            self._server = None
+        with self.lock:
+            for c in list(self.clients):
+                self._drop(c)
+
+
+class BrokerClient:
+    """
+    ต่อ broker แทนพอร์ตจริง: write()/flush()/close()/is_open เหมือน serial.Serial
+    (send_serial / send_reset_signal ใช้ได้เลย) ส่วนขาเข้าใช้ read_events() ที่ได้คำสั่งที่ parse แล้ว
+    หรือ readline() ที่ได้บรรทัดดิบทีละบรรทัดเหมือน serial.Serial.readline() (ใช้อย่างใดอย่างหนึ่ง)
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, name="client", role="consumer", timeout=0.05):
+        self.sock, addr = _socket_for(address)
+        self.sock.connect(addr)
+        self.sock.settimeout(timeout)
+        self.role = role
+        self.is_open = True
+        self._buf = bytearray()
+        self._lines = deque()                # (seq, บรรทัด) ที่รับมาแล้วแต่ readline() ยังไม่คืน
+        self._send_lock = threading.Lock()   # ack จาก reader thread + write() จาก main thread ใช้ socket เดียวกัน
+        self._send({"hello": name, "role": role})
+
+    def _send(self, obj):
+        with self._send_lock:
+            self.sock.sendall(_encode(obj))
+
+    def _recv(self):
+        """ข้อความจาก broker ที่มาถึง ([] ถ้าหมดเวลา) — ConnectionError ถ้า broker ปิด"""
+        try:
+            data = self.sock.recv(4096)
+        except socket.timeout:
+            return []
+        if not data:
+            raise ConnectionError("broker closed the connection")
+        self._buf += data
+        msgs = []
+        while True:
+            nl = self._buf.find(b"\n")
+            if nl < 0:
+                break
+            msgs.append(json.loads(self._buf[:nl]))
+            del self._buf[:nl + 1]
+        return msgs
+
+    def _ack(self, seq):
+        if self.role == "consumer":
+            self._send({"ack": seq})
+
+    def read_events(self):
+        """คืนลิสต์ (monotonic_ns, cmd) ที่มาถึง ([] ถ้าหมดเวลา) — ConnectionError ถ้า broker ปิด"""
+        msgs = self._recv()
+        if msgs:
+            self._ack(msgs[-1]["seq"])
+        return [(m["t"], m["cmd"]) for m in msgs if m["cmd"] is not None]
+
+    def readline(self):
+        """บรรทัดดิบถัดไปจาก STM32 (bytes ลงท้าย \\n) หรือ b"" ถ้าหมดเวลา — ack ทีละบรรทัดที่คืนไปแล้ว"""
+        if not self._lines:
+            msgs = self._recv()
+            self._lines.extend((m["seq"], m["line"]) for m in msgs if "line" in m)
+            if msgs and not self._lines:
+                self._ack(msgs[-1]["seq"])   # มีแต่ event ที่ไม่มีบรรทัด (โปรโตคอล binary)
+        if not self._lines:
+            return b""
+        seq, line = self._lines.popleft()
+        self._ack(seq)
+        return (line + "\n").encode("utf-8")
+
+    def write(self, data):
+        self._send({"send": data.decode("latin-1")})
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            self.sock.close()
+
+
+def monitor(address):
+    client = BrokerClient(address, name="monitor", role="monitor", timeout=1.0)
+    print(f"👀 monitor {address} (Ctrl+C เพื่อหยุด)")
+    try:
+        while True:
+            for ts, cmd in client.read_events():
+                print(f"{ts / 1e9:14.3f}  {cmd}")
+    except (KeyboardInterrupt, ConnectionError):
+        pass
+    finally:
+        client.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="STM32 serial broker")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    srv = sub.add_parser("serve")
+    srv.add_argument("--port", default=os.environ.get("RINGFIT_SERIAL_PORT", "COM3"))
+    srv.add_argument("--baud", type=int, default=115200)
+    srv.add_argument("--socket", default=DEFAULT_ADDRESS, help="path ของ Unix socket หรือ tcp:host:port")
+    srv.add_argument("--protocol", default=os.environ.get("RINGFIT_SERIAL_PROTOCOL", "ascii").lower())
+
+    mon = sub.add_parser("monitor")
+    mon.add_argument("--socket", default=os.environ.get("RINGFIT_SERIAL_BROKER", DEFAULT_ADDRESS))
+
+    args = ap.parse_args(argv)
+    if args.cmd == "monitor":
+        monitor(args.socket)
+        return
+
+    import serial
+    try:
+        port = serial.Serial(args.port, args.baud, timeout=0.01)
+    except Exception as e:
+        print("⚠️ ไม่พบ STM32:", e)
+        sys.exit(1)
+    print(f"✅ Connected to STM32 on {args.port}")
+    broker = SerialBroker(port, args.socket, args.protocol)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.stop()
+        port.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,199 @@
+import os
 import serial
-import re
+import time
+import threading
+from collections import deque
+
+import serial_binary
+from serial_lines import LineAssembler, parse_serial_bytes
+
+# "ascii" = บรรทัดข้อความแบบเดิม, "auto" = ลองขอโหมด binary ตอนต่อ ถ้าไม่ตอบใช้ ASCII
+SERIAL_PROTOCOL = os.environ.get("RINGFIT_SERIAL_PROTOCOL", "ascii").lower()
+
+# พอร์ตของ STM32 — ชี้ไป pty ของ serial_replay.py ได้เวลาไม่มีบอร์ดจริง
+SERIAL_PORT = os.environ.get("RINGFIT_SERIAL_PORT", "COM3")
+
+# socket ของ serial_broker.py — ถ้าตั้งไว้จะต่อ broker แทนการเปิดพอร์ตเอง
+SERIAL_BROKER = os.environ.get("RINGFIT_SERIAL_BROKER")
 
 SERIAL_ENABLED = True
-try:
-    ser = serial.Serial("COM3", 115200, timeout=0.01)
-    print("✅ Connected to STM32 on COM3")
-except Exception as e:
-    SERIAL_ENABLED = False
-    ser = None
-    print("⚠️ ไม่พบ STM32:", e)
+if SERIAL_BROKER:
+    from serial_broker import BrokerClient
+    try:
+        ser = BrokerClient(SERIAL_BROKER, name="game")
+        print(f"✅ Connected to serial broker on {SERIAL_BROKER}")
+    except OSError as e:
+        SERIAL_ENABLED = False
+        ser = None
+        print("⚠️ ต่อ serial broker ไม่ได้:", e)
+else:
+    try:
+        ser = serial.Serial(SERIAL_PORT, 115200, timeout=0.01)
+        print(f"✅ Connected to STM32 on {SERIAL_PORT}")
+    except Exception as e:
+        SERIAL_ENABLED = False
+        ser = None
+        print("⚠️ ไม่พบ STM32:", e)
+
+# คิวคำสั่งจาก reader thread -> main loop: (monotonic_ns, command)
+# deque.append / popleft เป็น atomic ใน CPython -> ไม่ต้องใช้ lock
+COMMAND_QUEUE_MAX = 512
+_cmd_queue = deque(maxlen=COMMAND_QUEUE_MAX)
+queue_stats = {"pushed": 0, "overflow": 0}
+
+
+def _push(cmd, ts_ns):
+    if len(_cmd_queue) == COMMAND_QUEUE_MAX:
+        queue_stats["overflow"] += 1   # deque จะทิ้งตัวเก่าสุดเอง
+    _cmd_queue.append((ts_ns, cmd))
+    queue_stats["pushed"] += 1
+
+
+class SerialReader(threading.Thread):
+    """thread เจ้าของพอร์ต: อ่าน -> parse -> ใส่คิวพร้อม timestamp ตอนที่ข้อมูลมาถึง"""
+
+    def __init__(self, port, assembler=None, decoder=None):
+        super().__init__(name="serial-reader", daemon=True)
+        self.port = port
+        self.assembler = assembler if assembler is not None else LineAssembler()
+        self.decoder = decoder          # BinaryFrameDecoder เมื่อเจรจาโหมด binary สำเร็จ
+        self._stop_evt = threading.Event()
+
+    def decode(self, data):
+        if self.decoder is not None:
+            return self.decoder.feed(data)
+        return parse_serial_bytes(data, self.assembler)
+
+    def run(self):
+        while not self._stop_evt.is_set():
+            try:
+                data = self.port.read(1024)   # บล็อกได้ไม่เกิน timeout ของพอร์ต (อยู่นอก main loop แล้ว)
+            except Exception as e:
+                if not self._stop_evt.is_set():
+                    print("Serial read error:", e)
+                return
+            if not data:
+                continue
+            ts_ns = time.monotonic_ns()
+            for cmd in self.decode(data):
+                _push(cmd, ts_ns)
+
+    def stop(self):
+        self._stop_evt.set()
+
+
+class BrokerReader(SerialReader):
+    """ขาเข้าจาก serial_broker: คำสั่ง parse มาแล้วพร้อม timestamp ของ broker"""
+
+    def run(self):
+        while not self._stop_evt.is_set():
+            try:
+                events = self.port.read_events()
+            except Exception as e:
+                if not self._stop_evt.is_set():
+                    print("Serial broker error:", e)
+                return
+            for ts_ns, cmd in events:
+                _push(cmd, ts_ns)
+
+
+_reader = None
+line_assembler = LineAssembler()   # ใช้ตัวเดียวตลอดอายุพอร์ต เศษบรรทัดไม่หายระหว่าง poll
+binary_decoder = None              # ตั้งค่าเมื่อเจรจาโหมด binary สำเร็จ
+
+
+def _negotiate_protocol(port):
+    """เรียกก่อนเริ่ม reader thread: ถ้า SERIAL_PROTOCOL == "auto" ลองสลับเป็น binary"""
+    global binary_decoder
+    if SERIAL_PROTOCOL != "auto":
+        return
+    try:
+        ok, ascii_bytes, binary_bytes = serial_binary.negotiate_binary(port)
+    except Exception as e:
+        print("⚠️ เจรจาโหมด binary ไม่ได้ ใช้ ASCII:", e)
+        return
+    ts_ns = time.monotonic_ns()
+    for cmd in parse_serial_bytes(ascii_bytes, line_assembler):
+        _push(cmd, ts_ns)
+    if ok:
+        binary_decoder = serial_binary.BinaryFrameDecoder()
+        for cmd in binary_decoder.feed(binary_bytes):
+            _push(cmd, ts_ns)
+        print("✅ STM32 link: binary frames")
+    else:
+        print("ℹ️ STM32 link: ASCII lines")
+
+
+def start_reader():
+    global _reader
+    if SERIAL_ENABLED and ser is not None and _reader is None:
+        if SERIAL_BROKER:
+            _reader = BrokerReader(ser)   # broker เจรจาโปรโตคอลและต่อบรรทัดให้แล้ว
+            _reader.start()
+            return
+        _negotiate_protocol(ser)
+        _reader = SerialReader(ser, line_assembler, binary_decoder)
+        _reader.start()
+
+
+def stop_reader(timeout=0.5):
+    global _reader
+    if _reader is not None:
+        _reader.stop()
+        _reader.join(timeout)
+        _reader = None
+
+
+def poll_serial_events():
+    """ดึง (monotonic_ns, command) ทั้งหมดที่ค้างในคิว ไม่บล็อก"""
+    events = []
+    pop = _cmd_queue.popleft
+    while _cmd_queue:
+        try:
+            events.append(pop())
+        except IndexError:
+            break
+    return events
 
 
 def poll_serial_commands():
-    """อ่านทุกคำสั่งจาก STM32 ผ่าน Serial"""
+    """อ่านทุกคำสั่งจาก STM32 ผ่าน Serial (จากคิวของ reader thread, ไม่บล็อก)"""
     if not SERIAL_ENABLED or ser is None:
         return []
+    return [cmd for _, cmd in poll_serial_events()]
 
-    cmds = []
-    try:
-        data = ser.read(1024)
-        if data:
-            s = data.decode("utf-8", "ignore").replace("\r", "")
-            lines = s.split("\n")
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # ✅ ตรวจจับคำสั่ง PAUSE / RESUME
-                if "PAUSE" in line:
-                    cmds.append("PAUSE")
-                elif "RESUME" in line:
-                    cmds.append("RESUME")
-
-                elif line.startswith("X="):
-                    try:
-                        parts = line.split(",")
-                        if len(parts) < 3:
-                            # ถ้ายังไม่ครบ X,Y,BTN ให้ข้าม
-                            continue
-
-                        x_val = int(parts[0].split("=")[1])
-                        y_val = int(parts[1].split("=")[1])
-                        btn_val = int(parts[2].split("=")[1])
-                        cmds.append(
-                            {"type": "JOY", "x": x_val, "y": y_val, "btn": btn_val}
-                        )
-                    except Exception as e:
-                        print("⚠️ Parse error:", e, "Line:", line)
-
-                # ✅ ตรวจจับปุ่มเกมอื่น ๆ (J, M, P, D, I, W)
-                elif re.match(r"^[JMPDIW]$", line.strip(), re.IGNORECASE):
-                    cmds.append(line.strip().upper())
 
-    except Exception as e:
-        print("Serial read error:", e)
+def serial_stats():
+    """ตัวนับของลิงก์: บรรทัดที่ได้ / ทิ้ง / ยาวเกิน / ผิดรูป + สถานะคิวคำสั่ง"""
+    stats = {**line_assembler.stats, **queue_stats, "queued": len(_cmd_queue)}
+    if binary_decoder is not None:
+        stats.update(binary_decoder.stats)
+    return stats
+
+
+def close_serial():
+    """หยุด reader thread แล้วปิดพอร์ต (ใช้ก่อนสลับหน้าจอ)"""
+    stop_reader()
+    if ser is not None and ser.is_open:
+        ser.close()
+
+
+start_reader()
 
-    return cmds
+
+def send_serial(data, label=None):
+    """ส่ง bytes ไป STM32 (เช่น b"S", b"P\n") คืน True ถ้าส่งได้"""
+    if not SERIAL_ENABLED or ser is None:
+        return False
+    try:
+        ser.write(data)
+        ser.flush()
+        if label:
+            print(f"📤 Sent {data!r} to STM32 ({label})")
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not send {data!r}:", e)
+        return False
 
 
 # --- เพิ่มไว้ท้ายไฟล์ serial_input.py ---
@@ -0,0 +1,152 @@
+# serial_lines.py
+# ต่อบรรทัด ASCII จาก STM32 + แปลงเป็นคำสั่งเกม (ไม่แตะพอร์ตจริง ใช้ได้ทั้งในเกมและใน serial_broker.py)
+import re
+import time
+from collections import deque
+
+# ความยาวบรรทัดสูงสุด (bytes) — บรรทัดจริงยาวสุดราว ๆ 40 ตัว ("Time mm:ss ... Calories=...")
+MAX_LINE_BYTES = 256
+
+
+class LineAssembler:
+    """
+    ต่อบรรทัดข้ามการ read แต่ละครั้ง: เก็บเศษท้าย chunk ไว้รวมกับ chunk ถัดไป
+    buffer มีขนาดจำกัด ถ้าเกิน MAX_LINE_BYTES โดยยังไม่เจอ \n จะทิ้งจนถึง \n ถัดไป
+    """
+
+    def __init__(self, max_line=MAX_LINE_BYTES):
+        self.max_line = max_line
+        self.buf = bytearray()
+        self.skipping = False          # กำลังทิ้งบรรทัดที่ยาวเกิน
+        self.stats = {"lines": 0, "dropped": 0, "overlong": 0, "malformed": 0}
+
+    def feed(self, data):
+        """รับ bytes ก้อนใดก็ได้ คืนลิสต์บรรทัด (str) ที่ครบแล้ว"""
+        lines = []
+        start = 0
+        while True:
+            nl = data.find(b"\n", start)
+            if nl < 0:
+                break
+            piece = data[start:nl]
+            start = nl + 1
+            if self.skipping:
+                self.skipping = False
+                continue
+            if len(self.buf) + len(piece) > self.max_line:
+                self.buf.clear()
+                self._overlong()
+                continue
+            self.buf += piece
+            line = self.buf.decode("utf-8", "ignore").replace("\r", "").strip()
+            self.buf.clear()
+            if line:
+                self.stats["lines"] += 1
+                lines.append(line)
+
+        rest = data[start:]
+        if rest and not self.skipping:
+            if len(self.buf) + len(rest) > self.max_line:
+                self.buf.clear()
+                self.skipping = True
+                self._overlong()
+            else:
+                self.buf += rest
+        return lines
+
+    def _overlong(self):
+        self.stats["overlong"] += 1
+        self.stats["dropped"] += 1
+
+    def malformed(self, line):
+        self.stats["malformed"] += 1
+        self.stats["dropped"] += 1
+
+    def reset(self):
+        self.buf.clear()
+        self.skipping = False
+
+
+_BUTTON_RE = re.compile(r"^[JMPDIW]$", re.IGNORECASE)
+
+
+def parse_serial_line(line, assembler=None):
+    """แปลงบรรทัดที่ครบแล้วเป็นคำสั่ง (str หรือ dict JOY) หรือ None ถ้าไม่ใช่คำสั่งเกม"""
+    # ✅ ตรวจจับคำสั่ง PAUSE / RESUME
+    if "PAUSE" in line:
+        return "PAUSE"
+    if "RESUME" in line:
+        return "RESUME"
+    # ปุ่ม start บนบอร์ด (หน้าเลือกตัวละครใช้)
+    if "START BUTTON PRESSED" in line:
+        return "START"
+
+    if line.startswith("X="):
+        try:
+            parts = line.split(",")
+            if len(parts) < 3:
+                raise ValueError("missing fields")
+            x_val = int(parts[0].split("=")[1])
+            y_val = int(parts[1].split("=")[1])
+            btn_val = int(parts[2].split("=")[1])
+            return {"type": "JOY", "x": x_val, "y": y_val, "btn": btn_val}
+        except Exception:
+            # หลังต่อบรรทัดแล้ว X= ที่ไม่ครบคือข้อมูลเสียจริง ๆ
+            if assembler is not None:
+                assembler.malformed(line)
+            return None
+
+    # ✅ ตรวจจับปุ่มเกมอื่น ๆ (J, M, P, D, I, W)
+    if _BUTTON_RE.match(line):
+        return line.upper()
+    return None
+
+
+def parse_serial_bytes(data, assembler):
+    """bytes -> คำสั่ง ผ่าน assembler (เก็บเศษบรรทัดข้ามการเรียก)"""
+    cmds = []
+    for line in assembler.feed(data):
+        cmd = parse_serial_line(line, assembler)
+        if cmd is not None:
+            cmds.append(cmd)
+    return cmds
+
+
+class FakeSerialPort:
+    """พอร์ตปลอมสำหรับทดสอบ: read() คืน chunk ตามลำดับที่ให้ไว้ (แบ่ง byte ตรงไหนก็ได้)"""
+
+    def __init__(self, chunks=()):
+        self.chunks = deque(chunks)
+        self.written = bytearray()
+        self.is_open = True
+
+    def read(self, n=1024):
+        if self.chunks:
+            return self.chunks.popleft()
+        time.sleep(0.001)
+        return b""
+
+    def write(self, data):
+        self.written += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+if __name__ == "__main__":
+    # เช็กเร็ว: ตัดสตรีมตัวอย่างทุกตำแหน่ง ผลต้องเหมือนกับการป้อนทีเดียว
+    sample = (b"X=2880,Y=2020,BTN=1\r\nJ\nPAUSE\nTime 01:02 Calories=3\nX=1,Y=\n"
+              + b"Z" * 300 + b"\nm\n")
+    expected = parse_serial_bytes(sample, LineAssembler())
+    for cut in range(len(sample) + 1):
+        for cut2 in range(cut, len(sample) + 1):
+            asm = LineAssembler()
+            got = []
+            for chunk in (sample[:cut], sample[cut:cut2], sample[cut2:]):
+                got += parse_serial_bytes(chunk, asm)
+            assert got == expected, (cut, cut2, got)
+    print("✅ reassembly OK:", expected)
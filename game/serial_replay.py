@@ -0,0 +1,177 @@
+# serial_replay.py
+# บันทึกสตรีม byte ดิบจาก STM32 พร้อมเวลา แล้วเล่นซ้ำผ่าน pseudo-terminal (Linux) แทนบอร์ดจริง
+#
+# บันทึก:  python serial_replay.py record --port COM3 --out floor.srl
+# เล่นซ้ำ: python serial_replay.py replay floor.srl --speed 1      (1x, 4 = เร็ว 4 เท่า, max = เร็วสุด)
+#          แล้วรันเกมด้วย RINGFIT_SERIAL_PORT=<path ที่พิมพ์ออกมา> python main.py wizard
+#
+# รูปแบบไฟล์ .srl: header "RFSL1\n" แล้วตามด้วย record ต่อกัน
+#   <QI> = เวลาตั้งแต่เริ่มบันทึก (ns), ความยาว  + bytes ดิบ
+import os
+import sys
+import time
+import struct
+import argparse
+
+MAGIC = b"RFSL1\n"
+_REC = struct.Struct("<QI")
+
+
+class SerialLogWriter:
+    def __init__(self, path):
+        self.f = open(path, "wb")
+        self.f.write(MAGIC)
+        self.t0 = time.monotonic_ns()
+
+    def write(self, data, ts_ns=None):
+        ts_ns = time.monotonic_ns() if ts_ns is None else ts_ns
+        self.f.write(_REC.pack(ts_ns - self.t0, len(data)))
+        self.f.write(data)
+
+    def close(self):
+        self.f.close()
+
+
+def iter_records(path):
+    """yield (offset_ns, data) ตามลำดับในไฟล์"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: ไม่ใช่ไฟล์ serial log")
+        while True:
+            head = f.read(_REC.size)
+            if len(head) < _REC.size:
+                return
+            ts, n = _REC.unpack(head)
+            data = f.read(n)
+            if len(data) < n:
+                return  # record สุดท้ายไม่ครบ (บันทึกถูกตัด)
+            yield ts, data
+
+
+def record(port_name, out_path, baud=115200, duration_s=None):
+    import serial
+    port = serial.Serial(port_name, baud, timeout=0.01)
+    log = SerialLogWriter(out_path)
+    print(f"⏺ บันทึก {port_name} -> {out_path} (Ctrl+C เพื่อหยุด)")
+    total = 0
+    try:
+        while duration_s is None or (time.monotonic_ns() - log.t0) < duration_s * 1e9:
+            data = port.read(1024)
+            if data:
+                log.write(data)
+                total += len(data)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log.close()
+        port.close()
+    print(f"✅ บันทึกแล้ว {total} bytes")
+
+
+def open_pty(link=None):
+    """เปิด pseudo-terminal แบบ raw คืน (master_fd, slave_path) — slave คือ 'พอร์ต' ที่เกมจะเปิด"""
+    import pty
+    import tty
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    if link:
+        if os.path.islink(link):
+            os.unlink(link)
+        os.symlink(path, link)
+        path = link
+    return master, slave, path
+
+
+def replay(log_path, speed=1.0, loop=False, link=None, wait_open=True, start_delay_s=0.0, hold_s=None):
+    """
+    เล่น log ผ่าน pty: speed = 1.0 (เวลาจริง), N (เร็ว N เท่า) หรือ None (เร็วสุด)
+    byte ที่เกมเขียนกลับมา (S/P/R) จะพิมพ์ออกหน้าจอ
+    ต้องให้เกมเปิดพอร์ตก่อนเริ่มส่ง (pyserial ล้าง input buffer ตอนเปิด) -> รอ Enter หรือ start_delay_s
+    เล่นจบแล้วยังเปิด pty ค้างไว้ hold_s วินาที (None = จน Ctrl+C) ให้เกมอ่าน byte ที่เหลือให้หมด
+    """
+    import select
+    master, slave, path = open_pty(link)
+    print(f"🔌 replay port: {path}")
+    if wait_open:
+        print("   รอให้เกมเปิดพอร์ต แล้วกด Enter ...")
+        sys.stdin.readline()
+    if start_delay_s > 0:
+        time.sleep(start_delay_s)
+
+    sent = 0
+    try:
+        while True:
+            t0 = time.monotonic_ns()
+            for ts, data in iter_records(log_path):
+                if speed:
+                    due = t0 + ts / speed
+                    while True:
+                        left = (due - time.monotonic_ns()) / 1e9
+                        if left <= 0:
+                            break
+                        r, _, _ = select.select([master], [], [], left)
+                        if r:
+                            _echo_host_writes(master)
+                os.write(master, data)
+                sent += len(data)
+            if not loop:
+                break
+        print(f"⏹ ส่งครบ {sent} bytes — เปิดพอร์ตค้างไว้" + (" (Ctrl+C เพื่อปิด)" if hold_s is None else ""))
+        hold_until = None if hold_s is None else time.monotonic() + hold_s
+        while hold_until is None or time.monotonic() < hold_until:
+            r, _, _ = select.select([master], [], [], 0.1)
+            if r:
+                _echo_host_writes(master)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
+        if link and os.path.islink(link):
+            os.unlink(link)
+    print(f"✅ เล่นซ้ำแล้ว {sent} bytes")
+
+
+def _echo_host_writes(master):
+    try:
+        data = os.read(master, 1024)
+    except OSError:
+        return
+    if data:
+        print("📥 host ->", data)
+
+
+def _parse_speed(text):
+    return None if text == "max" else float(text)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="STM32 serial record / replay")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record")
+    rec.add_argument("--port", default=os.environ.get("RINGFIT_SERIAL_PORT", "COM3"))
+    rec.add_argument("--baud", type=int, default=115200)
+    rec.add_argument("--out", required=True)
+    rec.add_argument("--duration", type=float, default=None, help="วินาที (ไม่ใส่ = จน Ctrl+C)")
+
+    rep = sub.add_parser("replay")
+    rep.add_argument("log")
+    rep.add_argument("--speed", type=_parse_speed, default=1.0, help="1, 4, 0.5 หรือ max")
+    rep.add_argument("--loop", action="store_true")
+    rep.add_argument("--link", default=None, help="สร้าง symlink ชื่อคงที่ เช่น /tmp/ringfit-tty")
+    rep.add_argument("--no-wait", action="store_true", help="ไม่ต้องรอ Enter")
+    rep.add_argument("--start-delay", type=float, default=0.0, help="รอกี่วินาทีก่อนเริ่มส่ง")
+    rep.add_argument("--hold", type=float, default=None, help="เล่นจบแล้วเปิดพอร์ตค้างกี่วินาที (ไม่ใส่ = จน Ctrl+C)")
+
+    args = ap.parse_args(argv)
+    if args.cmd == "record":
+        record(args.port, args.out, args.baud, args.duration)
+    else:
+        replay(args.log, args.speed, args.loop, args.link,
+               wait_open=not args.no_wait, start_delay_s=args.start_delay, hold_s=args.hold)
+
+
+if __name__ == "__main__":
+    main()
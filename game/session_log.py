@@ -0,0 +1,333 @@
+# session_log.py
+# บันทึกทั้งเซสชันของฉากเกม (seed ของ random, dt ทุก tick, ปุ่มคีย์บอร์ด, คำสั่ง serial) ลงไฟล์ .rfs
+# แล้วเล่นซ้ำแบบไม่มีหน้าต่าง เร็วสุดเท่าที่เครื่องไหว -> ได้ผลลัพธ์เดิมทุกอย่าง (ไว้ไล่บั๊กที่เกิดหน้างาน)
+# ไฟล์เดียวกันใช้เป็น workload ของ benchmark ได้ (replay_session คืนเวลา/tick ต่อวินาที)
+#
+# บันทึก:  RINGFIT_SESSION_LOG=logs python app.py            (ทุกครั้งที่เข้าฉากเกม = 1 ไฟล์)
+#          python headless.py --level 5 --minutes 30 --record logs
+# เล่นซ้ำ: python session_log.py replay logs/session-20261018-101500-wizard.rfs
+#          python session_log.py info logs/session-....rfs
+#
+# รูปแบบไฟล์: MAGIC แล้วตามด้วย record ต่อกัน (เขียนต่อท้ายอย่างเดียว ตัดกลางไฟล์ก็ยังอ่านได้ถึง record สุดท้ายที่ครบ)
+#   b"H" <I len> json      header: seed, player_class, level, step_ms (+ immortal ถ้าบันทึกจาก headless --immortal)
+#   b"T" <d dt> <H keys> <H len> json?   หนึ่ง tick: dt, ปุ่มที่กดค้าง (bitmask), event/คำสั่ง serial (ถ้ามี)
+#   b"K" <I tick> <I crc>  checkpoint: crc ของสถานะเกมหลังเดินครบ tick นี้
+#   b"E" <I len> json      จบเซสชัน: สรุปผล
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import argparse
+
+MAGIC = b"RFSN1\n"
+CHECKPOINT_TICKS = 60
+
+_LEN = struct.Struct("<I")
+_TICK = struct.Struct("<dHH")
+_CHECK = struct.Struct("<II")
+
+# ปุ่มที่ Player.handle_input อ่านจาก key.get_pressed()
+_KEY_NAMES = ("K_LEFT", "K_a", "K_RIGHT", "K_d", "K_SPACE", "K_w", "K_UP")
+
+
+def _player_keys():
+    import pygame
+    return [getattr(pygame, name) for name in _KEY_NAMES]
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(4), "little")
+
+
+class KeyMask:
+    """แทน pygame.key.get_pressed() ตอนเล่นซ้ำ: keys[K] -> True ถ้าบิตของปุ่มนั้นถูกตั้ง"""
+
+    def __init__(self, mask, player_keys):
+        self.pressed = {k for i, k in enumerate(player_keys) if mask & (1 << i)}
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def state_digest(scene):
+    """crc ของสถานะที่มีผลกับการเล่น (ถ้าเล่นซ้ำแล้วค่านี้ตรงทุก checkpoint = ผลเหมือนเดิม)"""
+    p = scene.player_group.sprite
+    parts = [
+        scene.level, scene.coins_collected, scene.progress, scene.level2_progress,
+        scene.level2_kills, scene.level3_kills, scene.level4_kills, scene.level5_kills_total,
+        scene.challenge_expect_key, scene.game_paused, scene.sequence is not None,
+        p.hp, p.state, p.rect.topleft, p.vel_y, p.locked, p.dead,
+        getattr(p, "coin_lock", False), getattr(p, "obstacle_lock", False),
+    ]
+    for group in scene._world_groups():
+        for spr in group:
+            parts.append((type(spr).__name__, spr.rect.topleft, getattr(spr, "state", None), getattr(spr, "hp", None)))
+    return zlib.crc32(repr(parts).encode())
+
+
+def session_summary(scene, ticks, step_ms):
+    p = scene.player_group.sprite
+    return {
+        "ticks": ticks,
+        "sim_s": round(ticks * step_ms / 1000.0, 3),
+        "level": scene.level,
+        "coins": scene.coins_collected,
+        "kills": scene.level2_kills + scene.level3_kills + scene.level4_kills + scene.level5_kills_total,
+        "hp": p.hp,
+        "dead": bool(p.dead or p.hp <= 0),
+        "digest": state_digest(scene),
+    }
+
+
+# ---------- บันทึก ----------
+class SessionRecorder:
+    def __init__(self, path, player_class, seed=None):
+        import pygame
+        self.path = path
+        self.player_class = player_class
+        self.seed = new_seed() if seed is None else seed
+        self.f = open(path, "wb")
+        self.f.write(MAGIC)
+        self.ticks = 0
+        self.step_ms = None
+        self.meta = {}       # ข้อมูลเพิ่มใน header (เช่น headless --immortal)
+        self._keys = _player_keys()
+        self._key_events = (pygame.KEYDOWN, pygame.KEYUP)
+
+    def _write_json(self, tag, obj):
+        body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.f.write(tag + _LEN.pack(len(body)) + body)
+
+    def tick(self, scene, dt, keys, events, serial_cmds):
+        """เรียกก่อน GameScene.update ทุกครั้ง ด้วย input ชุดเดียวกับที่ update จะได้"""
+        if self.f is None:
+            return
+        if self.step_ms is None:
+            # header เขียนตอน tick แรก (headless ตั้ง scene.level หลังสร้างฉาก)
+            self.step_ms = dt
+            self._write_json(b"H", {"seed": self.seed, "player_class": self.player_class,
+                                    "level": scene.level, "step_ms": dt, **self.meta})
+        elif self.ticks % CHECKPOINT_TICKS == 0:
+            self.f.write(b"K" + _CHECK.pack(self.ticks, state_digest(scene)))
+            self.f.flush()   # เกมค้าง/แครชหน้างานก็ยังมี log ถึงวินาทีล่าสุด
+
+        mask = 0
+        for i, k in enumerate(self._keys):
+            if keys[k]:
+                mask |= 1 << i
+        payload = {}
+        evs = [[e.type == self._key_events[0], e.key] for e in events if e.type in self._key_events]
+        if evs:
+            payload["k"] = evs
+        if serial_cmds:
+            payload["c"] = list(serial_cmds)
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8") if payload else b""
+        self.f.write(b"T" + _TICK.pack(dt, mask, len(body)) + body)
+        self.ticks += 1
+
+    def close(self, scene=None):
+        if self.f is None:
+            return
+        if scene is not None and self.step_ms is not None:
+            self._write_json(b"E", session_summary(scene, self.ticks, self.step_ms))
+        self.f.close()
+        self.f = None
+        print(f"📼 บันทึกเซสชัน {self.ticks} tick -> {self.path}")
+
+
+def open_recorder(player_class):
+    """RINGFIT_SESSION_LOG=โฟลเดอร์ -> SessionRecorder ไฟล์ใหม่ ไม่ตั้ง = None"""
+    folder = os.environ.get("RINGFIT_SESSION_LOG")
+    if not folder:
+        return None
+    try:
+        os.makedirs(folder, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(folder, f"session-{stamp}-{player_class}.rfs")
+        n = 1
+        while os.path.exists(path):
+            n += 1
+            path = os.path.join(folder, f"session-{stamp}-{player_class}-{n}.rfs")
+        return SessionRecorder(path, player_class)
+    except OSError as e:
+        print(f"⚠️ เปิดไฟล์บันทึกเซสชันไม่ได้: {e}")
+        return None
+
+
+# ---------- อ่าน / เล่นซ้ำ ----------
+def iter_session(path):
+    """yield ("H", dict) / ("T", dt, mask, payload) / ("K", tick, crc) / ("E", dict) ตามลำดับในไฟล์"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: ไม่ใช่ไฟล์ session log")
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+            if tag == b"T":
+                head = f.read(_TICK.size)
+                if len(head) < _TICK.size:
+                    return
+                dt, mask, n = _TICK.unpack(head)
+                body = f.read(n)
+                if len(body) < n:
+                    return
+                yield "T", dt, mask, (json.loads(body) if n else None)
+            elif tag == b"K":
+                head = f.read(_CHECK.size)
+                if len(head) < _CHECK.size:
+                    return
+                yield ("K",) + _CHECK.unpack(head)
+            elif tag in (b"H", b"E"):
+                head = f.read(_LEN.size)
+                if len(head) < _LEN.size:
+                    return
+                n = _LEN.unpack(head)[0]
+                body = f.read(n)
+                if len(body) < n:
+                    return
+                yield tag.decode(), json.loads(body)
+            else:
+                raise ValueError(f"{path}: record ไม่รู้จัก {tag!r} ที่ offset {f.tell() - 1}")
+
+
+def replay_session(path, draw=False, quiet=True, out=None):
+    """
+    เล่น log ซ้ำผ่าน GameScene แบบ headless ไม่รอเวลาจริง ตรวจ crc ทุก checkpoint + สรุปตอนจบ
+    คืน dict: ticks, wall_s, ticks_per_s, checkpoints, mismatches, first_mismatch, end_match, summary
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("RINGFIT_SERIAL_PORT", os.devnull)
+    os.environ.pop("RINGFIT_SESSION_LOG", None)   # เล่นซ้ำไม่ต้องบันทึกซ้อน
+    import pygame
+    from headless import HeadlessManager
+
+    out = out or sys.stdout
+    pygame.init()
+    screen = pygame.display.get_surface() or pygame.display.set_mode((960, 540))
+    player_keys = _player_keys()
+
+    devnull = open(os.devnull, "w") if quiet else None
+    real_stdout = sys.stdout
+    if devnull:
+        sys.stdout = devnull
+    scene = None
+    ticks = checkpoints = mismatches = 0
+    first_mismatch = None
+    end_match = None
+    expected_end = None
+    header = None
+    try:
+        from main import GameScene
+
+        manager = HeadlessManager(screen)
+
+        def refill():
+            if header.get("immortal"):
+                p = scene.player_group.sprite
+                p.hp = p.max_hp
+
+        t0 = time.perf_counter()
+        for rec in iter_session(path):
+            kind = rec[0]
+            if kind == "H":
+                header = rec[1]
+                scene = GameScene(manager, player_class=header["player_class"], seed=header["seed"])
+                scene.level = header["level"]
+            elif kind == "T":
+                _, dt, mask, payload = rec
+                payload = payload or {}
+                events = [pygame.event.Event(pygame.KEYDOWN if down else pygame.KEYUP, key=key)
+                          for down, key in payload.get("k", ())]
+                scene.key_state = KeyMask(mask, player_keys)
+                refill()
+                scene.update(dt, events, payload.get("c", []))
+                if draw:
+                    scene.draw(screen, 1.0)
+                ticks += 1
+            elif kind == "K":
+                _, at, crc = rec
+                refill()   # ตอนบันทึก headless เติม HP ก่อน update (checkpoint ถูกเขียนใน update)
+                checkpoints += 1
+                if state_digest(scene) != crc:
+                    mismatches += 1
+                    if first_mismatch is None:
+                        first_mismatch = at
+            elif kind == "E":
+                expected_end = rec[1]
+        wall = time.perf_counter() - t0
+
+        if header is None:
+            raise ValueError(f"{path}: ไม่มี header (ไฟล์ว่าง?)")
+        summary = session_summary(scene, ticks, header["step_ms"])
+        if expected_end is not None:
+            end_match = summary == expected_end
+        scene.leave()
+    finally:
+        sys.stdout = real_stdout
+        if devnull:
+            devnull.close()
+
+    result = {
+        "ticks": ticks,
+        "wall_s": wall,
+        "ticks_per_s": ticks / wall if wall > 0 else float("inf"),
+        "checkpoints": checkpoints,
+        "mismatches": mismatches,
+        "first_mismatch": first_mismatch,
+        "end_match": end_match,
+        "summary": summary,
+        "expected": expected_end,
+    }
+    ok = mismatches == 0 and end_match is not False
+    print(
+        f"{'✅' if ok else '❌'} {os.path.basename(path)}: {ticks} tick ({summary['sim_s']:.0f}s ในเกม) "
+        f"ใน {wall:.2f}s ({result['ticks_per_s']:.0f} tick/s)  checkpoint {checkpoints - mismatches}/{checkpoints} ตรง"
+        + ("" if end_match is None else f"  ผลตอนจบ {'ตรง' if end_match else 'ไม่ตรง'}")
+        + ("" if first_mismatch is None else f"  เริ่มต่างที่ tick {first_mismatch}"),
+        file=out,
+    )
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="GameScene session log: replay / info")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rp = sub.add_parser("replay", help="เล่นซ้ำแบบ headless แล้วตรวจว่าผลตรงกับตอนบันทึก")
+    rp.add_argument("logs", nargs="+")
+    rp.add_argument("--draw", action="store_true", help="วาดทุก tick ด้วย (วัดเวลารวมการวาด)")
+    rp.add_argument("--verbose", action="store_true", help="ไม่ซ่อน print ของเกม")
+    info = sub.add_parser("info", help="สรุปเนื้อหาไฟล์")
+    info.add_argument("logs", nargs="+")
+    args = ap.parse_args(argv)
+
+    # path ของ assets เป็น relative กับ game/ (แปลง path ของ log ก่อนย้าย)
+    logs = [os.path.abspath(p) for p in args.logs]
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if args.cmd == "info":
+        for path in logs:
+            header, ticks, events, end = None, 0, 0, None
+            for rec in iter_session(path):
+                if rec[0] == "H":
+                    header = rec[1]
+                elif rec[0] == "T":
+                    ticks += 1
+                    events += bool(rec[3])
+                elif rec[0] == "E":
+                    end = rec[1]
+            print(f"{os.path.basename(path)}: {header}  {ticks} tick ({events} มี input)  จบ: {end}")
+        return 0
+
+    failed = 0
+    for path in logs:
+        r = replay_session(path, draw=args.draw, quiet=not args.verbose)
+        failed += r["mismatches"] > 0 or r["end_match"] is False
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
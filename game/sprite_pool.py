@@ -0,0 +1,65 @@
+# sprite_pool.py
+# pool ของ sprite ที่เกิด/ตายบ่อย (เหรียญ, อุปสรรค, props): สร้างไว้ครั้งเดียวแล้ววนใช้ซ้ำ
+# sprite ที่ออกจากทุก group แล้ว (kill(), group.remove(), group.empty()) จะกลับเข้า pool เอง
+# spawn = pool.acquire(...) -> ได้ตัวเดิมที่ reset(...) แล้ว ไม่สร้าง object / ไม่โหลดรูปใหม่
+import pygame
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    """
+    Sprite ที่คืนตัวเองเข้า pool เมื่อไม่อยู่ใน group ไหนแล้ว (ไม่มี pool = Sprite ธรรมดา)
+    คลาสลูกที่ใช้กับ SpritePool ต้องมี reset(...) ตั้งสถานะใหม่ทั้งหมดเหมือนเพิ่งสร้าง (acquire() เรียกให้)
+    """
+
+    pool = None
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+    def remove_internal(self, group):
+        # group.remove() / group.empty() เรียกตัวนี้ (kill() ไม่เรียก)
+        super().remove_internal(group)
+        if self.pool is not None and not self.alive():
+            self.pool.release(self)
+
+
+class SpritePool:
+    """
+    factory() -> PooledSprite ตัวใหม่ (เรียกตอน prefill หรือตอน pool หมด)
+    acquire(*args, **kwargs) -> sprite ที่ reset(*args, **kwargs) แล้ว
+    """
+
+    def __init__(self, factory, prefill=0):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        for _ in range(prefill):
+            self.free.append(self._new())
+
+    def _new(self):
+        spr = self.factory()
+        spr.pool = self
+        spr._pooled = True
+        self.created += 1
+        return spr
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            spr = self.free.pop()
+            self.reused += 1
+        else:
+            spr = self._new()
+        spr._pooled = False
+        spr.reset(*args, **kwargs)
+        return spr
+
+    def release(self, spr):
+        if not spr._pooled:
+            spr._pooled = True
+            self.free.append(spr)
+
+    def stats(self):
+        return {"created": self.created, "reused": self.reused, "free": len(self.free)}
@@ -0,0 +1,75 @@
+# text_cache.py
+# แคชผลของ font.render: ข้อความ HUD / เมนู / ชื่อตัวละครส่วนใหญ่ไม่เปลี่ยนทุกเฟรม -> render ครั้งเดียวแล้ว blit ซ้ำ
+# key = (font, text, color, antialias, outline) เก็บแบบ LRU ไม่เกิน MAX_ENTRIES
+from collections import OrderedDict
+
+import pygame
+
+MAX_ENTRIES = 256
+
+_TEXT_CACHE = OrderedDict()
+_FONTS = {}
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def get_font(name=None, size=28, bold=False, path=None):
+    """SysFont / Font ตัวเดิมทุกครั้ง (สร้างฟอนต์ใหม่ทุกครั้งที่เปิดหน้าจอแพงและทำให้แคชข้อความไม่ตรง key)"""
+    key = (name, size, bold, str(path) if path else None)
+    f = _FONTS.get(key)
+    if f is None:
+        if path:
+            f = pygame.font.Font(str(path), size)
+        else:
+            f = pygame.font.SysFont(name, size, bold=bold)
+        _FONTS[key] = f
+    return f
+
+
+def _render_outlined(font, text, color, antialias, outline_color, thickness):
+    base = font.render(text, antialias, color)
+    edge = font.render(text, antialias, outline_color)
+    w, h = base.get_size()
+    surf = pygame.Surface((w + 2 * thickness, h + 2 * thickness), pygame.SRCALPHA)
+    for dx in range(-thickness, thickness + 1):
+        for dy in range(-thickness, thickness + 1):
+            if dx == 0 and dy == 0:
+                continue
+            surf.blit(edge, (thickness + dx, thickness + dy))
+    surf.blit(base, (thickness, thickness))
+    return surf
+
+
+def render_text(font, text, color, antialias=True, outline=None):
+    """
+    เหมือน font.render(text, antialias, color) แต่คืน surface จากแคชถ้าเคย render แล้ว
+    outline = (outline_color, thickness) -> surface ที่มีขอบแล้ว (ใหญ่กว่าข้อความ thickness px ทุกด้าน)
+    ห้ามแก้ไข surface ที่ได้ (ใช้ร่วมกัน)
+    """
+    key = (font, text, tuple(color), antialias, outline)
+    surf = _TEXT_CACHE.get(key)
+    if surf is not None:
+        _stats["hits"] += 1
+        _TEXT_CACHE.move_to_end(key)
+        return surf
+
+    _stats["misses"] += 1
+    if outline:
+        outline_color, thickness = outline
+        surf = _render_outlined(font, text, color, antialias, outline_color, thickness)
+    else:
+        surf = font.render(text, antialias, color)
+    _TEXT_CACHE[key] = surf
+    if len(_TEXT_CACHE) > MAX_ENTRIES:
+        _TEXT_CACHE.popitem(last=False)
+        _stats["evictions"] += 1
+    return surf
+
+
+def text_cache_stats():
+    return {**_stats, "entries": len(_TEXT_CACHE), "fonts": len(_FONTS)}
+
+
+def clear_text_cache():
+    _TEXT_CACHE.clear()
+    for k in _stats:
+        _stats[k] = 0
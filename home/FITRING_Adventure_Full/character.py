@@ -1,3 +1,4 @@
+import os
 import pygame
 import sys
 import serial
@@ -7,7 +8,13 @@ from pathlib import Path
 # --------- Serial Config (STM32) ----------
 PORT = "COM3"  # 👈 เปลี่ยนให้ตรงกับพอร์ตจริง
 BAUD = 115200
-ser = serial.Serial(PORT, BAUD, timeout=0.01)
+SERIAL_BROKER = os.environ.get("RINGFIT_SERIAL_BROKER")  # ตั้งไว้ = ต่อ serial_broker.py แทนเปิดพอร์ตเอง
+if SERIAL_BROKER:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "game"))
+    from serial_broker import BrokerClient
+    ser = BrokerClient(SERIAL_BROKER, name="character", timeout=0.01)
+else:
+    ser = serial.Serial(PORT, BAUD, timeout=0.01)
 
 # --------- ตั้งค่า ----------
 TARGET_WIDTH = 960
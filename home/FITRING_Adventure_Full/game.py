@@ -1,3 +1,4 @@
+import os
 import pygame
 import sys
 import serial
@@ -7,7 +8,13 @@ import re
 # --------- Serial Config ----------
 PORT_JOYSTICK = "COM3"  # ✅ ใช้พอร์ตเดียว
 BAUD = 115200
-ser_joy = serial.Serial(PORT_JOYSTICK, BAUD, timeout=0.01)
+SERIAL_BROKER = os.environ.get("RINGFIT_SERIAL_BROKER")  # ตั้งไว้ = ต่อ serial_broker.py แทนเปิดพอร์ตเอง
+if SERIAL_BROKER:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "game"))
+    from serial_broker import BrokerClient
+    ser_joy = BrokerClient(SERIAL_BROKER, name="home-game", timeout=0.01)
+else:
+    ser_joy = serial.Serial(PORT_JOYSTICK, BAUD, timeout=0.01)
 
 # --------- Pygame Init ----------
 pygame.init()
@@ -1,3 +1,4 @@
+import os
 import pygame
 import sys
 from pathlib import Path
@@ -7,7 +8,13 @@ import subprocess
 # ---------------- Serial Config ----------------
 PORT = "COM3"  # 👈 ตรวจให้ตรงกับพอร์ตจริงของ STM32
 BAUD = 115200
-ser = serial.Serial(PORT, BAUD, timeout=0.05)
+SERIAL_BROKER = os.environ.get("RINGFIT_SERIAL_BROKER")  # ตั้งไว้ = ต่อ serial_broker.py แทนเปิดพอร์ตเอง
+if SERIAL_BROKER:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "game"))
+    from serial_broker import BrokerClient
+    ser = BrokerClient(SERIAL_BROKER, name="home", timeout=0.05)
+else:
+    ser = serial.Serial(PORT, BAUD, timeout=0.05)
 
 # ---------------- Pygame Setup ----------------
 TARGET_WIDTH = 960